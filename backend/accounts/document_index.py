@@ -0,0 +1,131 @@
+"""
+Per-user index of document-vault names, for matching a scheme's required
+documents against what the user has uploaded.
+
+Names are reduced to sets of canonical tokens: lower-cased words, filler
+words ("card", "copy", "of") dropped and known spellings and synonyms merged
+("Aadhar" -> "aadhaar", "income proof" -> "income certificate"). A required
+document is available when its tokens are all in one owned document's
+tokens, or one owned document's tokens are all in its own — "Aadhaar Card"
+matches an upload named "aadhar", "Income Certificate" one named
+"Income certificate 2024".
+
+The index holds every subset of each owned name's tokens, so both checks are
+set lookups whose cost depends only on the required name's length. It is
+kept in Django's cache per user, keyed by the version of the user's
+documents read from the database (documents_version: their count and latest
+updated_at), so an upload, rename or delete handled by any process is seen
+by every other one straight away — the cache can be per-process. Scheme
+detail ETags are built from the same version.
+"""
+
+import itertools
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Document
+
+# Bump when normalization changes, so stale cached indexes are ignored
+INDEX_VERSION = 1
+
+# Tokens beyond this many are left out of the subset index
+MAX_INDEXED_TOKENS = 8
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+_FILLER_TOKENS = frozenset((
+    'a', 'an', 'and', 'the', 'of', 'for', 'or', 'by', 'from', 'issued', 'copy', 'copies', 'card', 'document',
+    'documents', 'original', 'self', 'attested', 'photocopy', 'xerox', 'valid', 'latest', 'recent',
+))
+
+_TOKEN_ALIASES = {
+    'aadhar': 'aadhaar', 'adhaar': 'aadhaar', 'adhar': 'aadhaar', 'aadhaarcard': 'aadhaar', 'uidai': 'aadhaar',
+    'certificates': 'certificate', 'cert': 'certificate', 'proof': 'certificate',
+    'photo': 'photograph', 'photos': 'photograph', 'photographs': 'photograph',
+    'statement': 'passbook', 'marksheets': 'marksheet',
+    'domicile': 'residence', 'residential': 'residence', 'resident': 'residence',
+    'pancard': 'pan',
+}
+
+# Multi-word spellings replaced before tokenizing
+_PHRASE_ALIASES = (
+    (re.compile(r'\bmark\s*sheets?\b'), 'marksheet'),
+    (re.compile(r'\bpass\s*book\b'), 'passbook'),
+    (re.compile(r'\bbank\s+account\s+details\b'), 'bank passbook'),
+    (re.compile(r'\bsalary\s+slips?\b'), 'income certificate'),
+    (re.compile(r'\bpassport\s+size\b'), ''),
+)
+
+
+def tokens(name: str) -> frozenset:
+    """Canonical tokens of a document name."""
+    text = (name or '').lower()
+    for pattern, replacement in _PHRASE_ALIASES:
+        text = pattern.sub(replacement, text)
+    words = (_TOKEN_ALIASES.get(w, w) for w in _TOKEN_RE.findall(text))
+    return frozenset(w for w in words if w not in _FILLER_TOKENS)
+
+
+def _subsets(token_set: frozenset):
+    ordered = sorted(token_set)[:MAX_INDEXED_TOKENS]
+    for size in range(1, len(ordered) + 1):
+        yield from (frozenset(c) for c in itertools.combinations(ordered, size))
+
+
+class DocumentIndex:
+    """Owned document names of one user, for availability lookups."""
+
+    __slots__ = ('names', 'subsets')
+
+    def __init__(self, names):
+        # Token sets of owned names, and every non-empty subset of them
+        self.names = set()
+        self.subsets = set()
+        for name in names:
+            token_set = tokens(name)
+            if token_set:
+                self.names.add(token_set)
+                self.subsets.update(_subsets(token_set))
+
+    def __bool__(self):
+        return bool(self.names)
+
+    def has(self, required_name: str) -> bool:
+        """Whether the user owns a document matching `required_name`."""
+        required = tokens(required_name)
+        if not required or not self.names:
+            return False
+        if required in self.subsets:
+            return True
+        return any(subset in self.names for subset in _subsets(required))
+
+
+def documents_version(user_id: int) -> tuple:
+    """
+    (count, latest updated_at) of the user's documents, with one query. Every
+    upload or rename moves the latest time and every delete the count.
+    """
+    stats = Document.objects.filter(user_id=user_id).aggregate(count=Count('id'), latest=Max('updated_at'))
+    return stats['count'], stats['latest']
+
+
+def _cache_key(user_id: int, version: tuple) -> str:
+    count, latest = version
+    stamp = latest.timestamp() if latest else 0
+    return f'accounts:document_index:v{INDEX_VERSION}:{user_id}:{count}:{stamp}'
+
+
+def get_document_index(user_id: int, version: tuple | None = None) -> DocumentIndex:
+    """
+    The user's index at `version` (read from the database when not given),
+    from the cache or built with one query.
+    """
+    key = _cache_key(user_id, version or documents_version(user_id))
+    index = cache.get(key)
+    if index is None:
+        index = DocumentIndex(Document.objects.filter(user_id=user_id).values_list('name', flat=True))
+        cache.set(key, index, getattr(settings, 'ELIGIFY_DOCUMENT_INDEX_TTL', 3600))
+    return index
@@ -32,6 +32,9 @@ class UserProfile(models.Model):
     # Family (stored as JSON)
     family_members = models.JSONField(default=list, blank=True)
 
+    # Bumped on every save, including the one that follows each User save
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
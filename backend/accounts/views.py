@@ -10,9 +10,23 @@ from django.http import FileResponse
 from allauth.socialaccount.models import SocialAccount
 from .serializers import RegisterSerializer, UserSerializer, UserProfileUpdateSerializer, FullProfileUpdateSerializer, UserProfileSerializer, DocumentSerializer
 from .models import UserProfile, Document
+from eligify.conditional import make_etag, not_modified, set_validators
 import requests
 import urllib.parse
 
+def _profile_field_values(profile):
+    """Current value of every concrete UserProfile field, keyed by field name."""
+    return {f.attname: getattr(profile, f.attname) for f in UserProfile._meta.concrete_fields}
+
+
+def _reevaluate_changed_schemes(user, before):
+    """Re-run stored scheme evaluations that depend on profile fields changed since `before`."""
+    from eligify.reevaluation import reevaluate_for_changed_fields
+    after = _profile_field_values(user.profile)
+    changed = [field for field, value in before.items() if after[field] != value]
+    return reevaluate_for_changed_fields(user, changed)
+
+
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
     return {
@@ -97,6 +111,11 @@ class UserProfileUpdateView(generics.UpdateAPIView):
     def get_object(self):
         return self.request.user.profile
 
+    def perform_update(self, serializer):
+        before = _profile_field_values(serializer.instance)
+        serializer.save()
+        _reevaluate_changed_schemes(self.request.user, before)
+
 
 class UserProfileDetailView(views.APIView):
     """GET endpoint to retrieve the full profile with completion data."""
@@ -105,10 +124,15 @@ class UserProfileDetailView(views.APIView):
     def get(self, request):
         user = request.user
         profile = user.profile
-        return Response({
+        # Every User save also saves the profile, so updated_at covers both
+        etag = make_etag(user.id, profile.updated_at)
+        cached = not_modified(request, etag, profile.updated_at)
+        if cached is not None:
+            return cached
+        return set_validators(Response({
             'user': UserSerializer(user).data,
             'profile_completion': profile.profile_completion,
-        })
+        }), etag, profile.updated_at)
 
 
 class FullProfileUpdateView(views.APIView):
@@ -119,12 +143,16 @@ class FullProfileUpdateView(views.APIView):
         profile = request.user.profile
         serializer = FullProfileUpdateSerializer(profile, data=request.data, partial=True)
         if serializer.is_valid():
+            before = _profile_field_values(profile)
             serializer.save()
             # Refresh profile from DB to get updated completion
             profile.refresh_from_db()
+            # Keep stored scheme evaluations in step with the changed fields
+            reevaluated = _reevaluate_changed_schemes(request.user, before)
             return Response({
                 'user': UserSerializer(request.user).data,
                 'profile_completion': profile.profile_completion,
+                'reevaluated_schemes': reevaluated,
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
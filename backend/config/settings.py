@@ -75,7 +75,12 @@ AUTHENTICATION_BACKENDS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # orjson when installed, DRF's JSON renderer otherwise (eligify.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'eligify.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 from datetime import timedelta
@@ -99,6 +104,11 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',  # Required for allauth
 ]
 
+# Gzip API responses (not the chat's event streams); off by default since a
+# reverse proxy usually compresses instead
+if os.getenv('ELIGIFY_GZIP_RESPONSES', '').lower() in ('1', 'true', 'yes'):
+    MIDDLEWARE.insert(1, 'eligify.middleware.GZipResponsesMiddleware')
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -174,8 +184,89 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Gemini extraction cache (eligify.extraction_cache)
+ELIGIFY_EXTRACTION_CACHE_MAX_ENTRIES = 2000
+ELIGIFY_EXTRACTION_CACHE_TTL_DAYS = 90
+
+# Per-string translation cache (eligify.localization)
+ELIGIFY_TRANSLATION_CACHE_MAX_ENTRIES = 20000
+
+# Shared cache of chat answers (eligify.answer_cache). SIMILARITY is the
+# trigram similarity (0-1) at which a differently worded question matches.
+ELIGIFY_ANSWER_CACHE_MAX_ENTRIES = 5000
+ELIGIFY_ANSWER_CACHE_TTL_DAYS = 7
+ELIGIFY_ANSWER_CACHE_SIMILARITY = 0.8
+
+# Django cache: rendered scheme details (eligify.detail_cache) and document
+# indexes (accounts.document_index). Entries are keyed by versions read from
+# the database, so a per-process cache never serves stale data; local memory
+# by default, set ELIGIFY_CACHE_DIR to share hits between processes.
+if os.getenv('ELIGIFY_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('ELIGIFY_CACHE_DIR'),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'eligify',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+    }
+
+# Seconds a rendered scheme detail payload is cached (eligify.detail_cache)
+ELIGIFY_SCHEME_DETAIL_CACHE_TTL = 3600
+
+# Seconds a user's cached document-name index (accounts.document_index) is
+# kept; document changes drop it straight away.
+ELIGIFY_DOCUMENT_INDEX_TTL = 3600
+
+# Background upload processing (eligify.pipeline). Set to 0 to leave queued
+# uploads to `manage.py run_upload_worker` processes.
+ELIGIFY_UPLOAD_WORKERS = 2
+
+# Upload jobs with no progress for this many seconds are requeued (jobs left
+# behind by a restart or a crashed worker), up to ELIGIFY_UPLOAD_MAX_ATTEMPTS
+# tries; the in-process pool checks every ELIGIFY_UPLOAD_SWEEP_INTERVAL seconds.
+ELIGIFY_UPLOAD_STALL_TIMEOUT = 900
+ELIGIFY_UPLOAD_MAX_ATTEMPTS = 3
+ELIGIFY_UPLOAD_SWEEP_INTERVAL = 60
+
+# Worker processes used to parse PDF pages in parallel (eligify.pdf_text)
+ELIGIFY_PDF_WORKERS = min(4, os.cpu_count() or 1)
+
+# LLM backend behind eligify.services (see eligify.llm): 'gemini', 'record'
+# (Gemini, saving responses), 'replay' (saved responses only) or 'fake'
+# (deterministic local model with latency and error injection).
+ELIGIFY_LLM_PROVIDER = os.getenv('ELIGIFY_LLM_PROVIDER', 'gemini')
+ELIGIFY_LLM_RECORDINGS_DIR = BASE_DIR / 'llm_recordings'
+ELIGIFY_LLM_FAKE_LATENCY = 0.5  # seconds per call, +/- 50%
+ELIGIFY_LLM_FAKE_RATE_LIMIT_RATE = 0.0  # fraction of calls answered with 429
+ELIGIFY_LLM_FAKE_MALFORMED_JSON_RATE = 0.0  # fraction of JSON responses truncated
+ELIGIFY_LLM_FAKE_SEED = 0
+
+# Shared Gemini quota and circuit breaker (eligify.quota). Match RPM/BURST to
+# the API key's tier; bulk (upload) calls leave INTERACTIVE_RESERVE tokens for
+# chat and language switches, which wait at most INTERACTIVE_MAX_WAIT seconds.
+ELIGIFY_GEMINI_RPM = 10
+ELIGIFY_GEMINI_BURST = 10
+ELIGIFY_GEMINI_INTERACTIVE_RESERVE = 2
+ELIGIFY_GEMINI_INTERACTIVE_MAX_WAIT = 10  # seconds
+ELIGIFY_GEMINI_BREAKER_COOLDOWN = 30  # seconds, doubled on consecutive trips
+ELIGIFY_GEMINI_BREAKER_MAX_COOLDOWN = 600  # seconds
+
+# Lifetime of explicit Gemini context caches for chat (eligify.chat_context).
+# 0 sends the scheme context inline each turn, relying on implicit caching;
+# explicit caching is not available on every API tier.
+ELIGIFY_GEMINI_CONTEXT_CACHE_TTL = 0  # seconds
+
 CORS_ALLOW_ALL_ORIGINS = True # Allow all origins for dev
 CORS_ALLOW_CREDENTIALS = True  # Allow cookies for OAuth flow
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor']  # My Evaluations pagination
 
 # CSRF Settings
 CSRF_TRUSTED_ORIGINS = ['http://localhost:3000', 'http://127.0.0.1:8000', 'http://localhost:8000']
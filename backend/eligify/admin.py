@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SchemeEvaluation
+from .models import AnswerCache, ChatMessage, ExtractionCache, GeminiQuota, SchemeEvaluation, TranslationCache, UploadJob
 
 
 @admin.register(SchemeEvaluation)
@@ -8,3 +8,49 @@ class SchemeEvaluationAdmin(admin.ModelAdmin):
     list_filter = ['status', 'language_preference', 'category']
     search_fields = ['scheme_name', 'user__username']
     readonly_fields = ['scheme_id', 'created_at']
+
+
+@admin.register(ChatMessage)
+class ChatMessageAdmin(admin.ModelAdmin):
+    list_display = ['scheme', 'sender', 'text', 'created_at']
+    list_filter = ['sender']
+    search_fields = ['text', 'scheme__scheme_name']
+    raw_id_fields = ['scheme']
+
+
+@admin.register(ExtractionCache)
+class ExtractionCacheAdmin(admin.ModelAdmin):
+    list_display = ['content_hash', 'language', 'prompt_version', 'hits', 'created_at', 'last_used_at']
+    list_filter = ['language', 'prompt_version']
+    search_fields = ['content_hash']
+    readonly_fields = ['created_at', 'last_used_at']
+
+
+@admin.register(TranslationCache)
+class TranslationCacheAdmin(admin.ModelAdmin):
+    list_display = ['source_text', 'language', 'translated_text', 'hits', 'last_used_at']
+    list_filter = ['language', 'prompt_version']
+    search_fields = ['source_text', 'translated_text']
+    readonly_fields = ['created_at', 'last_used_at']
+
+
+@admin.register(AnswerCache)
+class AnswerCacheAdmin(admin.ModelAdmin):
+    list_display = ['question', 'scope_hash', 'hits', 'created_at', 'last_used_at']
+    list_filter = ['prompt_version']
+    search_fields = ['question', 'answer']
+    readonly_fields = ['created_at', 'last_used_at']
+
+
+@admin.register(UploadJob)
+class UploadJobAdmin(admin.ModelAdmin):
+    list_display = ['job_id', 'user', 'scheme_name', 'stage', 'attempts', 'created_at', 'updated_at']
+    list_filter = ['stage', 'language']
+    search_fields = ['scheme_name', 'user__username']
+    readonly_fields = ['job_id', 'created_at', 'started_at', 'updated_at']
+
+
+@admin.register(GeminiQuota)
+class GeminiQuotaAdmin(admin.ModelAdmin):
+    list_display = ['name', 'tokens', 'consecutive_trips', 'rate_limited', 'breaker_trips',
+                    'rejected_interactive', 'rejected_bulk']
@@ -0,0 +1,156 @@
+"""
+Cache of chat answers for questions users of a scheme keep asking ("what
+documents do I need", "how do I apply").
+
+An answer is reused for the same normalized question asked in the same
+scope: the same scheme content (rules, documents, steps, benefits), the
+same evaluation — including the user's own value and the detail for each
+rule, since the chat context shows them to the model — and the same
+language, under the same chat prompt. Users who uploaded the same PDF and
+evaluated identically share answers; an answer that mentions one user's
+income or age is never served to a user with different values.
+Near-duplicate wordings match through character-trigram similarity, but
+only against cached questions with the same signature: the same numbers
+and negation words. "income is 2 lakh" vs "3 lakh" or "documents do I
+need" vs "do I not need" score high on trigrams yet ask different things,
+so they never match. The signature is indexed, so a lookup only scores
+the few questions sharing it.
+
+Only a chat's opening question is looked up and stored, since later
+answers lean on the conversation so far.
+Entries expire after ELIGIFY_ANSWER_CACHE_TTL_DAYS and are evicted
+least-recently-used beyond ELIGIFY_ANSWER_CACHE_MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AnswerCache
+from .relevance import tokenize
+from .services import CHAT_ERROR_MESSAGE, CHAT_PROMPT_VERSION, CHAT_RATE_LIMITED_MESSAGE
+
+logger = logging.getLogger(__name__)
+
+# Questions compared for similarity per lookup (most recently used first)
+MAX_CANDIDATES = 50
+
+# Words that reverse a question; "t" is what's left of "can't", "don't", ...
+_NEGATIONS = frozenset((
+    'not', 'no', 'never', 'without', 'nor', 'except', 'neither', 't', 'cannot', 'cant', 'dont', 'doesnt',
+    'isnt', 'arent', 'wont', 'didnt', 'nahi', 'नहीं', 'नाही', 'ना',
+))
+
+
+def normalize_question(question: str) -> str:
+    """Lower-cased words without punctuation or extra whitespace."""
+    return ' '.join(tokenize(question))
+
+
+def question_signature(normalized: str) -> str:
+    """Hash of a normalized question's numbers and negation words, which near-duplicates must share."""
+    key = sorted({t for t in normalized.split() if t in _NEGATIONS or any(c.isdigit() for c in t)})
+    return hashlib.sha256(' '.join(key).encode('utf-8')).hexdigest()
+
+
+def _trigrams(text: str) -> set:
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of two normalized questions' character trigrams."""
+    ta, tb = _trigrams(a), _trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def scope_hash(scheme) -> str:
+    """Hash of everything besides the question that an answer depends on."""
+    scope = [
+        scheme.language_preference, scheme.status, scheme.match_percentage,
+        scheme.scheme_name, scheme.ministry, scheme.benefit_summary, scheme.max_benefit, scheme.category,
+        scheme.extracted_rules, scheme.required_documents, scheme.application_steps,
+        scheme.deadline, scheme.official_portal,
+        # The whole evaluation, user values included, as render_context() shows it
+        scheme.evaluation_result,
+    ]
+    encoded = json.dumps(scope, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _question_hash(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _ttl_cutoff():
+    return timezone.now() - timedelta(days=getattr(settings, 'ELIGIFY_ANSWER_CACHE_TTL_DAYS', 7))
+
+
+def get_cached_answer(scheme, question: str) -> str | None:
+    """Return a cached answer to `question` (or a near-duplicate of it), or None on a miss."""
+    normalized = normalize_question(question)
+    if not normalized:
+        return None
+    entries = AnswerCache.objects.filter(
+        scope_hash=scope_hash(scheme),
+        prompt_version=CHAT_PROMPT_VERSION,
+        last_used_at__gte=_ttl_cutoff(),
+    )
+
+    entry = entries.filter(question_hash=_question_hash(normalized)).only('pk', 'answer').first()
+    if entry is None:
+        threshold = getattr(settings, 'ELIGIFY_ANSWER_CACHE_SIMILARITY', 0.8)
+        best_score = threshold
+        candidates = entries.filter(signature=question_signature(normalized)).order_by('-last_used_at')
+        for pk, cached_question in candidates.values_list('pk', 'question')[:MAX_CANDIDATES]:
+            score = similarity(normalized, cached_question)
+            if score >= best_score:
+                best_score, entry = score, pk
+        if entry is None:
+            return None
+        entry = AnswerCache.objects.only('pk', 'answer').get(pk=entry)
+
+    AnswerCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+    logger.info(f"Answer cache hit for scheme {scheme.scheme_id}")
+    return entry.answer
+
+
+def store_answer(scheme, question: str, answer: str):
+    """Cache an answer unless it is an error message."""
+    normalized = normalize_question(question)
+    if not normalized or not answer or answer in (CHAT_ERROR_MESSAGE, CHAT_RATE_LIMITED_MESSAGE):
+        return
+    key = {'scope_hash': scope_hash(scheme), 'question_hash': _question_hash(normalized),
+           'prompt_version': CHAT_PROMPT_VERSION}
+    try:
+        with transaction.atomic():
+            AnswerCache.objects.create(**key, question=normalized, signature=question_signature(normalized),
+                                       answer=answer, last_used_at=timezone.now())
+    except IntegrityError:
+        # The same question was answered concurrently
+        AnswerCache.objects.filter(**key).update(answer=answer, last_used_at=timezone.now())
+    evict()
+
+
+def evict():
+    """Drop entries from old prompt versions, past the TTL, or beyond the size limit (LRU)."""
+    AnswerCache.objects.exclude(prompt_version=CHAT_PROMPT_VERSION).delete()
+    AnswerCache.objects.filter(last_used_at__lt=_ttl_cutoff()).delete()
+
+    max_entries = getattr(settings, 'ELIGIFY_ANSWER_CACHE_MAX_ENTRIES', 5000)
+    overflow_pks = list(AnswerCache.objects.order_by('-last_used_at').values_list('pk', flat=True)[max_entries:])
+    if overflow_pks:
+        AnswerCache.objects.filter(pk__in=overflow_pks).delete()
+
+
+def clear():
+    """Remove every cached answer."""
+    AnswerCache.objects.all().delete()
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class EligifyConfig(AppConfig):
     name = 'eligify'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from . import pipeline
+
+        # Resume uploads left behind by a restart once the server takes requests
+        request_started.connect(pipeline.start_sweeper, dispatch_uid='eligify.pipeline.start_sweeper')
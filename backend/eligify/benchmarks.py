@@ -0,0 +1,253 @@
+"""
+Timing helpers for the eligibility engine.
+
+Evaluates the synthetic rule sets and profiles from eligify.synthetic and
+measures evaluate_eligibility() throughput and latency per operator mix.
+
+Used by `python manage.py bench_engine`. run_pipeline_benchmark() times
+whole uploads instead, for `python manage.py bench_pipeline`.
+"""
+
+import hashlib
+import random
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from .engine import ProfileSnapshot, evaluate_eligibility
+from .synthetic import OPERATOR_MIXES, format_inr, generate_profile, generate_rules
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmark(
+    mix: str,
+    evaluations: int = 20000,
+    rule_sets: int = 200,
+    profiles: int = 500,
+    seed: int = 42,
+) -> dict:
+    """
+    Time `evaluations` calls of evaluate_eligibility() for one operator mix,
+    cycling through pre-generated rule sets and profile snapshots.
+
+    Returns {'mix', 'evaluations', 'evals_per_sec', 'p50_us', 'p99_us', 'mean_us'}.
+    """
+    rng = random.Random(seed)
+    operators = OPERATOR_MIXES[mix]
+    rule_lists = [generate_rules(rng, operators) for _ in range(rule_sets)]
+    snapshots = [ProfileSnapshot.from_dict(generate_profile(rng)) for _ in range(profiles)]
+
+    # Warm the plan cache, as a long-running server would be
+    for rules in rule_lists:
+        evaluate_eligibility(snapshots[0], rules)
+
+    timings = []
+    perf_counter_ns = time.perf_counter_ns
+    started = perf_counter_ns()
+    for i in range(evaluations):
+        rules = rule_lists[i % rule_sets]
+        snapshot = snapshots[(i * 7) % profiles]
+        t0 = perf_counter_ns()
+        evaluate_eligibility(snapshot, rules)
+        timings.append(perf_counter_ns() - t0)
+    elapsed = (perf_counter_ns() - started) / 1e9
+
+    timings.sort()
+    return {
+        'mix': mix,
+        'evaluations': evaluations,
+        'evals_per_sec': round(evaluations / elapsed),
+        'p50_us': round(_percentile(timings, 50) / 1000, 2),
+        'p99_us': round(_percentile(timings, 99) / 1000, 2),
+        'mean_us': round(statistics.fmean(timings) / 1000, 2),
+    }
+
+
+BENCH_USERNAME = 'bench-pipeline'
+
+
+def run_pipeline_benchmark(pdf_path: Path, jobs: int = 20, workers: int = 2, language: str = 'English') -> dict:
+    """
+    Queue `jobs` uploads of one PDF and process them with `workers` threads
+    through eligify.pipeline, using whichever LLM provider is configured.
+    Everything the run created is deleted afterwards.
+
+    Returns {'jobs', 'workers', 'done', 'failed', 'errors', 'elapsed_s',
+    'jobs_per_sec', 'p50_s', 'p95_s', 'mean_s', 'extraction'}; latencies run
+    from queueing to completion, and 'extraction' counts the run's
+    extractions that were repaired locally, retried or failed.
+    """
+    from django.contrib.auth.models import User
+    from django.core.files.base import ContentFile
+    from django.db import close_old_connections, connection
+
+    from .models import ExtractionCache, SchemeEvaluation, UploadJob
+    from .pipeline import run_pending_jobs
+    from .quota import snapshot
+
+    user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+    content = Path(pdf_path).read_bytes()
+    run_id = time.time_ns()
+
+    job_ids = []
+    content_hashes = []
+    for i in range(jobs):
+        # A trailing PDF comment gives each upload its own hash, so none hit the extraction cache
+        data = content + f'\n% bench {run_id} {i}\n'.encode('ascii')
+        content_hashes.append(hashlib.sha256(data).hexdigest())
+        job = UploadJob(user=user, language=language)
+        job.source_pdf.save(f'bench_{i}.pdf', ContentFile(data), save=False)
+        job.save()
+        job_ids.append(job.job_id)
+
+    def worker():
+        close_old_connections()
+        try:
+            run_pending_jobs()
+        finally:
+            connection.close()
+
+    extraction_before = snapshot()['extraction']
+    threads = [threading.Thread(target=worker, name=f'bench-{n}') for n in range(max(workers, 1))]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    extraction_after = snapshot()['extraction']
+
+    finished = list(UploadJob.objects.filter(job_id__in=job_ids))
+    latencies = sorted((job.updated_at - job.created_at).total_seconds() for job in finished)
+    done = sum(1 for job in finished if job.stage == UploadJob.STAGE_DONE)
+    errors = {}
+    for job in finished:
+        if job.stage == UploadJob.STAGE_FAILED:
+            errors[job.error_status] = errors.get(job.error_status, 0) + 1
+
+    # Clean up: stored PDFs, schemes, jobs and their cached extractions
+    for job in finished:
+        job.source_pdf.delete(save=False)
+    SchemeEvaluation.objects.filter(scheme_id__in=[j.scheme_id for j in finished if j.scheme_id]).delete()
+    UploadJob.objects.filter(job_id__in=job_ids).delete()
+    ExtractionCache.objects.filter(content_hash__in=content_hashes).delete()
+
+    return {
+        'jobs': jobs,
+        'workers': workers,
+        'done': done,
+        'failed': len(finished) - done,
+        'errors': errors,
+        'elapsed_s': round(elapsed, 2),
+        'jobs_per_sec': round(done / elapsed, 2) if elapsed else 0.0,
+        'p50_s': round(_percentile(latencies, 50), 2) if latencies else 0.0,
+        'p95_s': round(_percentile(latencies, 95), 2) if latencies else 0.0,
+        'mean_s': round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        'extraction': {
+            key: extraction_after[key] - extraction_before[key] for key in ('count', 'repaired', 'retried', 'failed')
+        },
+    }
+
+
+PAYLOAD_BENCH_USERNAME = 'bench-payloads'
+
+# SchemeDetail keys the scheme page's header card shows
+HEADER_FIELDS = frozenset((
+    'id', 'name', 'ministry', 'matchPercent', 'eligibility', 'category', 'deadline', 'benefitSummary', 'maxBenefit',
+))
+
+
+def _median_us(fn, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        fn()
+        timings.append(time.perf_counter_ns() - t0)
+    return round(statistics.median(timings) / 1000, 1)
+
+
+def run_payload_benchmark(schemes: int = 50, messages: int = 50, rounds: int = 50, seed: int = 42) -> list:
+    """
+    Build `schemes` synthetic evaluations (the first with `messages` chat
+    messages) for a throwaway user, then time serializing and rendering the
+    scheme detail (full and header fields only) and the My Evaluations list
+    with DRF's JSON renderer and FastJSONRenderer. The user and everything
+    created for it are deleted afterwards.
+
+    Returns one {'payload', 'renderer', 'serialize_us', 'render_us', 'bytes',
+    'gzip_bytes'} dict per payload and renderer; times are medians of `rounds`.
+    """
+    import gzip
+
+    from django.contrib.auth.models import User
+    from rest_framework.renderers import JSONRenderer
+
+    from .chat_history import append_exchange
+    from .evaluations import evaluations_page
+    from .llm import FAKE_DOCUMENTS
+    from .models import SchemeEvaluation
+    from .renderers import FastJSONRenderer
+    from .serializers import SchemeDetailSerializer, SchemeEvaluationListSerializer
+
+    rng = random.Random(seed)
+    User.objects.filter(username=PAYLOAD_BENCH_USERNAME).delete()
+    user = User.objects.create(username=PAYLOAD_BENCH_USERNAME)
+    snapshot = ProfileSnapshot.from_dict(generate_profile(rng))
+    try:
+        created = []
+        for i in range(max(schemes, 1)):
+            rules = generate_rules(rng, OPERATOR_MIXES['mixed'], min_rules=6, max_rules=12)
+            result = evaluate_eligibility(snapshot, rules)
+            created.append(SchemeEvaluation(
+                user=user,
+                scheme_name=f'Synthetic Scheme {i}',
+                ministry='Ministry of Benchmarks',
+                benefit_summary='Financial assistance for eligible applicants, paid in instalments. ' * 3,
+                max_benefit=format_inr(rng.choice([6000, 12000, 50000])) + '/year',
+                category='Education',
+                tags=['benchmark', 'synthetic'],
+                extracted_rules=rules,
+                required_documents=[{'name': name, 'digilocker': dl} for name, dl in FAKE_DOCUMENTS],
+                application_steps=[
+                    {'step': n, 'title': f'Step {n}', 'description': 'Complete this step on the scheme portal. ' * 2}
+                    for n in range(1, 7)
+                ],
+                evaluation_result=result,
+                match_percentage=result.get('match_percentage', 0),
+                status=result.get('status', 'Not Eligible'),
+            ))
+        SchemeEvaluation.objects.bulk_create(created)
+        scheme = SchemeEvaluation.objects.get(pk=created[0].pk)
+        for n in range(messages // 2):
+            append_exchange(scheme, f'Question {n} about documents and deadlines?', 'An answer in markdown. ' * 12)
+
+        def detail(fields):
+            return lambda: SchemeDetailSerializer(scheme, context={'fields': fields, 'exclude': set()}).data
+
+        def evaluation_list():
+            page, _ = evaluations_page(user, limit=schemes)
+            return SchemeEvaluationListSerializer(page, many=True).data
+
+        results = []
+        for payload, build in (('detail', detail(None)), ('detail-header', detail(HEADER_FIELDS)),
+                               ('list', evaluation_list)):
+            data = build()
+            serialize_us = _median_us(build, rounds)
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                body = renderer.render(data)
+                results.append({
+                    'payload': payload,
+                    'renderer': type(renderer).__name__,
+                    'serialize_us': serialize_us,
+                    'render_us': _median_us(lambda: renderer.render(data), rounds),
+                    'bytes': len(body),
+                    'gzip_bytes': len(gzip.compress(body)),
+                })
+        return results
+    finally:
+        user.delete()
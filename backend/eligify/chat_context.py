@@ -0,0 +1,132 @@
+"""
+Compact chat context for a scheme.
+
+Every chat turn used to pretty-print the whole scheme and evaluation as
+JSON into the prompt. Instead, the scheme is rendered once as terse text —
+each rule merged with its evaluation, empty fields dropped — into the chat
+system instruction, which is stored on the SchemeEvaluation with a
+fingerprint of its inputs. It is rebuilt only when the fingerprint changes
+(new rules, a re-evaluation, a language switch or a new chat prompt).
+
+The unchanged instruction also lets Gemini's implicit prefix caching kick
+in, and with ELIGIFY_GEMINI_CONTEXT_CACHE_TTL set it is uploaded once as an
+explicit context cache, so later turns send only the conversation.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .services import CHAT_PROMPT_VERSION, build_chat_system_instruction, create_context_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when render_context() changes
+CONTEXT_VERSION = 1
+
+# Re-create an explicit cache this long before it would expire
+CACHE_REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def _fingerprint(scheme) -> str:
+    inputs = [
+        CONTEXT_VERSION, CHAT_PROMPT_VERSION, scheme.language_preference,
+        scheme.scheme_name, scheme.ministry, scheme.benefit_summary, scheme.max_benefit, scheme.category,
+        scheme.extracted_rules, scheme.required_documents, scheme.application_steps,
+        scheme.deadline, scheme.official_portal, scheme.evaluation_result,
+    ]
+    encoded = json.dumps(inputs, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _value(value) -> str:
+    if isinstance(value, list):
+        return ', '.join(str(v) for v in value)
+    return str(value)
+
+
+def render_context(scheme) -> str:
+    """The scheme and the user's evaluation as compact text for the chat prompt."""
+    lines = []
+    for label, value in (
+        ('Scheme', scheme.scheme_name), ('Ministry', scheme.ministry), ('Category', scheme.category),
+        ('Benefit', scheme.benefit_summary), ('Max benefit', scheme.max_benefit),
+        ('Deadline', scheme.deadline), ('Portal', scheme.official_portal),
+    ):
+        if value:
+            lines.append(f"{label}: {value}")
+
+    evaluation = scheme.evaluation_result or {}
+    conditions = evaluation.get('conditions') or []
+    if evaluation:
+        lines.append(
+            f"Overall: {evaluation.get('status', scheme.status)}, "
+            f"{evaluation.get('match_percentage', scheme.match_percentage)}% of rules met"
+        )
+    if conditions:
+        lines.append("Rules [status] label: required | user's value | detail")
+        for c in conditions:
+            parts = [f"required {c['required']}" if c.get('required') else '']
+            parts.append(f"user {c['yourValue']}" if c.get('yourValue') else '')
+            parts.append(c.get('detail') or '')
+            lines.append(f"- [{c.get('status')}] {c.get('label')}: " + ' | '.join(p for p in parts if p))
+    elif scheme.extracted_rules:
+        lines.append("Rules: label: requirement | detail")
+        for rule in scheme.extracted_rules:
+            if isinstance(rule, dict):
+                requirement = f"{rule.get('field')} {rule.get('operator')} {_value(rule.get('value'))}"
+                detail = f" | {rule['detail']}" if rule.get('detail') else ''
+                lines.append(f"- {rule.get('label') or rule.get('field')}: {requirement}{detail}")
+
+    documents = []
+    for doc in scheme.required_documents or []:
+        if isinstance(doc, dict):
+            name = doc.get('name', '')
+            documents.append(f"{name} (DigiLocker)" if doc.get('digilocker') else name)
+        elif doc:
+            documents.append(str(doc))
+    if documents:
+        lines.append("Documents: " + '; '.join(d for d in documents if d))
+
+    steps = [s for s in scheme.application_steps or [] if isinstance(s, dict)]
+    if steps:
+        lines.append("How to apply:")
+        for i, step in enumerate(steps, 1):
+            description = f" — {step['description']}" if step.get('description') else ''
+            lines.append(f"{step.get('step', i)}. {step.get('title', '')}{description}")
+
+    return '\n'.join(lines)
+
+
+def get_chat_context(scheme) -> tuple:
+    """
+    Return (system_instruction, cached_content name or None) for chatting
+    about `scheme`, rebuilding and saving the stored context if it is stale.
+    """
+    update_fields = []
+    fingerprint = _fingerprint(scheme)
+    if scheme.chat_context_fingerprint != fingerprint or not scheme.chat_context:
+        scheme.chat_context = build_chat_system_instruction(render_context(scheme), scheme.language_preference)
+        scheme.chat_context_fingerprint = fingerprint
+        scheme.chat_context_cache = ''
+        scheme.chat_context_cache_expires_at = None
+        update_fields += ['chat_context', 'chat_context_fingerprint', 'chat_context_cache',
+                          'chat_context_cache_expires_at']
+
+    ttl = getattr(settings, 'ELIGIFY_GEMINI_CONTEXT_CACHE_TTL', 0)
+    now = timezone.now()
+    expires_at = scheme.chat_context_cache_expires_at
+    if ttl > 0 and (not expires_at or expires_at - CACHE_REFRESH_MARGIN <= now):
+        name = create_context_cache(scheme.chat_context, ttl)
+        # Remember a failed attempt too, so it is retried once per TTL rather than every turn
+        scheme.chat_context_cache = name or ''
+        scheme.chat_context_cache_expires_at = now + timedelta(seconds=ttl)
+        update_fields += ['chat_context_cache', 'chat_context_cache_expires_at']
+
+    if update_fields:
+        scheme.save(update_fields=list(dict.fromkeys(update_fields + ['updated_at'])))
+    return scheme.chat_context, scheme.chat_context_cache or None
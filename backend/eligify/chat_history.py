@@ -0,0 +1,66 @@
+"""
+Append-only chat storage.
+
+Each message is its own ChatMessage row, so sending one is an insert and a
+counter update instead of rewriting the scheme's whole history, and two
+messages sent at once can't overwrite each other. History is read in pages,
+newest first, with a keyset cursor (eligify.keyset) on (created_at, id)
+that the (scheme, created_at, id) index serves directly.
+"""
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import keyset
+from .models import ChatMessage, SchemeEvaluation
+
+# Messages of history sent to Gemini with each question
+PROMPT_HISTORY_MESSAGES = 10
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def append_exchange(scheme: SchemeEvaluation, question: str, answer: str) -> list:
+    """Store a question and its answer and count the question. Returns the two messages."""
+    now = timezone.now()
+    messages = [
+        ChatMessage(scheme=scheme, sender=ChatMessage.SENDER_USER, text=question, created_at=now),
+        ChatMessage(scheme=scheme, sender=ChatMessage.SENDER_AI, text=answer, created_at=now),
+    ]
+    with transaction.atomic():
+        ChatMessage.objects.bulk_create(messages)
+        SchemeEvaluation.objects.filter(pk=scheme.pk).update(chat_count=F('chat_count') + 1, updated_at=now)
+    scheme.chat_count += 1
+    scheme.updated_at = now
+    return messages
+
+
+def recent_history(scheme: SchemeEvaluation, limit: int = PROMPT_HISTORY_MESSAGES) -> list:
+    """The last `limit` messages, oldest first, as {'sender', 'text'} dicts."""
+    rows = list(
+        ChatMessage.objects.filter(scheme=scheme).order_by('-created_at', '-id').values('sender', 'text')[:limit]
+    )
+    rows.reverse()
+    return rows
+
+
+def history_page(scheme: SchemeEvaluation, before: str | None = None, limit: int = DEFAULT_PAGE_SIZE) -> tuple:
+    """
+    One page of messages older than the `before` cursor (the newest page if
+    None), oldest first, and the cursor for the next older page or None.
+    """
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    messages, next_cursor = keyset.page(ChatMessage.objects.filter(scheme=scheme), before, limit, key='id')
+    messages.reverse()
+    return messages, next_cursor
+
+
+def serialize_message(message: ChatMessage) -> dict:
+    return {
+        'id': message.id,
+        'sender': message.sender,
+        'text': message.text,
+        'created_at': message.created_at.isoformat(),
+    }
@@ -0,0 +1,232 @@
+"""
+Translate a scheme's eligibility rules into ORM filters over UserProfile.
+
+Answers "which registered users satisfy scheme X" in the database instead
+of loading every profile into Python. Each rule is compiled to a Q object
+where its semantics can be reproduced in SQL:
+
+- string fields: ==, !=, in, not_in, exists on a lower-cased, trimmed column
+- annual_income / marks_percentage: numeric operators on an annotated
+  column that strips currency symbols, '%' and separators before casting
+- age: numeric operators become ranges on dob as of a reference date
+- boolean fields: == true/false and exists
+
+Anything else (family_members_count, unusual value types, ...) is
+evaluated with the engine in Python on the rows the SQL part lets through
+(cohort_pks()), streamed with only the profile columns rules read.
+A user is in the cohort only if every rule is satisfied (status Eligible).
+"""
+
+import math
+from datetime import date
+
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast, Lower, Replace, Trim
+
+from accounts.models import UserProfile
+
+from .engine import ProfileSnapshot, compile_rules
+
+STRING_FIELDS = ('state', 'gender', 'occupation', 'education_level', 'category', 'area_type')
+NUMERIC_TEXT_FIELDS = ('annual_income', 'marks_percentage')
+BOOLEAN_FIELDS = ('minority_status', 'disability_status')
+
+# Tokens the engine strips before parsing a number (see engine._parse_numeric)
+_NUMERIC_NOISE = ['₹', 'Rs', 'Rs.', 'INR', '%', ',', ' ']
+_NUMBER_PATTERN = r'^[+-]?([0-9]+\.?[0-9]*|\.[0-9]+)$'
+
+_NOTHING = Q(pk__in=[])
+
+
+class CohortFilter:
+    """SQL-side filter for a rule list plus the rules left for Python."""
+
+    __slots__ = ('q', 'annotations', 'fallback_rules', 'pushed_down')
+
+    def __init__(self):
+        self.q = Q()
+        self.annotations = {}
+        self.fallback_rules = []
+        self.pushed_down = 0
+
+
+def _norm(field: str) -> str:
+    return f'_norm_{field}'
+
+
+def _num(field: str) -> str:
+    return f'_num_{field}'
+
+
+def _numeric_annotations(field: str) -> dict:
+    cleaned = F(field)
+    for token in _NUMERIC_NOISE:
+        cleaned = Replace(cleaned, Value(token), Value(''))
+    return {
+        f'_clean_{field}': Trim(cleaned),
+        _num(field): Case(
+            When(**{f'_clean_{field}__regex': _NUMBER_PATTERN}, then=Cast(f'_clean_{field}', FloatField())),
+            default=None,
+            output_field=FloatField(),
+        ),
+    }
+
+
+def _present(field: str) -> Q:
+    return Q(**{f'{field}__isnull': False}) & ~Q(**{field: ''})
+
+
+def _birthday_cutoff(reference_date: date, years: int) -> date | None:
+    """Latest dob that makes someone at least `years` old on reference_date."""
+    year = reference_date.year - years
+    if not date.min.year <= year <= date.max.year:
+        return None
+    try:
+        return reference_date.replace(year=year)
+    except ValueError:  # 29 Feb in a non-leap year
+        return reference_date.replace(year=year, day=28)
+
+
+def _age_at_least(years: int, reference_date: date) -> Q:
+    cutoff = _birthday_cutoff(reference_date, years)
+    if cutoff is None:
+        return _NOTHING if years > 0 else Q(dob__isnull=False)
+    return Q(dob__lte=cutoff)
+
+
+def _age_at_most(years: int, reference_date: date) -> Q:
+    return Q(dob__isnull=False) & ~_age_at_least(years + 1, reference_date)
+
+
+def _age_q(rule, reference_date: date) -> Q | None:
+    op, number = rule.operator, rule.number
+    if op in ('<', '>', '<=', '>='):
+        if number is None:
+            return _NOTHING
+        if op == '>=':
+            return _age_at_least(math.ceil(number), reference_date)
+        if op == '>':
+            return _age_at_least(math.floor(number) + 1, reference_date)
+        if op == '<=':
+            return _age_at_most(math.floor(number), reference_date)
+        return _age_at_most(math.ceil(number) - 1, reference_date)
+    if op == 'between':
+        if rule.bounds is None:
+            return _NOTHING
+        low, high = rule.bounds
+        return _age_at_least(math.ceil(low), reference_date) & _age_at_most(math.floor(high), reference_date)
+    if op in ('==', '!=') and number is not None and not isinstance(rule.expected_value, bool):
+        if number.is_integer():
+            eq = _age_at_least(int(number), reference_date) & _age_at_most(int(number), reference_date)
+        else:
+            eq = _NOTHING
+        return eq if op == '==' else Q(dob__isnull=False) & ~eq
+    if op in ('in', 'not_in') and rule.members is not None:
+        # The engine compares str(age) with each member, so only canonical
+        # integer strings can ever match.
+        ages = [int(m) for m in rule.members if m.lstrip('-').isdigit() and str(int(m)) == m]
+        eq = _NOTHING
+        for age in ages:
+            eq |= _age_at_least(age, reference_date) & _age_at_most(age, reference_date)
+        return eq if op == 'in' else Q(dob__isnull=False) & ~eq
+    return None
+
+
+def _rule_q(rule, cohort: CohortFilter, reference_date: date) -> Q | None:
+    """Q for one compiled rule being satisfied, or None if it can't be pushed down."""
+    field, op, expected = rule.field, rule.operator, rule.expected_value
+
+    if field == 'age':
+        return _age_q(rule, reference_date)
+
+    if field in BOOLEAN_FIELDS:
+        if op == '==' and isinstance(expected, bool):
+            return Q(**{field: expected})
+        if op == '!=' and isinstance(expected, bool):
+            return Q(**{field: not expected})
+        if op == 'exists':
+            return Q(**{field: True})
+        return None
+
+    if field not in STRING_FIELDS and field not in NUMERIC_TEXT_FIELDS:
+        return None
+
+    present = _present(field)
+    if op == 'exists':
+        return present
+
+    if op in ('==', '!=', 'in', 'not_in'):
+        if op in ('==', '!=') and isinstance(expected, str):
+            values = [expected.lower().strip()]
+        elif op in ('in', 'not_in') and rule.members is not None:
+            values = list(rule.members)
+        elif op in ('in', 'not_in'):
+            return _NOTHING
+        else:
+            return None
+        cohort.annotations[_norm(field)] = Lower(Trim(field))
+        match = Q(**{f'{_norm(field)}__in': values})
+        return present & match if op in ('==', 'in') else present & ~match
+
+    if field in NUMERIC_TEXT_FIELDS and op in ('<', '>', '<=', '>=', 'between'):
+        cohort.annotations.update(_numeric_annotations(field))
+        if op == 'between':
+            if rule.bounds is None:
+                return _NOTHING
+            return Q(**{f'{_num(field)}__gte': rule.bounds[0], f'{_num(field)}__lte': rule.bounds[1]})
+        if rule.number is None:
+            return _NOTHING
+        lookup = {'<': 'lt', '>': 'gt', '<=': 'lte', '>=': 'gte'}[op]
+        return Q(**{f'{_num(field)}__{lookup}': rule.number})
+
+    return None
+
+
+def compile_cohort_filter(extracted_rules, reference_date: date | None = None) -> CohortFilter:
+    """Split a rule list into a pushed-down Q (with annotations) and Python fallback rules."""
+    reference_date = reference_date or date.today()
+    plan = compile_rules(extracted_rules)
+    cohort = CohortFilter()
+    if not len(plan):
+        # No rules -> the engine never reports Eligible
+        cohort.q = _NOTHING
+        return cohort
+
+    for rule in plan.rules:
+        q = _rule_q(rule, cohort, reference_date)
+        if q is None:
+            cohort.fallback_rules.append(rule)
+        else:
+            cohort.q &= q
+            cohort.pushed_down += 1
+    return cohort
+
+
+def cohort_queryset(extracted_rules, reference_date: date | None = None, cohort: CohortFilter | None = None):
+    """
+    UserProfiles satisfying every pushed-down rule, ordered by pk. This is
+    the whole cohort only if cohort.fallback_rules is empty; otherwise use
+    cohort_pks().
+    """
+    reference_date = reference_date or date.today()
+    cohort = cohort or compile_cohort_filter(extracted_rules, reference_date)
+    return UserProfile.objects.annotate(**cohort.annotations).filter(cohort.q).order_by('pk')
+
+
+def cohort_pks(extracted_rules, reference_date: date | None = None, cohort: CohortFilter | None = None) -> list:
+    """
+    pks of the UserProfiles satisfying every rule, ascending. Rules that
+    can't be pushed down are checked in Python over the SQL-filtered rows.
+    """
+    reference_date = reference_date or date.today()
+    cohort = cohort or compile_cohort_filter(extracted_rules, reference_date)
+    queryset = cohort_queryset(extracted_rules, reference_date, cohort)
+    if not cohort.fallback_rules:
+        return list(queryset.values_list('pk', flat=True))
+
+    matching = []
+    for profile in queryset.only('pk', *ProfileSnapshot.RAW_FIELDS).iterator(chunk_size=2000):
+        snapshot = ProfileSnapshot.from_profile(profile, reference_date)
+        if all(rule.evaluate(rule.read_operand(snapshot)) == 'satisfied' for rule in cohort.fallback_rules):
+            matching.append(profile.pk)
+    return matching
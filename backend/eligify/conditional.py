@@ -0,0 +1,40 @@
+"""
+Conditional GET for endpoints the dashboard polls.
+
+Views build their validators — an ETag and a Last-Modified time — from
+version columns (`updated_at`, counts) before loading or serializing
+anything. A request whose If-None-Match (or If-Modified-Since) still
+matches gets a 304 straight away; otherwise the full response carries the
+validators, with `Cache-Control: private, no-cache` so browsers keep it and
+revalidate on every poll.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts) -> str:
+    """ETag value (unquoted) from the versions a response depends on."""
+    encoded = json.dumps(parts, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:32]
+
+
+def set_validators(response, etag: str, last_modified: datetime | None = None):
+    response['ETag'] = quote_etag(etag)
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def not_modified(request, etag: str, last_modified: datetime | None = None):
+    """A 304 (or 412 for a failed If-Match) if the request's preconditions decide it, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response = get_conditional_response(request, etag=quote_etag(etag), last_modified=timestamp)
+    if response is None:
+        return None
+    return set_validators(response, etag, last_modified)
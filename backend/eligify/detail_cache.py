@@ -0,0 +1,79 @@
+"""
+Cache of rendered scheme detail payloads.
+
+A scheme's detail (documents with availability, steps, conditions, the
+latest chat page) only changes when the scheme is saved or chatted on, or
+when the user's document vault changes, yet SchemeDetailSerializer rebuilds
+it on every GET. scheme_detail() looks the payload up here first
+(cache-aside, in Django's `default` cache) and stores it after rendering.
+
+Each entry is stored with the version it was rendered at — the scheme
+detail ETag, built from the scheme's updated_at and the version of the
+user's documents in the database — and is only served for that version,
+so writes that send no signals (queryset updates, bulk_update, other
+processes with their own local-memory cache) can't serve a stale payload. The post_save /
+post_delete signals in eligify.models drop entries straight away.
+
+Hit and miss counts are kept in the cache too (see stats()).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Bump when the rendered payload changes shape
+PAYLOAD_VERSION = 1
+
+_HITS_KEY = 'eligify:scheme_detail:hits'
+_MISSES_KEY = 'eligify:scheme_detail:misses'
+
+
+def _key(scheme_id) -> str:
+    return f'eligify:scheme_detail:v{PAYLOAD_VERSION}:{scheme_id}'
+
+
+def _count(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First count, or the counter was evicted
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_payload(scheme_id, version: str) -> dict | None:
+    """The cached payload for `scheme_id` rendered at `version`, or None."""
+    entry = cache.get(_key(scheme_id))
+    if entry is not None and entry[0] == version:
+        _count(_HITS_KEY)
+        return entry[1]
+    _count(_MISSES_KEY)
+    return None
+
+
+def store_payload(scheme_id, version: str, payload: dict):
+    cache.set(_key(scheme_id), (version, payload), getattr(settings, 'ELIGIFY_SCHEME_DETAIL_CACHE_TTL', 3600))
+
+
+def invalidate(scheme_ids):
+    """Drop the cached payloads of these schemes."""
+    cache.delete_many([_key(scheme_id) for scheme_id in scheme_ids])
+
+
+def invalidate_user(user_id: int):
+    """Drop the cached payloads of all of a user's schemes."""
+    from .models import SchemeEvaluation
+
+    invalidate(SchemeEvaluation.objects.filter(user_id=user_id).values_list('scheme_id', flat=True))
+
+
+def stats() -> dict:
+    """Hit and miss counts since the cache was last cleared."""
+    hits = cache.get(_HITS_KEY, 0)
+    misses = cache.get(_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'backend': settings.CACHES['default']['BACKEND'],
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,313 @@
+"""
+Predicate index for discovering schemes a profile may qualify for.
+
+Every distinct rule set stored in SchemeEvaluation.extracted_rules is
+indexed once:
+
+- Categorical predicates (state, gender, category, area_type) using
+  ==, !=, in, not_in go into an inverted index of value -> rejecting schemes.
+- Numeric predicates (age, annual_income, marks_percentage) using
+  <, <=, >, >=, between go into sorted bound arrays, so the schemes whose
+  bound excludes a value are a contiguous slice found by binary search.
+
+A query counts, per scheme, the indexed predicates the profile clearly
+does not satisfy. Since every failed rule lowers the match percentage,
+(rules - failed) / rules is an upper bound on a scheme's score; schemes
+whose bound is below `min_match` are pruned, so Partial matches survive
+just as they would in a full scan. Survivors are run through the full
+engine best bound first, stopping once no remaining bound can beat the
+results already found. Predicates whose profile value is missing never
+count as failed — filling in the profile could satisfy them.
+"""
+
+import bisect
+import logging
+import math
+import threading
+import time
+
+import numpy as np
+from django.db import connection
+from django.db.models import Count, Max
+
+from .engine import (
+    ProfileSnapshot, _is_missing, _normalize, _parse_numeric, compile_rules, evaluate_eligibility, rules_fingerprint,
+)
+from .models import SchemeEvaluation
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_FIELDS = ('state', 'gender', 'category', 'area_type')
+NUMERIC_FIELDS = ('age', 'annual_income', 'marks_percentage')
+
+# Minimum seconds between checks of whether the stored schemes changed
+INDEX_REFRESH_INTERVAL = 30
+
+
+class _CategoricalIndex:
+    """Inverted index for one categorical field."""
+
+    def __init__(self):
+        self.allowed = []     # (scheme id, frozenset of accepted values), one per == / in rule
+        self.disallowed = []  # (scheme id, frozenset of rejected values), one per != / not_in rule
+
+    def add(self, scheme_id: int, rule):
+        if rule.operator == '==' and isinstance(rule.expected_value, str):
+            self.allowed.append((scheme_id, frozenset([_normalize(rule.expected_value)])))
+        elif rule.operator == 'in' and rule.members is not None:
+            self.allowed.append((scheme_id, rule.members))
+        elif rule.operator == '!=' and isinstance(rule.expected_value, str):
+            self.disallowed.append((scheme_id, frozenset([_normalize(rule.expected_value)])))
+        elif rule.operator == 'not_in' and rule.members is not None:
+            self.disallowed.append((scheme_id, rule.members))
+        else:
+            return False
+        return True
+
+    def freeze(self, size: int):
+        """Build the value -> failed-rule-count arrays."""
+        accepted_by = {}
+        rejected_by = {}
+        for scheme_id, accepted in self.allowed:
+            for value in accepted:
+                accepted_by.setdefault(value, []).append(scheme_id)
+        for scheme_id, rejected in self.disallowed:
+            for value in rejected:
+                rejected_by.setdefault(value, []).append(scheme_id)
+
+        # A value no rule mentions fails every allow-list rule
+        self.fails_unknown = np.bincount(
+            np.array([scheme_id for scheme_id, _ in self.allowed], dtype=np.int64), minlength=size,
+        ).astype(np.int32)
+
+        self.fails = {}
+        for value in accepted_by.keys() | rejected_by.keys():
+            counts = self.fails_unknown.copy()
+            np.subtract.at(counts, accepted_by.get(value, []), 1)
+            np.add.at(counts, rejected_by.get(value, []), 1)
+            self.fails[value] = counts
+        del self.allowed, self.disallowed
+
+    def count(self, failed: np.ndarray, user_value: str):
+        failed += self.fails.get(_normalize(user_value), self.fails_unknown)
+
+
+class _NumericIndex:
+    """Sorted lower/upper bound arrays for one numeric field."""
+
+    def __init__(self):
+        # (bound kind, strict) -> list of (bound, scheme id)
+        self.bounds = {('lower', False): [], ('lower', True): [], ('upper', False): [], ('upper', True): []}
+
+    def add(self, scheme_id: int, rule):
+        op = rule.operator
+        if op == 'between' and rule.bounds is not None:
+            low, high = rule.bounds
+            if low > high:
+                # Fails for every value; counted once, as a lower bound nothing reaches
+                self.bounds[('lower', False)].append((math.inf, scheme_id))
+            else:
+                self.bounds[('lower', False)].append((low, scheme_id))
+                self.bounds[('upper', False)].append((high, scheme_id))
+        elif op in ('<', '<=', '>', '>=') and rule.number is not None:
+            kind = 'upper' if op in ('<', '<=') else 'lower'
+            self.bounds[(kind, len(op) == 1)].append((rule.number, scheme_id))
+        else:
+            return False
+        return True
+
+    def freeze(self, size: int):
+        self.sorted = {}
+        for key, entries in self.bounds.items():
+            entries.sort()
+            keys = np.array([b for b, _ in entries], dtype=float)
+            ids = np.array([i for _, i in entries], dtype=np.int64)
+            self.sorted[key] = (keys, ids)
+        del self.bounds
+
+    def count(self, failed: np.ndarray, value: float):
+        # value < lower (or == a strict lower) and value > upper (or == a strict upper)
+        size = len(failed)
+        keys, ids = self.sorted[('lower', False)]
+        failed += np.bincount(ids[np.searchsorted(keys, value, side='right'):], minlength=size).astype(np.int32)
+        keys, ids = self.sorted[('lower', True)]
+        failed += np.bincount(ids[np.searchsorted(keys, value, side='left'):], minlength=size).astype(np.int32)
+        keys, ids = self.sorted[('upper', False)]
+        failed += np.bincount(ids[:np.searchsorted(keys, value, side='left')], minlength=size).astype(np.int32)
+        keys, ids = self.sorted[('upper', True)]
+        failed += np.bincount(ids[:np.searchsorted(keys, value, side='right')], minlength=size).astype(np.int32)
+
+
+class SchemeIndex:
+    """Index over distinct rule sets, built from (rules, metadata) pairs."""
+
+    def __init__(self, rule_sets):
+        self.plans = []
+        self.meta = []
+        self.specificity = []
+        self.categorical = {f: _CategoricalIndex() for f in CATEGORICAL_FIELDS}
+        self.numeric = {f: _NumericIndex() for f in NUMERIC_FIELDS}
+
+        for rules, meta in rule_sets:
+            plan = compile_rules(rules, use_cache=False)
+            if not len(plan):
+                continue
+            scheme_id = len(self.plans)
+            indexed = 0
+            for rule in plan.rules:
+                if rule.field in self.categorical:
+                    indexed += self.categorical[rule.field].add(scheme_id, rule)
+                elif rule.field in self.numeric:
+                    indexed += self.numeric[rule.field].add(scheme_id, rule)
+            self.plans.append(plan)
+            self.meta.append(meta)
+            self.specificity.append(indexed)
+
+        size = len(self.plans)
+        for index in (*self.categorical.values(), *self.numeric.values()):
+            index.freeze(size)
+        self.totals = np.array([len(plan) for plan in self.plans], dtype=np.int64)
+        # Among equal scores, schemes with the most index-confirmed predicates
+        # rank first; rank[i] is scheme i's position in that order.
+        self.order = np.argsort(-np.array(self.specificity, dtype=np.int64), kind='stable')
+        self.rank = np.empty(size, dtype=np.int64)
+        self.rank[self.order] = np.arange(size)
+
+    def __len__(self):
+        return len(self.plans)
+
+    def max_match(self, profile: ProfileSnapshot) -> np.ndarray:
+        """Upper bound on each scheme's match percentage, from its failed indexed predicates."""
+        failed = np.zeros(len(self.plans), dtype=np.int32)
+        for field, index in self.categorical.items():
+            value = profile.get(field)
+            if isinstance(value, str) and not _is_missing(value):
+                index.count(failed, value)
+        for field, index in self.numeric.items():
+            value = _parse_numeric(profile.get(field))
+            if value is not None:
+                index.count(failed, value)
+        # Same arithmetic (and rounding) as evaluate_eligibility()
+        return np.round((self.totals - failed) / self.totals * 100)
+
+    def candidates(self, profile: ProfileSnapshot, min_match: int = 0) -> tuple:
+        """(scheme ids that may reach `min_match`, best bound first, and their bounds)."""
+        bounds = self.max_match(profile)
+        survivors = self.order[bounds[self.order] >= min_match]
+        # Stable, so equal bounds keep specificity order
+        survivors = survivors[np.argsort(-bounds[survivors], kind='stable')]
+        return survivors, bounds
+
+    def discover(self, profile: ProfileSnapshot, limit: int = 20, min_match: int = 50) -> dict:
+        """
+        The `limit` best schemes at or above `min_match` percent — the same
+        results as evaluating every scheme, without evaluating those whose
+        bound shows they can't make the list.
+        """
+        candidates, bounds = self.candidates(profile, min_match)
+        ranked = []  # ((-matchPercent, rank), scheme id, result), best first
+        for scheme_id in candidates:
+            if len(ranked) >= limit and bounds[scheme_id] < -ranked[-1][0][0]:
+                break
+            result = evaluate_eligibility(profile, self.plans[scheme_id])
+            if result['match_percentage'] < min_match:
+                continue
+            key = (-result['match_percentage'], int(self.rank[scheme_id]))
+            bisect.insort(ranked, (key, int(scheme_id), result))
+            del ranked[limit:]
+        return {
+            'results': [
+                {**self.meta[scheme_id], 'matchPercent': result['match_percentage'], 'status': result['status']}
+                for _, scheme_id, result in ranked
+            ],
+            'candidates': int(len(candidates)),
+            'indexed': len(self.plans),
+        }
+
+
+def _load_rule_sets():
+    """One (rules, metadata) pair per distinct rule content, oldest upload first."""
+    seen = {}
+    rows = SchemeEvaluation.objects.order_by('created_at').values_list(
+        'scheme_name', 'ministry', 'category', 'max_benefit', 'extracted_rules',
+    )
+    for name, ministry, category, max_benefit, rules in rows.iterator(chunk_size=2000):
+        if not rules:
+            continue
+        fingerprint = rules_fingerprint(rules)
+        if fingerprint in seen:
+            seen[fingerprint][1]['uploads'] += 1
+            continue
+        seen[fingerprint] = (rules, {
+            'fingerprint': fingerprint,
+            'name': name,
+            'ministry': ministry,
+            'category': category or 'Other',
+            'maxBenefit': max_benefit or 'Varies',
+            'uploads': 1,
+        })
+    return seen.values()
+
+
+_index = None
+_index_version = None
+_index_checked_at = 0.0
+_index_rebuilding = False
+_index_lock = threading.Lock()
+
+
+def _current_version():
+    # updated_at, not created_at: rules are rewritten in place (e.g. a language switch)
+    stats = SchemeEvaluation.objects.aggregate(count=Count('scheme_id'), latest=Max('updated_at'))
+    return stats['count'], stats['latest']
+
+
+def _build_index() -> SchemeIndex:
+    started = time.perf_counter()
+    index = SchemeIndex(_load_rule_sets())
+    logger.info(f"Built scheme index: {len(index)} rule sets in {time.perf_counter() - started:.2f}s")
+    return index
+
+
+def _rebuild_in_background(version):
+    global _index, _index_version, _index_rebuilding
+    try:
+        index = _build_index()
+    except Exception as e:
+        logger.error(f"Scheme index rebuild failed: {e}", exc_info=True)
+        index = None
+    finally:
+        connection.close()
+    with _index_lock:
+        if index is not None:
+            _index, _index_version = index, version
+        _index_rebuilding = False
+
+
+def get_scheme_index() -> SchemeIndex:
+    """
+    Return the process-wide SchemeIndex. The first call builds it; after
+    that, a change in the stored schemes triggers a background rebuild while
+    the previous index keeps serving. Change checks are rate-limited to
+    INDEX_REFRESH_INTERVAL seconds.
+    """
+    global _index, _index_version, _index_checked_at, _index_rebuilding
+
+    with _index_lock:
+        if _index is None:
+            version = _current_version()
+            _index, _index_version = _build_index(), version
+            _index_checked_at = time.monotonic()
+            return _index
+
+        now = time.monotonic()
+        if _index_rebuilding or now - _index_checked_at < INDEX_REFRESH_INTERVAL:
+            return _index
+        _index_checked_at = now
+        version = _current_version()
+        if version == _index_version:
+            return _index
+        _index_rebuilding = True
+
+    threading.Thread(target=_rebuild_in_background, args=(version,), daemon=True).start()
+    return _index
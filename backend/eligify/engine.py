@@ -5,8 +5,13 @@ Compares user profile fields against extracted rules using strict operators.
 NO AI is used here — purely rule-based evaluation.
 """
 
+import hashlib
+import json
 import logging
+import threading
+from collections import OrderedDict
 from datetime import date, datetime
+from operator import attrgetter
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +35,8 @@ def _parse_numeric(value) -> float | None:
         return None
 
 
-def _compute_age(dob) -> int | None:
-    """Compute age from a date or date string."""
+def _compute_age(dob, reference_date: date | None = None) -> int | None:
+    """Compute age (as of reference_date, default today) from a date or date string."""
     if not dob:
         return None
     if isinstance(dob, str):
@@ -44,113 +49,361 @@ def _compute_age(dob) -> int | None:
         else:
             return None
     if isinstance(dob, date):
-        today = date.today()
+        today = reference_date or date.today()
         return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
     return None
 
 
-def _get_user_value(profile_data: dict, field: str):
-    """Get domain-mapped value from the user profile dict."""
+def _count_members(members) -> int:
+    return len(members) if isinstance(members, list) else 0
+
+
+class ProfileSnapshot:
+    """
+    Typed view of one user profile, built once per evaluation pass.
+
+    Raw profile values are kept as-is (they are what the user sees in
+    'yourValue'); derived values — age, member count and the parsed
+    income/marks — are computed up front so rules only read attributes.
+    """
+
+    RAW_FIELDS = (
+        'state', 'gender', 'dob', 'occupation', 'education_level', 'marks_percentage',
+        'category', 'minority_status', 'disability_status', 'area_type', 'annual_income',
+        'family_members',
+    )
+    FIELDS = RAW_FIELDS + ('age', 'family_members_count')
+    # Fields whose numeric form is precomputed as '<field>_value'
+    NUMERIC_FIELDS = ('annual_income', 'marks_percentage')
+
+    __slots__ = FIELDS + ('annual_income_value', 'marks_percentage_value', 'extra')
+
+    def __init__(self, values: dict, reference_date: date | None = None, extra: dict | None = None):
+        for field in self.RAW_FIELDS:
+            setattr(self, field, values.get(field))
+        self.age = _compute_age(self.dob, reference_date)
+        self.family_members_count = _count_members(self.family_members)
+        self.annual_income_value = _parse_numeric(self.annual_income)
+        self.marks_percentage_value = _parse_numeric(self.marks_percentage)
+        self.extra = extra or {}
+
+    @classmethod
+    def from_profile(cls, profile, reference_date: date | None = None):
+        """Build a snapshot from an accounts.UserProfile instance."""
+        return cls({
+            'state': profile.state or '',
+            'gender': profile.gender or '',
+            'dob': profile.dob,
+            'occupation': profile.occupation or '',
+            'education_level': profile.education_level or '',
+            'marks_percentage': profile.marks_percentage or '',
+            'category': profile.category or '',
+            'minority_status': profile.minority_status,
+            'disability_status': profile.disability_status,
+            'area_type': profile.area_type or '',
+            'annual_income': profile.annual_income or '',
+            'family_members': profile.family_members or [],
+        }, reference_date)
+
+    @classmethod
+    def from_dict(cls, profile_data: dict, reference_date: date | None = None):
+        """Build a snapshot from a flat profile dict; unknown keys are kept in `extra`."""
+        extra = {k: v for k, v in profile_data.items() if k not in cls.FIELDS}
+        # Derived fields are always recomputed from their sources
+        return cls(profile_data, reference_date, extra)
+
+    def get(self, field: str):
+        """Value of a rule field, or None if the profile has no such field."""
+        if field in self.FIELDS:
+            return getattr(self, field)
+        return self.extra.get(field)
+
+
+def _get_user_value(profile_data, field: str):
+    """Get domain-mapped value from a ProfileSnapshot or user profile dict."""
+    if isinstance(profile_data, ProfileSnapshot):
+        return profile_data.get(field)
     if field == 'age':
         return _compute_age(profile_data.get('dob'))
     if field == 'family_members_count':
-        members = profile_data.get('family_members', [])
-        return len(members) if isinstance(members, list) else 0
+        return _count_members(profile_data.get('family_members', []))
     return profile_data.get(field)
 
 
-def _evaluate_rule(user_value, operator: str, expected_value) -> str:
-    """
-    Evaluate a single rule. Returns:
-      'satisfied'     — condition met
-      'not-satisfied' — condition clearly not met
-      'missing'       — user data is missing / cannot evaluate
-    """
-    if user_value is None or user_value == '' or user_value == []:
-        return 'missing'
+def _is_missing(user_value) -> bool:
+    return user_value is None or user_value == '' or user_value == []
+
+
+def _normalize(value) -> str:
+    return str(value).lower().strip()
+
+
+# ---------------------------------------------------------------------------
+# Operator compilers
+#
+# Each compiler receives the rule's expected value once and returns a check
+# ``fn(user_value) -> status``. All value parsing that depends only on the
+# rule happens here, so evaluating a compiled rule only runs comparisons.
+# Checks are only called with non-missing user values.
+# ---------------------------------------------------------------------------
+
+def _always_missing(user_value) -> str:
+    return 'missing'
+
+
+def _compile_eq(expected_value):
+    """Equality — boolean, case-insensitive string or numeric."""
+    expected_num = _parse_numeric(expected_value)
+    expected_str = str(expected_value)
+
+    def fallback(user_value) -> str:
+        if expected_num is not None:
+            uv = _parse_numeric(user_value)
+            if uv is not None:
+                return 'satisfied' if uv == expected_num else 'not-satisfied'
+        return 'satisfied' if str(user_value) == expected_str else 'not-satisfied'
 
-    op = operator.lower().strip()
+    if isinstance(expected_value, bool):
+        expected_lower = expected_str.lower()
 
-    # Boolean equality
-    if op == '==' or op == 'eq':
-        if isinstance(expected_value, bool):
+        def check(user_value) -> str:
             if isinstance(user_value, bool):
                 return 'satisfied' if user_value == expected_value else 'not-satisfied'
             # Handle string 'true'/'false'
-            return 'satisfied' if str(user_value).lower() == str(expected_value).lower() else 'not-satisfied'
-        # String equality (case-insensitive)
-        if isinstance(expected_value, str) and isinstance(user_value, str):
-            return 'satisfied' if user_value.lower().strip() == expected_value.lower().strip() else 'not-satisfied'
-        # Numeric equality
-        uv = _parse_numeric(user_value)
+            return 'satisfied' if str(user_value).lower() == expected_lower else 'not-satisfied'
+        return check
+
+    if isinstance(expected_value, str):
+        expected_norm = expected_value.lower().strip()
+
+        def check(user_value) -> str:
+            if isinstance(user_value, str):
+                return 'satisfied' if user_value.lower().strip() == expected_norm else 'not-satisfied'
+            return fallback(user_value)
+        return check
+
+    return fallback
+
+
+def _compile_neq(expected_value):
+    eq = _compile_eq(expected_value)
+
+    def check(user_value) -> str:
+        return 'not-satisfied' if eq(user_value) == 'satisfied' else 'satisfied'
+    return check
+
+
+def _compile_comparison(compare):
+    def compiler(expected_value):
         ev = _parse_numeric(expected_value)
-        if uv is not None and ev is not None:
-            return 'satisfied' if uv == ev else 'not-satisfied'
-        return 'satisfied' if str(user_value) == str(expected_value) else 'not-satisfied'
-
-    if op == '!=' or op == 'neq':
-        result = _evaluate_rule(user_value, '==', expected_value)
-        if result == 'satisfied':
-            return 'not-satisfied'
-        elif result == 'not-satisfied':
-            return 'satisfied'
-        return result
-
-    # Numeric comparisons
-    if op in ('<', '>', '<=', '>=', 'lt', 'gt', 'lte', 'gte'):
+        if ev is None:
+            return _always_missing
+
+        def check(user_value) -> str:
+            uv = _parse_numeric(user_value)
+            if uv is None:
+                return 'missing'
+            return 'satisfied' if compare(uv, ev) else 'not-satisfied'
+        return check
+    return compiler
+
+
+def _compile_membership(negate: bool):
+    def compiler(expected_value):
+        if not isinstance(expected_value, list):
+            return _always_missing
+        members = frozenset(_normalize(v) for v in expected_value)
+        hit, miss = ('not-satisfied', 'satisfied') if negate else ('satisfied', 'not-satisfied')
+
+        def check(user_value) -> str:
+            return hit if _normalize(user_value) in members else miss
+        return check
+    return compiler
+
+
+def _compile_between(expected_value):
+    if not (isinstance(expected_value, list) and len(expected_value) == 2):
+        return _always_missing
+    low = _parse_numeric(expected_value[0])
+    high = _parse_numeric(expected_value[1])
+    if low is None or high is None:
+        return _always_missing
+
+    def check(user_value) -> str:
         uv = _parse_numeric(user_value)
-        ev = _parse_numeric(expected_value)
-        if uv is None or ev is None:
+        if uv is None:
             return 'missing'
-        op_map = {
-            '<': uv < ev, 'lt': uv < ev,
-            '>': uv > ev, 'gt': uv > ev,
-            '<=': uv <= ev, 'lte': uv <= ev,
-            '>=': uv >= ev, 'gte': uv >= ev,
-        }
-        return 'satisfied' if op_map[op] else 'not-satisfied'
+        return 'satisfied' if low <= uv <= high else 'not-satisfied'
+    return check
 
-    # In / not_in
-    if op == 'in':
-        if isinstance(expected_value, list):
-            # Case-insensitive match for strings
-            user_str = str(user_value).lower().strip()
-            expected_lower = [str(v).lower().strip() for v in expected_value]
-            return 'satisfied' if user_str in expected_lower else 'not-satisfied'
-        return 'missing'
 
-    if op == 'not_in':
-        if isinstance(expected_value, list):
-            user_str = str(user_value).lower().strip()
-            expected_lower = [str(v).lower().strip() for v in expected_value]
-            return 'satisfied' if user_str not in expected_lower else 'not-satisfied'
-        return 'missing'
-
-    # Between
-    if op == 'between':
-        if isinstance(expected_value, list) and len(expected_value) == 2:
-            uv = _parse_numeric(user_value)
-            low = _parse_numeric(expected_value[0])
-            high = _parse_numeric(expected_value[1])
-            if uv is not None and low is not None and high is not None:
-                return 'satisfied' if low <= uv <= high else 'not-satisfied'
-        return 'missing'
-
-    # Exists
-    if op == 'exists':
+def _compile_exists(expected_value):
+    def check(user_value) -> str:
         return 'satisfied' if user_value else 'missing'
+    return check
+
+
+OPERATOR_COMPILERS = {
+    '==': _compile_eq, 'eq': _compile_eq,
+    '!=': _compile_neq, 'neq': _compile_neq,
+    '<': _compile_comparison(lambda uv, ev: uv < ev),
+    '>': _compile_comparison(lambda uv, ev: uv > ev),
+    '<=': _compile_comparison(lambda uv, ev: uv <= ev),
+    '>=': _compile_comparison(lambda uv, ev: uv >= ev),
+    'in': _compile_membership(negate=False),
+    'not_in': _compile_membership(negate=True),
+    'between': _compile_between,
+    'exists': _compile_exists,
+}
+
+NUMERIC_OPERATORS = frozenset(('<', '>', '<=', '>=', 'between'))
+
+OPERATOR_ALIASES = {
+    'eq': '==', 'neq': '!=',
+    'lt': '<', 'gt': '>', 'lte': '<=', 'gte': '>=',
+}
+
+
+# ---------------------------------------------------------------------------
+# Rule plans
+# ---------------------------------------------------------------------------
+
+class CompiledRule:
+    """A single rule with its operator resolved and expected value pre-parsed."""
+
+    __slots__ = (
+        'field', 'label', 'detail', 'operator', 'expected_value', 'required_display',
+        'number', 'bounds', 'members', 'check', 'read', 'read_operand',
+    )
+
+    def __init__(self, rule: dict):
+        self.field = rule.get('field', '')
+        self.label = rule.get('label', self.field)
+        self.detail = rule.get('detail', '')
+        op = str(rule.get('operator', 'exists')).lower().strip()
+        self.operator = OPERATOR_ALIASES.get(op, op)
+        self.expected_value = expected_value = rule.get('value')
+
+        # Pre-parsed forms of the expected value, for callers that evaluate
+        # plans in bulk (e.g. the what-if simulator).
+        self.number = _parse_numeric(expected_value)
+        self.bounds = None
+        self.members = None
+        if isinstance(expected_value, list):
+            if self.operator == 'between' and len(expected_value) == 2:
+                low, high = _parse_numeric(expected_value[0]), _parse_numeric(expected_value[1])
+                if low is not None and high is not None:
+                    self.bounds = (low, high)
+            self.members = frozenset(_normalize(v) for v in expected_value)
+
+        # Snapshot readers: `read` gives the raw value shown to the user,
+        # `read_operand` the value the check compares (pre-parsed for numeric
+        # operators on numeric fields).
+        if self.field in ProfileSnapshot.FIELDS:
+            self.read = attrgetter(self.field)
+        else:
+            field = self.field
+            self.read = lambda snapshot: snapshot.extra.get(field)
+        if self.operator in NUMERIC_OPERATORS and self.field in ProfileSnapshot.NUMERIC_FIELDS:
+            self.read_operand = attrgetter(f'{self.field}_value')
+        else:
+            self.read_operand = self.read
 
-    logger.warning(f"Unknown operator: {op}")
-    return 'missing'
+        compiler = OPERATOR_COMPILERS.get(self.operator)
+        if compiler is None:
+            logger.warning(f"Unknown operator: {self.operator}")
+            self.check = _always_missing
+        else:
+            self.check = compiler(expected_value)
+
+        if expected_value is None:
+            self.required_display = ''
+        elif isinstance(expected_value, list):
+            self.required_display = ', '.join(str(v) for v in expected_value)
+        else:
+            self.required_display = str(expected_value)
+
+    def evaluate(self, user_value) -> str:
+        """
+        Evaluate the rule. Returns:
+          'satisfied'     — condition met
+          'not-satisfied' — condition clearly not met
+          'missing'       — user data is missing / cannot evaluate
+        """
+        if _is_missing(user_value):
+            return 'missing'
+        return self.check(user_value)
+
+
+# Rule fields computed from a different profile field
+RULE_FIELD_SOURCES = {
+    'age': 'dob',
+    'family_members_count': 'family_members',
+}
+
+
+class RulePlan:
+    """An immutable, compiled form of a scheme's ``extracted_rules``."""
+
+    __slots__ = ('fingerprint', 'rules', 'profile_fields')
+
+    def __init__(self, fingerprint: str, rules: tuple):
+        self.fingerprint = fingerprint
+        self.rules = rules
+        # Profile fields the plan's outcome depends on
+        self.profile_fields = frozenset(RULE_FIELD_SOURCES.get(r.field, r.field) for r in rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+
+def rules_fingerprint(extracted_rules) -> str:
+    """Stable content hash of a rule list, independent of dict key order."""
+    payload = json.dumps(extracted_rules or [], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
 
 
-def evaluate_eligibility(profile_data: dict, extracted_rules: list) -> dict:
+PLAN_CACHE_SIZE = 512
+_plan_cache = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def compile_rules(extracted_rules, use_cache: bool = True) -> RulePlan:
+    """
+    Compile a rule list into a RulePlan, reusing a cached plan when a rule
+    list with the same content has been compiled before.
+
+    Pass use_cache=False for one-off bulk compilation (e.g. building an
+    index over every stored rule set) so the LRU isn't flushed.
+    """
+    fingerprint = rules_fingerprint(extracted_rules)
+    if not use_cache:
+        return RulePlan(fingerprint, tuple(CompiledRule(rule) for rule in extracted_rules or []))
+
+    with _plan_cache_lock:
+        plan = _plan_cache.get(fingerprint)
+        if plan is not None:
+            _plan_cache.move_to_end(fingerprint)
+            return plan
+
+    plan = RulePlan(fingerprint, tuple(CompiledRule(rule) for rule in extracted_rules or []))
+
+    with _plan_cache_lock:
+        _plan_cache[fingerprint] = plan
+        if len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+def evaluate_eligibility(profile_data, extracted_rules) -> dict:
     """
     Run all extracted rules against the user profile.
 
     Args:
-        profile_data: dict from UserProfile (flat fields + computed values)
-        extracted_rules: list of rule dicts from Gemini extraction
+        profile_data: ProfileSnapshot, or a flat profile dict (converted to a
+            snapshot as of today)
+        extracted_rules: list of rule dicts from Gemini extraction, or a
+            RulePlan already returned by compile_rules()
 
     Returns:
         {
@@ -161,8 +414,8 @@ def evaluate_eligibility(profile_data: dict, extracted_rules: list) -> dict:
             'status': 'Eligible' | 'Partial' | 'Not Eligible'
         }
     """
-    conditions = []
-    total_rules = len(extracted_rules) if extracted_rules else 0
+    plan = extracted_rules if isinstance(extracted_rules, RulePlan) else compile_rules(extracted_rules)
+    total_rules = len(plan)
 
     if total_rules == 0:
         return {
@@ -171,42 +424,35 @@ def evaluate_eligibility(profile_data: dict, extracted_rules: list) -> dict:
             'status': 'Not Eligible',
         }
 
-    satisfied_count = 0
+    if isinstance(profile_data, ProfileSnapshot):
+        snapshot = profile_data
+    else:
+        snapshot = ProfileSnapshot.from_dict(profile_data)
 
-    for rule in extracted_rules:
-        field = rule.get('field', '')
-        label = rule.get('label', field)
-        operator = rule.get('operator', 'exists')
-        expected_value = rule.get('value')
-        detail = rule.get('detail', '')
+    conditions = []
+    satisfied_count = 0
 
-        user_value = _get_user_value(profile_data, field)
-        status = _evaluate_rule(user_value, operator, expected_value)
+    for rule in plan.rules:
+        user_value = rule.read(snapshot)
+        status = rule.evaluate(rule.read_operand(snapshot))
 
         if status == 'satisfied':
             satisfied_count += 1
 
         # Format display values
         your_value_display = ''
-        if user_value is not None and user_value != '' and user_value != []:
+        if not _is_missing(user_value):
             your_value_display = str(user_value)
         elif status == 'missing':
             your_value_display = 'Not provided'
 
-        required_display = ''
-        if expected_value is not None:
-            if isinstance(expected_value, list):
-                required_display = ', '.join(str(v) for v in expected_value)
-            else:
-                required_display = str(expected_value)
-
         conditions.append({
-            'label': label,
+            'label': rule.label,
             'status': status,
-            'detail': detail,
+            'detail': rule.detail,
             'yourValue': your_value_display,
-            'required': required_display,
-            'field': field,
+            'required': rule.required_display,
+            'field': rule.field,
         })
 
     match_percentage = round((satisfied_count / total_rules) * 100)
@@ -0,0 +1,46 @@
+"""
+The My Evaluations list.
+
+A list card needs a handful of columns, so pages load only those (not the
+rules, evaluation, steps or chat context JSON), newest first with a keyset
+cursor (eligify.keyset) served by the (user, created_at, scheme_id) index.
+Filtering by status uses the (user, status, created_at) index instead.
+"""
+
+from . import keyset
+from .models import SchemeEvaluation
+
+# Columns SchemeEvaluationListSerializer reads
+LIST_FIELDS = (
+    'scheme_id', 'scheme_name', 'match_percentage', 'status', 'created_at', 'category', 'benefit_summary',
+    'chat_count',
+)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# ?status= values: the list's eligibility names or the stored statuses
+STATUS_FILTERS = {
+    'eligible': 'Eligible',
+    'partial': 'Partial',
+    'not-eligible': 'Not Eligible',
+}
+STATUS_FILTERS.update({value.lower(): value for value in STATUS_FILTERS.values()})
+
+
+def evaluations_page(user, before: str | None = None, limit: int = DEFAULT_PAGE_SIZE,
+                     status: str | None = None, category: str | None = None) -> tuple:
+    """
+    One page of the user's evaluations older than the `before` cursor,
+    newest first, and the cursor for the next page or None. Raises
+    ValueError for a malformed cursor or an unknown status.
+    """
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    queryset = SchemeEvaluation.objects.filter(user=user).only(*LIST_FIELDS)
+    if status:
+        if status.lower() not in STATUS_FILTERS:
+            raise ValueError(f"Unknown status: {status}")
+        queryset = queryset.filter(status=STATUS_FILTERS[status.lower()])
+    if category:
+        queryset = queryset.filter(category__iexact=category)
+    return keyset.page(queryset, before, limit, key='scheme_id')
@@ -0,0 +1,87 @@
+"""
+Persistent cache of Gemini rule extractions, keyed on the SHA-256 of the
+PDF bytes, the output language and the extraction prompt version.
+
+Re-uploads of the same official PDF skip both pdfplumber and Gemini.
+Entries are evicted least-recently-used beyond
+ELIGIFY_EXTRACTION_CACHE_MAX_ENTRIES, expire after
+ELIGIFY_EXTRACTION_CACHE_TTL_DAYS, and entries made under a previous
+EXTRACTION_PROMPT_VERSION are purged.
+"""
+
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ExtractionCache
+from .services import EXTRACTION_PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def hash_pdf(file_obj) -> str:
+    """SHA-256 of an uploaded file's bytes. Leaves the file positioned at the start."""
+    digest = hashlib.sha256()
+    if hasattr(file_obj, 'chunks'):
+        for chunk in file_obj.chunks():
+            digest.update(chunk)
+    else:
+        for chunk in iter(lambda: file_obj.read(1 << 20), b''):
+            digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def _ttl_cutoff():
+    return timezone.now() - timedelta(days=getattr(settings, 'ELIGIFY_EXTRACTION_CACHE_TTL_DAYS', 90))
+
+
+def get_cached_extraction(content_hash: str, language: str) -> dict | None:
+    """Return cached extraction data for this PDF/language, or None on a miss."""
+    entries = ExtractionCache.objects.filter(
+        content_hash=content_hash,
+        language=language,
+        prompt_version=EXTRACTION_PROMPT_VERSION,
+        last_used_at__gte=_ttl_cutoff(),
+    )
+    entry = entries.only('pk', 'extracted_data').first()
+    if entry is None:
+        return None
+    ExtractionCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_used_at=timezone.now())
+    logger.info(f"Extraction cache hit for {content_hash[:12]} ({language})")
+    return entry.extracted_data
+
+
+def store_extraction(content_hash: str, language: str, extracted_data: dict):
+    """Save an extraction result and evict stale or excess entries."""
+    key = {'content_hash': content_hash, 'language': language, 'prompt_version': EXTRACTION_PROMPT_VERSION}
+    # Insert, then update on conflict: update_or_create reads before writing in
+    # one transaction, which concurrent SQLite writers can deadlock on
+    try:
+        with transaction.atomic():
+            ExtractionCache.objects.create(**key, extracted_data=extracted_data, last_used_at=timezone.now())
+    except IntegrityError:
+        ExtractionCache.objects.filter(**key).update(extracted_data=extracted_data, last_used_at=timezone.now())
+    evict()
+
+
+def evict():
+    """Drop entries from old prompt versions, past the TTL, or beyond the size limit (LRU)."""
+    ExtractionCache.objects.exclude(prompt_version=EXTRACTION_PROMPT_VERSION).delete()
+    ExtractionCache.objects.filter(last_used_at__lt=_ttl_cutoff()).delete()
+
+    max_entries = getattr(settings, 'ELIGIFY_EXTRACTION_CACHE_MAX_ENTRIES', 2000)
+    overflow = ExtractionCache.objects.order_by('-last_used_at').values_list('pk', flat=True)[max_entries:]
+    overflow_pks = list(overflow)
+    if overflow_pks:
+        ExtractionCache.objects.filter(pk__in=overflow_pks).delete()
+
+
+def clear():
+    """Remove every cached extraction."""
+    ExtractionCache.objects.all().delete()
@@ -0,0 +1,351 @@
+"""
+Response schema, repair and validation for structured extraction.
+
+Gemini is asked for JSON matching EXTRACTION_RESPONSE_SCHEMA, which fixes
+the keys and their types. What comes back still goes through two local
+stages before the result is trusted, so most defects cost no second call:
+
+- repair_json() fixes cosmetic defects: markdown fences, prose around the
+  object, trailing commas, curly quotes used as delimiters, Python literals
+  (True/False/None) and raw control characters in strings. Truncated output
+  is not guessed at; it fails and the caller asks again.
+- validate_extraction() checks the required keys, fills optional ones with
+  their defaults, puts operators in canonical form and coerces rule values to
+  the types the engine compares ('₹2.5 lakh' -> 250000, 'Yes' -> true,
+  '18-40' -> [18, 40] for between, a scalar -> [scalar] for in/not_in), and
+  drops rules it cannot evaluate.
+"""
+
+import json
+import logging
+import re
+
+from google.genai import types as genai_types
+
+from .engine import NUMERIC_OPERATORS, OPERATOR_ALIASES, OPERATOR_COMPILERS, _parse_numeric
+
+logger = logging.getLogger(__name__)
+
+# Bump when the schema or the validation rules change
+SCHEMA_VERSION = 1
+
+REQUIRED_KEYS = ('scheme_name', 'eligibility_rules', 'required_documents', 'application_steps')
+
+CATEGORIES = ('Agriculture', 'Education', 'Healthcare', 'Employment', 'Housing', 'Finance', 'Social Welfare', 'Other')
+
+# Optional scalar keys and the value used when one is missing
+STRING_DEFAULTS = {
+    'ministry': '',
+    'category': 'Other',
+    'benefit_summary': '',
+    'max_benefit': 'Varies',
+    'deadline': 'Ongoing',
+    'official_portal': '',
+}
+
+# Rule fields compared as numbers, and as booleans
+NUMERIC_FIELDS = frozenset(('age', 'annual_income', 'marks_percentage', 'family_members_count'))
+BOOLEAN_FIELDS = frozenset(('minority_status', 'disability_status'))
+
+
+def _string(**kwargs):
+    return genai_types.Schema(type=genai_types.Type.STRING, **kwargs)
+
+
+_RULE_VALUE = genai_types.Schema(
+    nullable=True,
+    any_of=[
+        genai_types.Schema(type=genai_types.Type.NUMBER),
+        _string(),
+        genai_types.Schema(type=genai_types.Type.BOOLEAN),
+        genai_types.Schema(type=genai_types.Type.ARRAY, items=genai_types.Schema(
+            any_of=[genai_types.Schema(type=genai_types.Type.NUMBER), _string()],
+        )),
+    ],
+)
+
+EXTRACTION_RESPONSE_SCHEMA = genai_types.Schema(
+    type=genai_types.Type.OBJECT,
+    properties={
+        'scheme_name': _string(),
+        'ministry': _string(),
+        'category': _string(enum=list(CATEGORIES)),
+        'tags': genai_types.Schema(type=genai_types.Type.ARRAY, items=_string()),
+        'benefit_summary': _string(),
+        'max_benefit': _string(),
+        'deadline': _string(),
+        'official_portal': _string(),
+        'eligibility_rules': genai_types.Schema(type=genai_types.Type.ARRAY, items=genai_types.Schema(
+            type=genai_types.Type.OBJECT,
+            properties={
+                'field': _string(),
+                'label': _string(),
+                'operator': _string(enum=['==', '!=', '<', '>', '<=', '>=', 'in', 'not_in', 'exists', 'between']),
+                'value': _RULE_VALUE,
+                'detail': _string(),
+            },
+            required=['field', 'label', 'operator', 'value', 'detail'],
+            property_ordering=['field', 'label', 'operator', 'value', 'detail'],
+        )),
+        'required_documents': genai_types.Schema(type=genai_types.Type.ARRAY, items=genai_types.Schema(
+            type=genai_types.Type.OBJECT,
+            properties={'name': _string(), 'digilocker': genai_types.Schema(type=genai_types.Type.BOOLEAN)},
+            required=['name', 'digilocker'],
+            property_ordering=['name', 'digilocker'],
+        )),
+        'application_steps': genai_types.Schema(type=genai_types.Type.ARRAY, items=genai_types.Schema(
+            type=genai_types.Type.OBJECT,
+            properties={
+                'step': genai_types.Schema(type=genai_types.Type.INTEGER),
+                'title': _string(),
+                'description': _string(),
+            },
+            required=['step', 'title', 'description'],
+            property_ordering=['step', 'title', 'description'],
+        )),
+    },
+    required=list(REQUIRED_KEYS) + list(STRING_DEFAULTS) + ['tags'],
+    property_ordering=[
+        'scheme_name', 'ministry', 'category', 'tags', 'benefit_summary', 'max_benefit', 'deadline',
+        'official_portal', 'eligibility_rules', 'required_documents', 'application_steps',
+    ],
+)
+
+
+# ---------------------------------------------------------------------------
+# JSON repair
+# ---------------------------------------------------------------------------
+
+_FENCE_RE = re.compile(r'^```[\w-]*\s*\n?|\n?\s*```\s*$')
+_PY_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+_PY_LITERAL_RE = re.compile(r'True|False|None')
+_OPEN_QUOTES = '"“”'
+
+
+def _outermost(text: str) -> str:
+    """The text from the first '{' or '[' to the last matching closer, dropping prose around it."""
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    if not starts:
+        return text
+    start = min(starts)
+    end = text.rfind('}' if text[start] == '{' else ']')
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def _clean(text: str) -> str:
+    """Drop trailing commas, normalize curly delimiter quotes and Python literals outside strings."""
+    out = []
+    closer = None  # quote character that ends the current string, if inside one
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if closer is not None:
+            if ch == '\\':
+                out.append(text[i:i + 2])
+                i += 2
+                continue
+            if ch == closer or ch == '"':
+                out.append('"')
+                closer = None
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in _OPEN_QUOTES:
+            out.append('"')
+            closer = '"' if ch == '"' else '”'
+        elif ch in '}]':
+            while out and (out[-1].isspace() or out[-1] == ','):
+                out.pop()
+            out.append(ch)
+        else:
+            literal = _PY_LITERAL_RE.match(text, i)
+            if literal and not text[i - 1:i].isalnum() and not text[literal.end():literal.end() + 1].isalnum():
+                out.append(_PY_LITERALS[literal.group()])
+                i = literal.end()
+                continue
+            out.append(ch)
+        i += 1
+    return ''.join(out)
+
+
+def repair_json(raw: str) -> tuple:
+    """
+    Parse model output as JSON, repairing cosmetic defects if needed.
+    Returns (data, repaired). Raises json.JSONDecodeError if it can't be
+    repaired, e.g. when the output was cut off.
+    """
+    try:
+        return json.loads(raw), False
+    except json.JSONDecodeError:
+        pass
+    text = _FENCE_RE.sub('', raw.strip()).strip()
+    text = _clean(_outermost(text))
+    # strict=False accepts raw newlines and tabs inside strings
+    return json.loads(text, strict=False), True
+
+
+# ---------------------------------------------------------------------------
+# Validation and coercion
+# ---------------------------------------------------------------------------
+
+_OPERATOR_WORDS = {
+    '=': '==', 'equals': '==', 'equal': '==', 'is': '==',
+    'not_equals': '!=', 'not equal': '!=', '<>': '!=',
+    'less_than': '<', 'greater_than': '>', 'at_most': '<=', 'at_least': '>=',
+    'not in': 'not_in', 'notin': 'not_in', 'range': 'between',
+}
+_AMOUNT_UNITS = (('crore', 1e7), ('cr', 1e7), ('lakh', 1e5), ('lac', 1e5), ('k', 1e3))
+_CURRENCY_RE = re.compile(r'^(?:₹|rs\.?|inr)\s*', re.I)
+_AMOUNT_RE = re.compile(r'^([0-9][0-9,]*(?:\.[0-9]+)?)\s*(crores?|cr|lakhs?|lacs?|k)?\b', re.I)
+_RANGE_RE = re.compile(r'\s*(?:-|–|to|and)\s*', re.I)
+_TRUE_WORDS = frozenset(('true', 'yes', 'y', '1'))
+_FALSE_WORDS = frozenset(('false', 'no', 'n', '0'))
+
+
+def _number(value):
+    """A number from an amount like '₹2.5 lakh', 'Rs. 6,000/year' or '85%', or None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        # Drop the currency first: 'Rs. 500000' must not parse as '.500000'
+        value = _CURRENCY_RE.sub('', value.strip())
+    number = _parse_numeric(value)
+    if number is None and isinstance(value, str):
+        match = _AMOUNT_RE.match(value)
+        if match:
+            number = float(match.group(1).replace(',', ''))
+            unit = (match.group(2) or '').lower().rstrip('s')
+            number *= next((m for u, m in _AMOUNT_UNITS if unit == u), 1)
+    if number is None:
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    word = str(value).strip().lower()
+    if word in _TRUE_WORDS:
+        return True
+    if word in _FALSE_WORDS:
+        return False
+    return None
+
+
+def _canonical_operator(operator) -> str | None:
+    op = str(operator or '').strip().lower()
+    op = _OPERATOR_WORDS.get(op, OPERATOR_ALIASES.get(op, op))
+    return op if op in OPERATOR_COMPILERS else None
+
+
+def _coerce_value(field: str, operator: str, value):
+    """The rule value in the type the engine compares for this field and operator."""
+    if operator == 'exists':
+        return None
+    if operator in ('in', 'not_in'):
+        items = value if isinstance(value, list) else [value]
+        if len(items) == 1 and isinstance(items[0], str) and ',' in items[0]:
+            items = items[0].split(',')
+        return [i.strip() if isinstance(i, str) else i for i in items if i is not None and i != '']
+    if operator == 'between':
+        if isinstance(value, str):
+            value = _RANGE_RE.split(value.strip(), maxsplit=1)
+        if isinstance(value, list) and len(value) == 2:
+            bounds = [_number(v) for v in value]
+            if None not in bounds:
+                return sorted(bounds)
+        return value
+    if isinstance(value, list) and len(value) == 1:
+        value = value[0]
+    if field in BOOLEAN_FIELDS:
+        boolean = _boolean(value)
+        return value if boolean is None else boolean
+    if operator in NUMERIC_OPERATORS or field in NUMERIC_FIELDS:
+        number = _number(value)
+        return value if number is None else number
+    return value
+
+
+def _rule(raw) -> dict | None:
+    """A cleaned rule, or None if it can't be evaluated."""
+    if not isinstance(raw, dict):
+        return None
+    field = re.sub(r'\s+', '_', str(raw.get('field') or '').strip().lower())
+    operator = _canonical_operator(raw.get('operator', 'exists'))
+    if not field or operator is None:
+        return None
+    value = raw.get('value')
+    if operator in ('==', '!=') and isinstance(value, list) and len(value) > 1:
+        operator = 'in' if operator == '==' else 'not_in'
+    return {
+        'field': field,
+        'label': str(raw.get('label') or field),
+        'operator': operator,
+        'value': _coerce_value(field, operator, value),
+        'detail': str(raw.get('detail') or ''),
+    }
+
+
+def _document(raw) -> dict | None:
+    if isinstance(raw, str):
+        raw = {'name': raw}
+    if not isinstance(raw, dict) or not raw.get('name'):
+        return None
+    return {'name': str(raw['name']), 'digilocker': bool(_boolean(raw.get('digilocker', False)))}
+
+
+def _step(raw, number: int) -> dict | None:
+    if isinstance(raw, str):
+        raw = {'title': raw}
+    if not isinstance(raw, dict) or not (raw.get('title') or raw.get('description')):
+        return None
+    step = _number(raw.get('step'))
+    return {
+        'step': int(step) if step is not None else number,
+        'title': str(raw.get('title') or ''),
+        'description': str(raw.get('description') or ''),
+    }
+
+
+def validate_extraction(data) -> tuple:
+    """
+    Check and normalize parsed extraction data. Returns (data, fixes), where
+    fixes counts the values that had to be defaulted, coerced or dropped.
+    Raises ValueError if a required key is missing or has the wrong type.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON object, got {type(data).__name__}")
+    for key in REQUIRED_KEYS:
+        if key not in data:
+            raise ValueError(f"Missing required key: {key}")
+    for key in REQUIRED_KEYS[1:]:
+        if not isinstance(data[key], list):
+            raise ValueError(f"Expected a list for {key}")
+
+    result = {'scheme_name': str(data['scheme_name'] or '').strip()}
+    for key, default in STRING_DEFAULTS.items():
+        value = data.get(key)
+        result[key] = default if value in (None, '') else str(value).strip()
+    if result['category'] not in CATEGORIES:
+        result['category'] = next((c for c in CATEGORIES if c.lower() == result['category'].lower()), 'Other')
+    tags = data.get('tags')
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    result['tags'] = [str(t).strip() for t in tags or [] if str(t).strip()]
+
+    result['eligibility_rules'] = [r for r in map(_rule, data['eligibility_rules']) if r]
+    result['required_documents'] = [d for d in map(_document, data['required_documents']) if d]
+    result['application_steps'] = [
+        s for s in (_step(raw, i) for i, raw in enumerate(data['application_steps'], 1)) if s
+    ]
+
+    fixes = sum(1 for key in result if key not in data)
+    for key in ('eligibility_rules', 'required_documents', 'application_steps'):
+        fixes += sum(1 for before, after in zip(data[key], result[key]) if before != after)
+        fixes += len(data[key]) - len(result[key])
+    fixes += sum(1 for key in STRING_DEFAULTS if key in data and data[key] != result[key])
+    if fixes:
+        logger.info(f"Extraction validation fixed {fixes} values")
+    return result, fixes
@@ -0,0 +1,44 @@
+"""
+Keyset ("seek") pagination over (created_at, primary key), newest first.
+
+A cursor names the last row of a page; the next page is the rows strictly
+older than it, so pages stay stable while new rows are added and each one
+is a single index range scan instead of an OFFSET over everything before it.
+"""
+
+import base64
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(created_at: datetime, key) -> str:
+    raw = f"{created_at.isoformat()}|{key}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(created_at, key) from a cursor. Raises ValueError if it is malformed."""
+    try:
+        created_at, key = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), key
+    except (UnicodeError, TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor.') from e
+
+
+def page(queryset, before: str | None, limit: int, key: str = 'pk') -> tuple:
+    """
+    Rows of `queryset` older than the `before` cursor (the newest if None),
+    newest first, and the cursor for the next older page or None.
+    Raises ValueError if the cursor is malformed.
+    """
+    if before:
+        created_at, value = decode_cursor(before)
+        try:
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, **{f'{key}__lt': value}))
+        except (TypeError, ValidationError) as e:  # e.g. a key that isn't a valid UUID
+            raise ValueError('Invalid cursor.') from e
+    rows = list(queryset.order_by('-created_at', f'-{key}')[:limit + 1])
+    next_cursor = encode_cursor(rows[limit - 1].created_at, getattr(rows[limit - 1], key)) if len(rows) > limit else None
+    return rows[:limit], next_cursor
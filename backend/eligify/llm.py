@@ -0,0 +1,288 @@
+"""
+Pluggable LLM backends behind eligify.services.
+
+services talks to a client with the google-genai shape —
+`client.models.generate_content(model=, contents=, config=)`,
+`client.models.generate_content_stream(...)` and `client.caches.create(...)`
+— so retries, the shared quota, streaming and token accounting work the same
+whichever backend ELIGIFY_LLM_PROVIDER selects:
+
+- 'gemini': the real google-genai client (default).
+- 'record': the real client, saving every response under
+  ELIGIFY_LLM_RECORDINGS_DIR, keyed on the model, contents and config.
+- 'replay': answers only from those recordings, with no network or API key;
+  a request that was never recorded raises ReplayMiss.
+- 'fake': a deterministic local model. Extraction requests get valid
+  extraction JSON with synthetic rules, translations are tagged copies of
+  the input, and chat gets a short canned answer. ELIGIFY_LLM_FAKE_LATENCY
+  adds a delay per call, and ELIGIFY_LLM_FAKE_RATE_LIMIT_RATE /
+  ELIGIFY_LLM_FAKE_MALFORMED_JSON_RATE inject 429 RESOURCE_EXHAUSTED errors
+  and malformed JSON (half repairable, half truncated), for load tests and CI.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+
+from .synthetic import OPERATOR_MIXES, generate_rules
+
+PROVIDERS = ('gemini', 'record', 'replay', 'fake')
+
+
+class ReplayMiss(LookupError):
+    """A replayed request has no recording."""
+
+
+def create_client(provider: str, gemini_client_factory):
+    """Client for `provider`; gemini_client_factory() builds a real google-genai client."""
+    if provider == 'gemini':
+        return gemini_client_factory()
+    if provider == 'record':
+        return RecordReplayClient(_recordings_dir(), upstream=gemini_client_factory())
+    if provider == 'replay':
+        return RecordReplayClient(_recordings_dir())
+    if provider == 'fake':
+        return FakeClient(
+            latency=getattr(settings, 'ELIGIFY_LLM_FAKE_LATENCY', 0.5),
+            rate_limit_rate=getattr(settings, 'ELIGIFY_LLM_FAKE_RATE_LIMIT_RATE', 0.0),
+            malformed_json_rate=getattr(settings, 'ELIGIFY_LLM_FAKE_MALFORMED_JSON_RATE', 0.0),
+            seed=getattr(settings, 'ELIGIFY_LLM_FAKE_SEED', 0),
+        )
+    raise ImproperlyConfigured(f"ELIGIFY_LLM_PROVIDER must be one of {', '.join(PROVIDERS)}, not {provider!r}.")
+
+
+def _recordings_dir() -> Path:
+    return Path(getattr(settings, 'ELIGIFY_LLM_RECORDINGS_DIR', settings.BASE_DIR / 'llm_recordings'))
+
+
+def _response(text: str, prompt_tokens: int = 0) -> genai_types.GenerateContentResponse:
+    return genai_types.GenerateContentResponse(
+        candidates=[genai_types.Candidate(
+            content=genai_types.Content(role='model', parts=[genai_types.Part(text=text)]),
+            finish_reason='STOP',
+        )],
+        usage_metadata=genai_types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=len(text) // 4,
+            total_token_count=prompt_tokens + len(text) // 4,
+        ),
+    )
+
+
+def _unsupported_cache():
+    return genai_errors.ClientError(400, {'error': {
+        'code': 400, 'status': 'FAILED_PRECONDITION', 'message': 'Context caching is not available for this provider.',
+    }})
+
+
+# ---------------------------------------------------------------------------
+# Record / replay
+# ---------------------------------------------------------------------------
+
+def request_key(model: str, contents, config) -> str:
+    """Stable hash of a request; the HTTP timeout is left out."""
+    config_data = config.model_dump(mode='json', exclude_none=True, exclude={'http_options'}) if config else {}
+    encoded = json.dumps([model, contents, config_data], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class RecordReplayClient:
+    """Replays recorded responses; with an upstream client, records new ones first."""
+
+    def __init__(self, directory: Path, upstream=None):
+        self.directory = directory
+        self.upstream = upstream
+        self.models = _RecordReplayModels(self)
+        self.caches = _UnsupportedCaches()
+
+    def _path(self, kind: str, model: str, contents, config) -> Path:
+        return self.directory / f"{kind}-{request_key(model, contents, config)}.json"
+
+    def _load(self, path: Path) -> list:
+        try:
+            recording = json.loads(path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            raise ReplayMiss(f"No recorded response for this request ({path.name}).")
+        return [genai_types.GenerateContentResponse.model_validate(r) for r in recording['responses']]
+
+    def _save(self, path: Path, model: str, contents, responses: list):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        preview = contents if isinstance(contents, str) else json.dumps(contents, default=str)
+        recording = {
+            'model': model,
+            'request_preview': preview[:500],
+            'responses': [r.model_dump(mode='json', exclude_none=True) for r in responses],
+        }
+        # Write then rename, so a concurrent replay never reads half a file
+        tmp = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        tmp.write_text(json.dumps(recording, ensure_ascii=False, indent=1), encoding='utf-8')
+        tmp.replace(path)
+
+
+class _RecordReplayModels:
+    def __init__(self, client: RecordReplayClient):
+        self.client = client
+
+    def generate_content(self, model: str, contents, config=None):
+        path = self.client._path('generate', model, contents, config)
+        if self.client.upstream is None or path.exists():
+            return self.client._load(path)[0]
+        response = self.client.upstream.models.generate_content(model=model, contents=contents, config=config)
+        self.client._save(path, model, contents, [response])
+        return response
+
+    def generate_content_stream(self, model: str, contents, config=None):
+        path = self.client._path('stream', model, contents, config)
+        if self.client.upstream is None or path.exists():
+            yield from self.client._load(path)
+            return
+        chunks = []
+        for chunk in self.client.upstream.models.generate_content_stream(model=model, contents=contents, config=config):
+            chunks.append(chunk)
+            yield chunk
+        # Only complete streams are recorded
+        self.client._save(path, model, contents, chunks)
+
+
+class _UnsupportedCaches:
+    def create(self, model: str, config=None):
+        # Cache names differ per run and would make recordings unmatchable
+        raise _unsupported_cache()
+
+
+# ---------------------------------------------------------------------------
+# Deterministic fake
+# ---------------------------------------------------------------------------
+
+_TARGET_LANGUAGE_RE = re.compile(r'into (\w+)\.')
+_LAST_QUESTION_RE = re.compile(r'^User: (.*)$', re.M)
+
+FAKE_DOCUMENTS = [('Aadhaar Card', True), ('Income Certificate', True), ('Bank Passbook', False),
+                  ('Caste Certificate', True), ('Passport Size Photograph', False)]
+FAKE_CATEGORIES = ['Agriculture', 'Education', 'Healthcare', 'Employment', 'Housing', 'Finance', 'Social Welfare']
+
+
+class FakeClient:
+    """
+    Local stand-in for Gemini. Outputs depend only on the request, so runs
+    are reproducible; injected errors come from a seeded generator.
+    """
+
+    def __init__(self, latency: float = 0.5, rate_limit_rate: float = 0.0,
+                 malformed_json_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_json_rate = malformed_json_rate
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.models = _FakeModels(self)
+        self.caches = _FakeCaches()
+
+    def _roll(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _sleep(self):
+        if self.latency > 0:
+            # +/- 50% so concurrent calls don't finish in lockstep
+            time.sleep(self.latency * (0.5 + self._roll()))
+
+    def answer(self, contents, config) -> str:
+        """Response text for a request, raising an injected 429 if one is due."""
+        self._sleep()
+        if self._roll() < self.rate_limit_rate:
+            raise genai_errors.ClientError(429, {'error': {
+                'code': 429, 'status': 'RESOURCE_EXHAUSTED', 'message': 'Fake quota exhausted.',
+                'details': [{'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': '5s'}],
+            }})
+
+        text = contents if isinstance(contents, str) else json.dumps(contents, default=str)
+        if config is not None and (config.system_instruction or config.cached_content):
+            return self._chat(text)
+        if text.startswith('Translate each string'):
+            output = self._translation(text)
+        elif '"eligibility_rules"' in text:
+            output = self._extraction(text)
+        else:
+            return f"Fake response ({len(text)} prompt characters)."
+        if self._roll() < self.malformed_json_rate:
+            return self._malformed(output)
+        return output
+
+    def _malformed(self, output: str) -> str:
+        """Either defects that local repair fixes (a fence, prose, a trailing comma) or a cut-off response."""
+        if self._roll() < 0.5:
+            return f"Here is the JSON:\n```json\n{output[:-1]},{output[-1]}\n```"
+        return output[:len(output) // 2]
+
+    def _extraction(self, prompt: str) -> str:
+        pdf_text = prompt.split('--- PDF TEXT ---', 1)[-1].strip()
+        digest = hashlib.sha256(pdf_text.encode('utf-8')).digest()
+        rng = random.Random(digest)
+        first_line = next((line.strip() for line in pdf_text.splitlines() if line.strip()), 'Fake Scheme')
+        operators = [op for ops in OPERATOR_MIXES.values() for op in ops]
+        documents = rng.sample(FAKE_DOCUMENTS, rng.randint(2, len(FAKE_DOCUMENTS)))
+        return json.dumps({
+            'scheme_name': first_line[:120],
+            'ministry': 'Ministry of Testing',
+            'category': rng.choice(FAKE_CATEGORIES),
+            'tags': ['fake', f'scheme-{digest.hex()[:6]}'],
+            'benefit_summary': f'Financial assistance under {first_line[:60]}.',
+            'max_benefit': f'₹{rng.choice([6000, 12000, 25000, 50000]):,}/year',
+            'deadline': 'Ongoing',
+            'official_portal': '',
+            'eligibility_rules': generate_rules(rng, operators, min_rules=3, max_rules=8),
+            'required_documents': [{'name': name, 'digilocker': dl} for name, dl in documents],
+            'application_steps': [
+                {'step': i, 'title': title, 'description': f'{title} on the scheme portal.'}
+                for i, title in enumerate(['Register', 'Fill the application form', 'Upload documents', 'Submit'], 1)
+            ],
+        }, ensure_ascii=False)
+
+    def _translation(self, prompt: str) -> str:
+        # TRANSLATION_PROMPT ends with the strings as a one-line JSON array
+        strings = json.loads(prompt.strip().splitlines()[-1])
+        language = _TARGET_LANGUAGE_RE.search(prompt)
+        tag = language.group(1) if language else 'translated'
+        return json.dumps([f'[{tag}] {s}' for s in strings], ensure_ascii=False)
+
+    def _chat(self, contents: str) -> str:
+        questions = _LAST_QUESTION_RE.findall(contents)
+        question = questions[-1] if questions else contents
+        return (
+            f"### About your question\n\nYou asked: **{question.strip()}**\n\n"
+            "- This is a **fake** answer from the local LLM provider.\n"
+            "- Check the scheme's eligibility rules and documents above.\n"
+        )
+
+
+class _FakeModels:
+    def __init__(self, client: FakeClient):
+        self.client = client
+
+    def generate_content(self, model: str, contents, config=None):
+        text = self.client.answer(contents, config)
+        return _response(text, prompt_tokens=len(str(contents)) // 4)
+
+    def generate_content_stream(self, model: str, contents, config=None):
+        text = self.client.answer(contents, config)
+        words = text.split(' ')
+        for i in range(0, len(words), 8):
+            piece = ' '.join(words[i:i + 8]) + (' ' if i + 8 < len(words) else '')
+            yield _response(piece, prompt_tokens=len(str(contents)) // 4)
+
+
+class _FakeCaches:
+    def create(self, model: str, config=None):
+        instruction = (config.system_instruction if config else '') or ''
+        name = hashlib.sha256(str(instruction).encode('utf-8')).hexdigest()[:16]
+        return genai_types.CachedContent(name=f'cachedContents/fake-{name}', model=model)
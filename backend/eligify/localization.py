@@ -0,0 +1,172 @@
+"""
+Localization of extracted scheme data.
+
+Gemini extracts a scheme once, with human-readable strings in
+BASE_LANGUAGE (see services.extract_rules_from_pdf). Other languages are
+produced by translating just those strings — rule labels and details, the
+benefit summary, document names and application steps — while fields,
+operators and values stay untouched.
+
+Translations are cached per string in TranslationCache, so switching a
+scheme's language, or uploading another scheme with the same document
+names and steps, only sends strings that were never translated before.
+Entries made under a previous TRANSLATION_PROMPT_VERSION are purged and
+the table is trimmed least-recently-used beyond
+ELIGIFY_TRANSLATION_CACHE_MAX_ENTRIES.
+"""
+
+import copy
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from . import quota
+from .models import TranslationCache
+from .services import BASE_LANGUAGE, TRANSLATION_PROMPT_VERSION, translate_strings
+
+logger = logging.getLogger(__name__)
+
+# Strings per Gemini translation call
+TRANSLATION_BATCH_SIZE = 60
+
+
+def _map_strings(data: dict, fn) -> dict:
+    """Copy of `data` with fn applied to every human-readable string."""
+    data = copy.deepcopy(data)
+
+    def apply(obj, key):
+        value = obj.get(key)
+        if isinstance(value, str) and value.strip():
+            obj[key] = fn(value)
+
+    apply(data, 'benefit_summary')
+    for rule in data.get('eligibility_rules') or []:
+        if isinstance(rule, dict):
+            apply(rule, 'label')
+            apply(rule, 'detail')
+    documents = data.get('required_documents') or []
+    for i, doc in enumerate(documents):
+        if isinstance(doc, dict):
+            apply(doc, 'name')
+        elif isinstance(doc, str) and doc.strip():
+            documents[i] = fn(doc)
+    for step in data.get('application_steps') or []:
+        if isinstance(step, dict):
+            apply(step, 'title')
+            apply(step, 'description')
+    return data
+
+
+def collect_strings(data: dict) -> list:
+    """Distinct human-readable strings in extraction data, in first-seen order."""
+    seen = {}
+    _map_strings(data, lambda s: seen.setdefault(s, s))
+    return list(seen)
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def get_cached_translations(strings: list, language: str) -> dict:
+    """Return {source string: translation} for the strings already cached."""
+    by_hash = {_text_hash(s): s for s in strings}
+    entries = TranslationCache.objects.filter(
+        text_hash__in=list(by_hash),
+        language=language,
+        prompt_version=TRANSLATION_PROMPT_VERSION,
+    ).values_list('pk', 'text_hash', 'translated_text')
+
+    found = {}
+    pks = []
+    for pk, text_hash, translated in entries:
+        found[by_hash[text_hash]] = translated
+        pks.append(pk)
+    if pks:
+        TranslationCache.objects.filter(pk__in=pks).update(hits=F('hits') + 1, last_used_at=timezone.now())
+    return found
+
+
+def store_translations(translations: dict, language: str):
+    """Save {source string: translation} pairs and trim the cache."""
+    now = timezone.now()
+    entries = [
+        TranslationCache(
+            text_hash=_text_hash(source),
+            language=language,
+            prompt_version=TRANSLATION_PROMPT_VERSION,
+            source_text=source,
+            translated_text=translated,
+            last_used_at=now,
+        )
+        for source, translated in translations.items()
+    ]
+    # Another request may have stored the same string concurrently
+    TranslationCache.objects.bulk_create(entries, ignore_conflicts=True)
+    evict()
+
+
+def evict():
+    """Drop entries from old prompt versions or beyond the size limit (LRU)."""
+    TranslationCache.objects.exclude(prompt_version=TRANSLATION_PROMPT_VERSION).delete()
+
+    max_entries = getattr(settings, 'ELIGIFY_TRANSLATION_CACHE_MAX_ENTRIES', 20000)
+    overflow_pks = list(
+        TranslationCache.objects.order_by('-last_used_at').values_list('pk', flat=True)[max_entries:]
+    )
+    if overflow_pks:
+        TranslationCache.objects.filter(pk__in=overflow_pks).delete()
+
+
+def clear():
+    """Remove every cached translation."""
+    TranslationCache.objects.all().delete()
+
+
+def localize_extraction(data: dict, language: str, source_language: str = BASE_LANGUAGE,
+                        priority: str = quota.BULK) -> dict:
+    """
+    Return a copy of extraction data with its human-readable strings in
+    `language`. Only strings missing from the cache are sent to Gemini, at
+    the given quota priority.
+
+    Raises GeminiRateLimitError or ValueError if a translation call fails.
+    """
+    if language == source_language:
+        return data
+
+    strings = collect_strings(data)
+    translations = get_cached_translations(strings, language)
+    missing = [s for s in strings if s not in translations]
+
+    for start in range(0, len(missing), TRANSLATION_BATCH_SIZE):
+        batch = missing[start:start + TRANSLATION_BATCH_SIZE]
+        translated = dict(zip(batch, translate_strings(batch, language, source_language, priority)))
+        store_translations(translated, language)
+        translations.update(translated)
+
+    logger.info(
+        f"Localized {len(strings)} strings to {language} "
+        f"({len(strings) - len(missing)} cached, {len(missing)} translated)"
+    )
+    return _map_strings(data, lambda s: translations.get(s, s))
+
+
+def extraction_from_scheme(scheme) -> dict:
+    """Extraction data rebuilt from a SchemeEvaluation's stored fields."""
+    return {
+        'scheme_name': scheme.scheme_name,
+        'ministry': scheme.ministry,
+        'benefit_summary': scheme.benefit_summary,
+        'max_benefit': scheme.max_benefit,
+        'category': scheme.category,
+        'tags': scheme.tags,
+        'eligibility_rules': scheme.extracted_rules,
+        'required_documents': scheme.required_documents,
+        'application_steps': scheme.application_steps,
+        'deadline': scheme.deadline,
+        'official_portal': scheme.official_portal,
+    }
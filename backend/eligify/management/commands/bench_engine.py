@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from eligify.benchmarks import run_benchmark
+from eligify.synthetic import OPERATOR_MIXES
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the eligibility engine on synthetic rule sets and profiles. '
+        'Reports evaluations/sec and p50/p99 latency per operator mix, and fails '
+        'if throughput regresses past --max-regression against a saved baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mix', action='append', choices=sorted(OPERATOR_MIXES),
+                            help='Operator mix to run (repeatable). Default: all.')
+        parser.add_argument('--evaluations', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Rounds per mix; the fastest round is reported (default 3).')
+        parser.add_argument('--baseline', type=Path,
+                            help='JSON file of {mix: evals_per_sec} to compare against.')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Write the results to --baseline instead of comparing.')
+        parser.add_argument('--max-regression', type=float, default=0.2,
+                            help='Allowed throughput drop vs baseline, as a fraction (default 0.2).')
+
+    def handle(self, *args, **options):
+        mixes = options['mix'] or list(OPERATOR_MIXES)
+        baseline_path = options['baseline']
+        if options['save_baseline'] and not baseline_path:
+            raise CommandError('--save-baseline requires --baseline.')
+
+        results = []
+        self.stdout.write(f"{'mix':<12}{'evals/s':>12}{'p50 µs':>10}{'p99 µs':>10}{'mean µs':>10}")
+        for mix in mixes:
+            rounds = [
+                run_benchmark(mix, evaluations=options['evaluations'], seed=options['seed'])
+                for _ in range(max(options['repeat'], 1))
+            ]
+            result = max(rounds, key=lambda r: r['evals_per_sec'])
+            results.append(result)
+            self.stdout.write(
+                f"{mix:<12}{result['evals_per_sec']:>12}{result['p50_us']:>10}"
+                f"{result['p99_us']:>10}{result['mean_us']:>10}"
+            )
+
+        if not baseline_path:
+            return
+
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps({r['mix']: r['evals_per_sec'] for r in results}, indent=2))
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+            return
+
+        try:
+            baseline = json.loads(baseline_path.read_text())
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read baseline {baseline_path}: {e}')
+
+        regressions = []
+        for result in results:
+            expected = baseline.get(result['mix'])
+            if not expected:
+                continue
+            change = result['evals_per_sec'] / expected - 1
+            self.stdout.write(f"{result['mix']:<12}{change:+.1%} vs baseline ({expected} evals/s)")
+            if change < -options['max_regression']:
+                regressions.append(result['mix'])
+
+        if regressions:
+            raise CommandError(
+                f"Throughput regressed more than {options['max_regression']:.0%} for: {', '.join(regressions)}"
+            )
+        self.stdout.write(self.style.SUCCESS('No throughput regressions.'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from eligify.benchmarks import run_payload_benchmark
+from eligify.renderers import orjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark API payloads: serialize and render times and sizes (raw and gzipped) '
+        'of the scheme detail, its header fields only, and the My Evaluations list, '
+        "with DRF's JSON renderer and FastJSONRenderer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schemes', type=int, default=50, help='Evaluations in the list (default 50).')
+        parser.add_argument('--messages', type=int, default=50, help='Chat messages on the detail scheme (default 50).')
+        parser.add_argument('--rounds', type=int, default=50, help='Timed rounds; medians are reported (default 50).')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; FastJSONRenderer falls back to DRF.'))
+        results = run_payload_benchmark(
+            schemes=options['schemes'], messages=options['messages'], rounds=options['rounds'], seed=options['seed'],
+        )
+        self.stdout.write(
+            f"{'payload':<15}{'renderer':<19}{'serialize µs':>13}{'render µs':>11}{'bytes':>9}{'gzip':>8}"
+        )
+        for r in results:
+            self.stdout.write(
+                f"{r['payload']:<15}{r['renderer']:<19}{r['serialize_us']:>13}{r['render_us']:>11}"
+                f"{r['bytes']:>9}{r['gzip_bytes']:>8}"
+            )
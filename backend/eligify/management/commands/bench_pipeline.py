@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from eligify import services
+from eligify.benchmarks import BENCH_USERNAME, run_pipeline_benchmark
+from eligify.llm import PROVIDERS
+from eligify.models import UploadJob
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark end-to-end scheme upload processing (PDF parsing, extraction, '
+        'evaluation) offline with the fake LLM provider, or with another provider. '
+        'Reports jobs/sec and queue-to-done latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('pdf', type=Path, help='PDF uploaded for every job.')
+        parser.add_argument('--jobs', type=int, default=20)
+        parser.add_argument('--workers', type=int, default=2, help='Worker threads draining the queue (default 2).')
+        parser.add_argument('--provider', choices=PROVIDERS, default='fake')
+        parser.add_argument('--language', default='English')
+        parser.add_argument('--latency', type=float, default=0.5, help='Fake provider seconds per call.')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                            help='Fraction of fake provider calls answered with 429.')
+        parser.add_argument('--malformed-json-rate', type=float, default=0.0,
+                            help='Fraction of fake provider JSON responses truncated.')
+        parser.add_argument('--keep-quota', action='store_true',
+                            help='Apply the configured Gemini quota instead of lifting it for the run.')
+
+    def handle(self, *args, **options):
+        if not options['pdf'].is_file():
+            raise CommandError(f"{options['pdf']} is not a file.")
+        if UploadJob.objects.filter(stage=UploadJob.STAGE_QUEUED).exclude(user__username=BENCH_USERNAME).exists():
+            raise CommandError('Real uploads are queued; the benchmark workers would process them too.')
+
+        overrides = {
+            'ELIGIFY_LLM_PROVIDER': options['provider'],
+            'ELIGIFY_LLM_FAKE_LATENCY': options['latency'],
+            'ELIGIFY_LLM_FAKE_RATE_LIMIT_RATE': options['rate_limit_rate'],
+            'ELIGIFY_LLM_FAKE_MALFORMED_JSON_RATE': options['malformed_json_rate'],
+        }
+        if not options['keep_quota']:
+            overrides.update(ELIGIFY_GEMINI_RPM=10 ** 9, ELIGIFY_GEMINI_BURST=10 ** 9)
+
+        services.reset_client()
+        try:
+            with override_settings(**overrides):
+                result = run_pipeline_benchmark(
+                    options['pdf'], jobs=options['jobs'], workers=options['workers'], language=options['language'],
+                )
+        finally:
+            services.reset_client()
+
+        self.stdout.write(
+            f"{result['done']}/{result['jobs']} done with {result['workers']} worker(s) in {result['elapsed_s']}s: "
+            f"{result['jobs_per_sec']} jobs/s, latency p50 {result['p50_s']}s, p95 {result['p95_s']}s, "
+            f"mean {result['mean_s']}s"
+        )
+        extraction = result['extraction']
+        self.stdout.write(
+            f"Extractions: {extraction['count']}, repaired locally {extraction['repaired']}, "
+            f"retried {extraction['retried']}, failed {extraction['failed']}"
+        )
+        if result['errors']:
+            summary = ', '.join(f'{count} x HTTP {status}' for status, count in sorted(result['errors'].items()))
+            self.stdout.write(self.style.WARNING(f"Failures: {summary}"))
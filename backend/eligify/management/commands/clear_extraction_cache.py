@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from eligify import answer_cache, extraction_cache, localization
+from eligify.models import AnswerCache, ExtractionCache, TranslationCache
+
+
+class Command(BaseCommand):
+    help = (
+        'Evict stale Gemini extraction, translation and chat answer cache entries, '
+        'or clear all three caches with --all.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Delete every cached extraction, translation and answer.')
+
+    def handle(self, *args, **options):
+        before = ExtractionCache.objects.count()
+        translations_before = TranslationCache.objects.count()
+        answers_before = AnswerCache.objects.count()
+        if options['all']:
+            extraction_cache.clear()
+            localization.clear()
+            answer_cache.clear()
+        else:
+            extraction_cache.evict()
+            localization.evict()
+            answer_cache.evict()
+        removed = before - ExtractionCache.objects.count()
+        translations_removed = translations_before - TranslationCache.objects.count()
+        answers_removed = answers_before - AnswerCache.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {removed} cached extraction(s), {translations_removed} cached translation(s) '
+            f'and {answers_removed} cached answer(s).'
+        ))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eligify import pipeline
+
+
+class Command(BaseCommand):
+    help = 'Process queued scheme uploads. Runs until interrupted unless --once is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit.')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to wait between polls when the queue is empty.')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            requeued = pipeline.requeue_stalled_jobs()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Requeued {requeued} stalled job(s).'))
+            processed = pipeline.run_pending_jobs()
+            if processed:
+                self.stdout.write(f'Processed {processed} upload job(s).')
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,18 @@
+"""
+Response compression.
+
+GZipResponsesMiddleware is installed when ELIGIFY_GZIP_RESPONSES is set.
+It compresses everything except streams: the chat's Server-Sent Events must
+reach the browser chunk by chunk, and gzip would hold them back.
+"""
+
+from django.middleware.gzip import GZipMiddleware
+
+
+class GZipResponsesMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves streaming responses alone."""
+
+    def process_response(self, request, response):
+        if response.streaming:
+            return response
+        return super().process_response(request, response)
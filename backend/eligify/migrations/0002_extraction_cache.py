@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-17 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schemeevaluation',
+            name='source_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.CreateModel(
+            name='ExtractionCache',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('language', models.CharField(max_length=20)),
+                ('prompt_version', models.CharField(max_length=16)),
+                ('extracted_data', models.JSONField(default=dict)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='eligify_ext_last_us_ff4c4d_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='extractioncache',
+            constraint=models.UniqueConstraint(fields=('content_hash', 'language', 'prompt_version'), name='unique_extraction_cache_key'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-17 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0003_upload_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schemeevaluation',
+            name='base_extraction',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='TranslationCache',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_hash', models.CharField(max_length=64)),
+                ('language', models.CharField(max_length=20)),
+                ('prompt_version', models.CharField(max_length=16)),
+                ('source_text', models.TextField()),
+                ('translated_text', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='eligify_tra_last_us_6af9e0_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='translationcache',
+            constraint=models.UniqueConstraint(fields=('text_hash', 'language', 'prompt_version'), name='unique_translation_cache_key'),
+        ),
+    ]
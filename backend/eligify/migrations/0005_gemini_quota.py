@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-17 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0004_scheme_localization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeminiQuota',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('tokens', models.FloatField(default=0)),
+                ('refilled_at', models.FloatField(default=0)),
+                ('breaker_open_until', models.FloatField(default=0)),
+                ('consecutive_trips', models.PositiveIntegerField(default=0)),
+                ('admitted_interactive', models.PositiveBigIntegerField(default=0)),
+                ('admitted_bulk', models.PositiveBigIntegerField(default=0)),
+                ('rejected_interactive', models.PositiveBigIntegerField(default=0)),
+                ('rejected_bulk', models.PositiveBigIntegerField(default=0)),
+                ('waits', models.PositiveBigIntegerField(default=0)),
+                ('rate_limited', models.PositiveBigIntegerField(default=0)),
+                ('breaker_trips', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
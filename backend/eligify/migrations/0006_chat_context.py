@@ -0,0 +1,48 @@
+# Generated by Django 5.0.2 on 2026-10-17 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0005_gemini_quota'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geminiquota',
+            name='cached_prompt_tokens',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='geminiquota',
+            name='output_tokens',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='geminiquota',
+            name='prompt_tokens',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='schemeevaluation',
+            name='chat_context',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='schemeevaluation',
+            name='chat_context_cache',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='schemeevaluation',
+            name='chat_context_cache_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='schemeevaluation',
+            name='chat_context_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
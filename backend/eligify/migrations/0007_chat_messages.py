@@ -0,0 +1,78 @@
+# Generated by Django 5.0.2 on 2026-10-17 11:44
+
+from datetime import timedelta
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_chat_histories(apps, schema_editor):
+    """Move each scheme's chat_history JSON list into ChatMessage rows."""
+    SchemeEvaluation = apps.get_model('eligify', 'SchemeEvaluation')
+    ChatMessage = apps.get_model('eligify', 'ChatMessage')
+
+    schemes = SchemeEvaluation.objects.exclude(chat_history=[]).only('scheme_id', 'created_at', 'chat_history')
+    for scheme in schemes.iterator():
+        messages = []
+        for i, msg in enumerate(scheme.chat_history or []):
+            if not isinstance(msg, dict) or not msg.get('text'):
+                continue
+            messages.append(ChatMessage(
+                scheme_id=scheme.scheme_id,
+                sender='user' if msg.get('sender') == 'user' else 'ai',
+                text=msg['text'],
+                # Send times weren't recorded; keep the original order
+                created_at=scheme.created_at + timedelta(milliseconds=i),
+            ))
+        ChatMessage.objects.bulk_create(messages)
+        SchemeEvaluation.objects.filter(scheme_id=scheme.scheme_id).update(
+            chat_count=sum(1 for m in messages if m.sender == 'user'),
+        )
+
+
+def restore_chat_histories(apps, schema_editor):
+    SchemeEvaluation = apps.get_model('eligify', 'SchemeEvaluation')
+    ChatMessage = apps.get_model('eligify', 'ChatMessage')
+
+    histories = {}
+    for scheme_id, sender, text in ChatMessage.objects.order_by('created_at', 'id').values_list(
+        'scheme_id', 'sender', 'text',
+    ):
+        histories.setdefault(scheme_id, []).append({'sender': sender, 'text': text})
+    for scheme_id, history in histories.items():
+        SchemeEvaluation.objects.filter(scheme_id=scheme_id).update(chat_history=history)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0006_chat_context'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schemeevaluation',
+            name='chat_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='ChatMessage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sender', models.CharField(choices=[('user', 'User'), ('ai', 'AI')], max_length=10)),
+                ('text', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chat_messages', to='eligify.schemeevaluation')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['scheme', 'created_at', 'id'], name='chat_message_scheme_created')],
+            },
+        ),
+        migrations.RunPython(copy_chat_histories, restore_chat_histories),
+        migrations.RemoveField(
+            model_name='schemeevaluation',
+            name='chat_history',
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.2 on 2026-10-17 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0007_chat_messages'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerCache',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope_hash', models.CharField(max_length=64)),
+                ('question_hash', models.CharField(max_length=64)),
+                ('prompt_version', models.CharField(max_length=16)),
+                ('question', models.TextField()),
+                ('answer', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='eligify_ans_last_us_9b4f07_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='answercache',
+            constraint=models.UniqueConstraint(fields=('scope_hash', 'question_hash', 'prompt_version'), name='unique_answer_cache_key'),
+        ),
+    ]
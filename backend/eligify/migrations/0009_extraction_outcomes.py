@@ -0,0 +1,33 @@
+# Generated by Django 5.0.2 on 2026-10-17 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0008_answer_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geminiquota',
+            name='extractions',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='geminiquota',
+            name='extractions_failed',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='geminiquota',
+            name='extractions_repaired',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='geminiquota',
+            name='extractions_retried',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-17 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0009_extraction_outcomes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schemeevaluation',
+            index=models.Index(fields=['user', 'created_at', 'scheme_id'], name='scheme_eval_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='schemeevaluation',
+            index=models.Index(fields=['user', 'status', 'created_at'], name='scheme_eval_user_status'),
+        ),
+    ]
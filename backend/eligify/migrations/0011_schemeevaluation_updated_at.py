@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-17 13:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    SchemeEvaluation = apps.get_model('eligify', 'SchemeEvaluation')
+    SchemeEvaluation.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0010_evaluation_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schemeevaluation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.2 on 2026-10-17 12:30
+
+from django.db import migrations, models
+
+
+def clear_answer_cache(apps, schema_editor):
+    # Entries without a signature would never be matched again
+    apps.get_model('eligify', 'AnswerCache').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eligify', '0011_schemeevaluation_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_answer_cache, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='answercache',
+            name='signature',
+            field=models.CharField(default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='answercache',
+            index=models.Index(fields=['scope_hash', 'prompt_version', 'signature'], name='answer_cache_signature'),
+        ),
+    ]
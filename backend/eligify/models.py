@@ -1,6 +1,11 @@
 import uuid
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import Document
 
 
 class SchemeEvaluation(models.Model):
@@ -45,16 +50,248 @@ class SchemeEvaluation(models.Model):
     # User preferences
     language_preference = models.CharField(max_length=20, choices=LANGUAGE_CHOICES, default='English')
 
-    # Chat history (per-scheme, persisted)
-    chat_history = models.JSONField(default=list, blank=True)
+    # Chat messages live in ChatMessage; this counts the user's questions
+    chat_count = models.PositiveIntegerField(default=0)
 
     # Source PDF
     source_pdf = models.FileField(upload_to='scheme_pdfs/', blank=True, null=True)
+    source_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+
+    # Extraction with strings in services.BASE_LANGUAGE; the localized fields
+    # above are translated from it when the language changes.
+    base_extraction = models.JSONField(default=dict, blank=True)
+
+    # Chat system instruction built from the fields above (eligify.chat_context),
+    # rebuilt when its fingerprint changes; optionally held in a Gemini context cache.
+    chat_context = models.TextField(blank=True, default='')
+    chat_context_fingerprint = models.CharField(max_length=64, blank=True, default='')
+    chat_context_cache = models.CharField(max_length=200, blank=True, default='')
+    chat_context_cache_expires_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped on every change to the scheme or its chat; the detail ETag is built from it
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # My Evaluations pages (eligify.evaluations), unfiltered and by status
+            models.Index(fields=['user', 'created_at', 'scheme_id'], name='scheme_eval_user_created'),
+            models.Index(fields=['user', 'status', 'created_at'], name='scheme_eval_user_status'),
+        ]
 
     def __str__(self):
         return f"{self.scheme_name} — {self.user.username} ({self.status})"
+
+
+class ChatMessage(models.Model):
+    """One message of a scheme's chat, appended by eligify.chat_history."""
+
+    SENDER_USER = 'user'
+    SENDER_AI = 'ai'
+
+    SENDER_CHOICES = [
+        (SENDER_USER, 'User'),
+        (SENDER_AI, 'AI'),
+    ]
+
+    scheme = models.ForeignKey(SchemeEvaluation, on_delete=models.CASCADE, related_name='chat_messages')
+    sender = models.CharField(max_length=10, choices=SENDER_CHOICES)
+    text = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['scheme', 'created_at', 'id'], name='chat_message_scheme_created'),
+        ]
+
+    def __str__(self):
+        return f"{self.sender}: {self.text[:50]}"
+
+
+class ExtractionCache(models.Model):
+    """Gemini extraction output keyed by PDF content, language and prompt version."""
+
+    content_hash = models.CharField(max_length=64)
+    language = models.CharField(max_length=20)
+    prompt_version = models.CharField(max_length=16)
+    extracted_data = models.JSONField(default=dict)
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_hash', 'language', 'prompt_version'],
+                name='unique_extraction_cache_key',
+            ),
+        ]
+        indexes = [models.Index(fields=['last_used_at'])]
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.language}, prompt {self.prompt_version})"
+
+
+class TranslationCache(models.Model):
+    """Gemini translation of one scheme string, keyed by text, target language and prompt version."""
+
+    text_hash = models.CharField(max_length=64)
+    language = models.CharField(max_length=20)
+    prompt_version = models.CharField(max_length=16)
+    source_text = models.TextField()
+    translated_text = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['text_hash', 'language', 'prompt_version'],
+                name='unique_translation_cache_key',
+            ),
+        ]
+        indexes = [models.Index(fields=['last_used_at'])]
+
+    def __str__(self):
+        return f"{self.source_text[:40]} -> {self.language}"
+
+
+class AnswerCache(models.Model):
+    """
+    A chat answer keyed by the normalized question and its scope: the
+    scheme's content, the evaluation's per-rule statuses and the language
+    (see eligify.answer_cache).
+    """
+
+    scope_hash = models.CharField(max_length=64)
+    question_hash = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=16)
+    question = models.TextField()  # normalized
+    # Numbers and negations of the question; near-duplicate lookups stay within one
+    signature = models.CharField(max_length=64, default='')
+    answer = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope_hash', 'question_hash', 'prompt_version'],
+                name='unique_answer_cache_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['last_used_at']),
+            models.Index(fields=['scope_hash', 'prompt_version', 'signature'], name='answer_cache_signature'),
+        ]
+
+    def __str__(self):
+        return f"{self.question[:50]} ({self.scope_hash[:12]})"
+
+
+class UploadJob(models.Model):
+    """A queued scheme PDF upload, processed in the background by eligify.pipeline."""
+
+    STAGE_QUEUED = 'queued'
+    STAGE_PARSING = 'parsing'
+    STAGE_EXTRACTING = 'extracting'
+    STAGE_EVALUATING = 'evaluating'
+    STAGE_DONE = 'done'
+    STAGE_FAILED = 'failed'
+
+    STAGE_CHOICES = [
+        (STAGE_QUEUED, 'Queued'),
+        (STAGE_PARSING, 'Parsing'),
+        (STAGE_EXTRACTING, 'Extracting'),
+        (STAGE_EVALUATING, 'Evaluating'),
+        (STAGE_DONE, 'Done'),
+        (STAGE_FAILED, 'Failed'),
+    ]
+
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_jobs')
+
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default=STAGE_QUEUED, db_index=True)
+    scheme_name = models.CharField(max_length=500, blank=True, default='')
+    language = models.CharField(max_length=20, choices=SchemeEvaluation.LANGUAGE_CHOICES, default='English')
+    source_pdf = models.FileField(upload_to='scheme_pdfs/')
+
+    # Outcome
+    scheme = models.ForeignKey(SchemeEvaluation, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    error = models.TextField(blank=True, default='')
+    error_status = models.PositiveSmallIntegerField(null=True, blank=True)  # HTTP status to report
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"Upload {self.job_id} — {self.user.username} ({self.stage})"
+
+
+class GeminiQuota(models.Model):
+    """
+    Shared admission state for Gemini calls (token bucket, circuit breaker and
+    counters), one row per quota. Updated with compare-and-swap on `version`
+    so every process sharing the database sees the same bucket.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    # Token bucket; times are Unix timestamps
+    tokens = models.FloatField(default=0)
+    refilled_at = models.FloatField(default=0)
+
+    # Circuit breaker
+    breaker_open_until = models.FloatField(default=0)
+    consecutive_trips = models.PositiveIntegerField(default=0)
+
+    # Counters
+    admitted_interactive = models.PositiveBigIntegerField(default=0)
+    admitted_bulk = models.PositiveBigIntegerField(default=0)
+    rejected_interactive = models.PositiveBigIntegerField(default=0)
+    rejected_bulk = models.PositiveBigIntegerField(default=0)
+    waits = models.PositiveBigIntegerField(default=0)
+    rate_limited = models.PositiveBigIntegerField(default=0)
+    breaker_trips = models.PositiveBigIntegerField(default=0)
+
+    # Token usage reported by Gemini responses
+    prompt_tokens = models.PositiveBigIntegerField(default=0)
+    cached_prompt_tokens = models.PositiveBigIntegerField(default=0)
+    output_tokens = models.PositiveBigIntegerField(default=0)
+
+    # Structured extraction outcomes (see services.extract_rules_from_pdf)
+    extractions = models.PositiveBigIntegerField(default=0)
+    extractions_repaired = models.PositiveBigIntegerField(default=0)
+    extractions_retried = models.PositiveBigIntegerField(default=0)
+    extractions_failed = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Gemini quota '{self.name}' ({self.tokens:.1f} tokens)"
+
+
+@receiver(post_save, sender=SchemeEvaluation)
+@receiver(post_delete, sender=SchemeEvaluation)
+def invalidate_scheme_detail(sender, instance, **kwargs):
+    from .detail_cache import invalidate
+    invalidate([instance.scheme_id])
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_user_scheme_details(sender, instance, **kwargs):
+    # Document availability is part of every one of the user's scheme details
+    from .detail_cache import invalidate_user
+    invalidate_user(instance.user_id)
@@ -0,0 +1,278 @@
+"""
+Page-parallel PDF text extraction with an early stop.
+
+Only the first EXTRACTION_SCAN_CHAR_LIMIT characters of a scheme PDF are
+considered for the Gemini prompt, so parsing every page of a long guideline
+is mostly wasted work. extract_pdf_text() parses pages in a process pool,
+consumes the results in page order and stops submitting pages once
+`char_budget` characters have been collected. Pages whose resources declare no fonts,
+directly or through the Form XObjects they draw (scanned annexures,
+image-only pages), cannot contain extractable text and are skipped without
+running pdfplumber's layout analysis.
+
+This module is imported by the pool's worker processes, so it must not
+import Django models or anything else with heavy import-time side effects.
+"""
+
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pdfplumber
+from pdfminer.pdftypes import resolve1
+
+logger = logging.getLogger(__name__)
+
+# Documents with at most this many pages are parsed in-process; starting
+# pool tasks costs more than it saves.
+PARALLEL_MIN_PAGES = 6
+
+PAGE_SEPARATOR = "\n\n"
+
+
+class PageTiming:
+    """How long one page took and what it produced."""
+
+    __slots__ = ('page', 'chars', 'seconds', 'skipped')
+
+    def __init__(self, page: int, chars: int, seconds: float, skipped: bool):
+        self.page = page          # 1-based page number
+        self.chars = chars
+        self.seconds = seconds
+        self.skipped = skipped    # True if the page had no fonts and wasn't parsed
+
+    def as_dict(self) -> dict:
+        return {'page': self.page, 'chars': self.chars, 'seconds': round(self.seconds, 4), 'skipped': self.skipped}
+
+
+class PdfText:
+    """Result of extract_pdf_text()."""
+
+    __slots__ = ('text', 'pages', 'page_count', 'truncated', 'seconds')
+
+    def __init__(self, text: str, pages: list, page_count: int, truncated: bool, seconds: float):
+        self.text = text
+        self.pages = pages            # PageTiming for each page parsed, in page order
+        self.page_count = page_count  # pages in the document
+        self.truncated = truncated    # stopped before the last page because the budget was filled
+        self.seconds = seconds
+
+    def slowest(self, n: int = 5) -> list:
+        return sorted(self.pages, key=lambda p: -p.seconds)[:n]
+
+    def summary(self) -> str:
+        parsed = sum(1 for p in self.pages if not p.skipped)
+        skipped = len(self.pages) - parsed
+        slow = ', '.join(f'p{p.page}={p.seconds * 1000:.0f}ms' for p in self.slowest(3))
+        return (
+            f"{len(self.text)} chars from {parsed}/{self.page_count} pages "
+            f"({skipped} skipped{', truncated' if self.truncated else ''}) "
+            f"in {self.seconds:.2f}s; slowest: {slow or 'n/a'}"
+        )
+
+
+def _resources_have_fonts(resources, seen: set) -> bool:
+    """True if `resources`, or a Form XObject they draw, declares a font."""
+    resources = resolve1(resources) or {}
+    if not isinstance(resources, dict):
+        return False
+    if resolve1(resources.get('Font')):
+        return True
+    xobjects = resolve1(resources.get('XObject')) or {}
+    if not isinstance(xobjects, dict):
+        return False
+    for ref in xobjects.values():
+        # Forms can draw each other; visit each object once
+        key = getattr(ref, 'objid', id(ref))
+        if key in seen:
+            continue
+        seen.add(key)
+        stream = resolve1(ref)
+        attrs = getattr(stream, 'attrs', None) or {}
+        subtype = resolve1(attrs.get('Subtype'))
+        if getattr(subtype, 'name', subtype) != 'Form':
+            continue
+        if _resources_have_fonts(attrs.get('Resources'), seen):
+            return True
+    return False
+
+
+def _page_has_fonts(page) -> bool:
+    """False if neither the page nor its Form XObjects declare fonts, i.e. it cannot contain text."""
+    return _resources_have_fonts(page.page_obj.resources, set())
+
+
+def _extract_page(page) -> tuple:
+    """(text, seconds, skipped) for one pdfplumber page."""
+    started = time.perf_counter()
+    if not _page_has_fonts(page):
+        return '', time.perf_counter() - started, True
+    text = page.extract_text() or ''
+    page.close()  # drop the cached layout objects
+    return text, time.perf_counter() - started, False
+
+
+# ---------------------------------------------------------------------------
+# Pool workers
+# ---------------------------------------------------------------------------
+
+# Each worker keeps the most recently used document open, so consecutive
+# pages of one PDF don't re-parse its cross-reference table.
+_worker_pdf = None
+_worker_key = None
+
+
+def _worker_extract(path: str, key: tuple, index: int) -> tuple:
+    global _worker_pdf, _worker_key
+    if _worker_key != key:
+        if _worker_pdf is not None:
+            _worker_pdf.close()
+        _worker_pdf = pdfplumber.open(path)
+        _worker_key = key
+    return _extract_page(_worker_pdf.pages[index])
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pdf_workers() -> int:
+    from django.conf import settings
+    return getattr(settings, 'ELIGIFY_PDF_WORKERS', min(4, os.cpu_count() or 1))
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the parent is a threaded Django process
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# ---------------------------------------------------------------------------
+# Extraction
+# ---------------------------------------------------------------------------
+
+class _Collector:
+    """Joins page texts in order and tracks the character budget."""
+
+    def __init__(self, char_budget: int | None):
+        self.char_budget = char_budget
+        self.parts = []
+        self.length = 0
+        self.pages = []
+
+    def add(self, index: int, text: str, seconds: float, skipped: bool):
+        self.pages.append(PageTiming(index + 1, len(text), seconds, skipped))
+        if text:
+            self.length += len(text) + (len(PAGE_SEPARATOR) if self.parts else 0)
+            self.parts.append(text)
+
+    @property
+    def full(self) -> bool:
+        return self.char_budget is not None and self.length >= self.char_budget
+
+
+def _extract_serial(pdf, collector: _Collector):
+    for index, page in enumerate(pdf.pages):
+        if collector.full:
+            break
+        collector.add(index, *_extract_page(page))
+
+
+def _extract_parallel(path: str, page_count: int, collector: _Collector, workers: int):
+    pool = _get_pool(workers)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+
+    # A window of in-flight pages, consumed in page order. Once the budget
+    # is filled, pages not yet started are cancelled.
+    window = deque()
+    next_index = 0
+    try:
+        while next_index < page_count or window:
+            while next_index < page_count and len(window) < workers * 2:
+                window.append((next_index, pool.submit(_worker_extract, path, key, next_index)))
+                next_index += 1
+            index, future = window.popleft()
+            collector.add(index, *future.result())
+            if collector.full:
+                break
+    finally:
+        for _, future in window:
+            future.cancel()
+
+
+def extract_pdf_text(file_obj, char_budget: int | None = None, max_workers: int | None = None) -> PdfText:
+    """
+    Extract text from a PDF file object (or path), page by page.
+
+    Args:
+        file_obj: file-like object opened in binary mode, or a filesystem path
+        char_budget: stop parsing further pages once this many characters
+            have been collected (None parses the whole document). The text
+            returned is not cut at the budget.
+        max_workers: size of the process pool (defaults to the
+            ELIGIFY_PDF_WORKERS setting); 1 parses in-process.
+    """
+    started = time.perf_counter()
+    workers = max_workers or _pdf_workers()
+    collector = _Collector(char_budget)
+    temp_path = None
+
+    try:
+        if isinstance(file_obj, (str, os.PathLike)):
+            path = os.fspath(file_obj)
+        else:
+            path = getattr(file_obj, 'name', None)
+            if not (isinstance(path, str) and os.path.isfile(path)):
+                path = None
+
+        with pdfplumber.open(path or file_obj) as pdf:
+            page_count = len(pdf.pages)
+            if workers <= 1 or page_count <= PARALLEL_MIN_PAGES:
+                _extract_serial(pdf, collector)
+            else:
+                if path is None:
+                    # Workers open the document themselves, so it has to be on disk
+                    file_obj.seek(0)
+                    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
+                        for chunk in iter(lambda: file_obj.read(1 << 20), b''):
+                            tmp.write(chunk)
+                        temp_path = path = tmp.name
+                try:
+                    _extract_parallel(path, page_count, collector, workers)
+                except BrokenProcessPool as e:
+                    logger.warning(f"PDF worker pool failed ({e}); parsing in-process")
+                    _reset_pool()
+                    collector = _Collector(char_budget)
+                    _extract_serial(pdf, collector)
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+        if hasattr(file_obj, 'seek'):
+            file_obj.seek(0)
+
+    parsed = collector.pages[-1].page if collector.pages else 0
+    return PdfText(
+        text=PAGE_SEPARATOR.join(collector.parts),
+        pages=collector.pages,
+        page_count=page_count,
+        truncated=parsed < page_count,
+        seconds=time.perf_counter() - started,
+    )
@@ -0,0 +1,258 @@
+"""
+Background processing of scheme PDF uploads.
+
+upload_scheme stores the PDF as an UploadJob row and returns immediately.
+Jobs are claimed from the table with a conditional UPDATE, so any number of
+workers — the in-process thread pool started by enqueue(), or separate
+`manage.py run_upload_worker` processes — can share the queue without
+processing a job twice.
+
+Each job moves through parsing -> extracting -> evaluating -> done (or
+failed), and the stage is visible through GET /api/scheme/jobs/<id>/.
+
+Jobs left queued or mid-processing by a restart or a crashed worker are
+picked up again by requeue_stalled_jobs(), which the in-process pool runs
+every ELIGIFY_UPLOAD_SWEEP_INTERVAL seconds (starting with the process's
+first request) and run_upload_worker on every poll. A job is tried at most
+ELIGIFY_UPLOAD_MAX_ATTEMPTS times, so a PDF that kills its worker fails
+instead of being requeued forever.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .engine import evaluate_eligibility
+from .extraction_cache import get_cached_extraction, hash_pdf, store_extraction
+from .localization import localize_extraction
+from .models import SchemeEvaluation, UploadJob
+from .profiles import build_profile_snapshot
+from .services import (
+    BASE_LANGUAGE, EXTRACTION_SCAN_CHAR_LIMIT, GeminiRateLimitError, extract_rules_from_pdf, extract_text_from_pdf,
+)
+
+logger = logging.getLogger(__name__)
+
+IN_PROGRESS_STAGES = (UploadJob.STAGE_PARSING, UploadJob.STAGE_EXTRACTING, UploadJob.STAGE_EVALUATING)
+
+
+class UploadError(Exception):
+    """A job failure to report to the user, with the HTTP status it maps to."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _set_stage(job: UploadJob, stage: str, **fields):
+    job.stage = stage
+    for name, value in fields.items():
+        setattr(job, name, value)
+    UploadJob.objects.filter(pk=job.pk).update(stage=stage, updated_at=timezone.now(), **fields)
+
+
+def process_job(job: UploadJob) -> SchemeEvaluation:
+    """
+    Run one claimed job: PDF text -> Gemini extraction -> deterministic
+    evaluation -> SchemeEvaluation. Raises UploadError on a reportable failure.
+    """
+    language = job.language
+    with job.source_pdf.open('rb') as pdf_file:
+        content_hash = hash_pdf(pdf_file)
+        base_data = get_cached_extraction(content_hash, BASE_LANGUAGE)
+
+        if base_data is None:
+            # Step 1: Extract text from PDF
+            pdf_text = extract_text_from_pdf(pdf_file, char_budget=EXTRACTION_SCAN_CHAR_LIMIT)
+            if not pdf_text.strip():
+                raise UploadError('Could not extract text from PDF. The file may be image-based or corrupted.', 400)
+
+            # Step 2: Gemini structured extraction (strings in BASE_LANGUAGE)
+            _set_stage(job, UploadJob.STAGE_EXTRACTING)
+            try:
+                base_data = extract_rules_from_pdf(pdf_text)
+            except GeminiRateLimitError as e:
+                raise UploadError(str(e), 429)
+            except ValueError as e:
+                raise UploadError(str(e), 422)
+            store_extraction(content_hash, BASE_LANGUAGE, base_data)
+
+    # Step 2b: Translate the human-readable strings (cached per string)
+    if language != BASE_LANGUAGE:
+        _set_stage(job, UploadJob.STAGE_EXTRACTING)
+    try:
+        extracted_data = localize_extraction(base_data, language)
+    except GeminiRateLimitError as e:
+        raise UploadError(str(e), 429)
+    except ValueError as e:
+        raise UploadError(str(e), 422)
+
+    # Step 3: Deterministic eligibility evaluation
+    _set_stage(job, UploadJob.STAGE_EVALUATING)
+    profile = build_profile_snapshot(job.user)
+    eligibility_rules = extracted_data.get('eligibility_rules', [])
+    eval_result = evaluate_eligibility(profile, eligibility_rules)
+
+    # Use scheme_name from Gemini if it extracted one, otherwise use user-provided
+    final_name = job.scheme_name or extracted_data.get('scheme_name', 'Unnamed Scheme')
+
+    # Step 4: Save to database (the job's stored PDF becomes the scheme's source)
+    return SchemeEvaluation.objects.create(
+        user=job.user,
+        scheme_name=final_name,
+        ministry=extracted_data.get('ministry', ''),
+        benefit_summary=extracted_data.get('benefit_summary', ''),
+        max_benefit=extracted_data.get('max_benefit', ''),
+        category=extracted_data.get('category', 'Other'),
+        tags=extracted_data.get('tags', []),
+        extracted_rules=eligibility_rules,
+        required_documents=extracted_data.get('required_documents', []),
+        application_steps=extracted_data.get('application_steps', []),
+        deadline=extracted_data.get('deadline', 'Ongoing'),
+        official_portal=extracted_data.get('official_portal', ''),
+        evaluation_result=eval_result,
+        match_percentage=eval_result.get('match_percentage', 0),
+        status=eval_result.get('status', 'Not Eligible'),
+        language_preference=language,
+        source_pdf=job.source_pdf.name,
+        source_hash=content_hash,
+        base_extraction=base_data,
+    )
+
+
+def claim_next_job() -> UploadJob | None:
+    """Atomically move the oldest queued job to 'parsing' and return it."""
+    while True:
+        job_id = (
+            UploadJob.objects.filter(stage=UploadJob.STAGE_QUEUED)
+            .order_by('created_at').values_list('job_id', flat=True).first()
+        )
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claimed = UploadJob.objects.filter(job_id=job_id, stage=UploadJob.STAGE_QUEUED).update(
+            stage=UploadJob.STAGE_PARSING, started_at=now, updated_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return UploadJob.objects.select_related('user').get(job_id=job_id)
+        # Another worker got it first; try the next one
+
+
+def run_job(job: UploadJob):
+    """Process a claimed job and record its outcome."""
+    try:
+        scheme = process_job(job)
+    except UploadError as e:
+        logger.warning(f"Upload job {job.job_id} failed: {e}")
+        _set_stage(job, UploadJob.STAGE_FAILED, error=str(e), error_status=e.status_code)
+    except Exception as e:
+        logger.error(f"Upload job {job.job_id} error: {e}", exc_info=True)
+        _set_stage(job, UploadJob.STAGE_FAILED,
+                   error='An unexpected error occurred during processing.', error_status=500)
+    else:
+        _set_stage(job, UploadJob.STAGE_DONE, scheme=scheme)
+
+
+def run_pending_jobs() -> int:
+    """Process queued jobs until the queue is empty. Returns the number processed."""
+    processed = 0
+    while True:
+        job = claim_next_job()
+        if job is None:
+            return processed
+        run_job(job)
+        processed += 1
+
+
+def requeue_stalled_jobs(older_than: timedelta | None = None) -> int:
+    """
+    Put jobs orphaned mid-processing (e.g. by a crashed worker or a restart)
+    back in the queue, failing those already tried ELIGIFY_UPLOAD_MAX_ATTEMPTS
+    times. Returns the number requeued.
+    """
+    if older_than is None:
+        older_than = timedelta(seconds=getattr(settings, 'ELIGIFY_UPLOAD_STALL_TIMEOUT', 900))
+    max_attempts = getattr(settings, 'ELIGIFY_UPLOAD_MAX_ATTEMPTS', 3)
+    now = timezone.now()
+    stalled = UploadJob.objects.filter(stage__in=IN_PROGRESS_STAGES, updated_at__lt=now - older_than)
+
+    failed = stalled.filter(attempts__gte=max_attempts).update(
+        stage=UploadJob.STAGE_FAILED, updated_at=now, error_status=500,
+        error='This PDF could not be processed. Please try a different file.',
+    )
+    if failed:
+        logger.warning(f"Failed {failed} upload job(s) that stalled {max_attempts} times")
+    return stalled.filter(attempts__lt=max_attempts).update(stage=UploadJob.STAGE_QUEUED, updated_at=now)
+
+
+# ---------------------------------------------------------------------------
+# In-process worker pool
+# ---------------------------------------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ELIGIFY_UPLOAD_WORKERS', 2),
+                thread_name_prefix='eligify-upload',
+            )
+        return _executor
+
+
+def _drain_queue(requeue: bool = False):
+    close_old_connections()
+    try:
+        if requeue:
+            requeued = requeue_stalled_jobs()
+            if requeued:
+                logger.warning(f"Requeued {requeued} stalled upload job(s)")
+        run_pending_jobs()
+    except Exception as e:
+        logger.error(f"Upload worker error: {e}", exc_info=True)
+    finally:
+        connection.close()
+
+
+def enqueue(job: UploadJob):
+    """Wake a local worker once the job row is committed."""
+    if getattr(settings, 'ELIGIFY_UPLOAD_WORKERS', 2) <= 0:
+        return  # left for run_upload_worker
+    transaction.on_commit(lambda: _get_executor().submit(_drain_queue))
+
+
+_sweeper_started = False
+
+
+def _sweep(interval: float):
+    while True:
+        _get_executor().submit(_drain_queue, True)
+        time.sleep(interval)
+
+
+def start_sweeper(**kwargs):
+    """
+    Start the in-process pool's periodic sweep for stalled and leftover
+    queued jobs, once per process. Connected to request_started, so it runs
+    in servers but not in management commands.
+    """
+    global _sweeper_started
+    interval = getattr(settings, 'ELIGIFY_UPLOAD_SWEEP_INTERVAL', 60)
+    if _sweeper_started or interval <= 0 or getattr(settings, 'ELIGIFY_UPLOAD_WORKERS', 2) <= 0:
+        return
+    with _executor_lock:
+        if _sweeper_started:
+            return
+        _sweeper_started = True
+    threading.Thread(target=_sweep, args=(interval,), name='eligify-upload-sweeper', daemon=True).start()
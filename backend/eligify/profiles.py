@@ -0,0 +1,17 @@
+"""Helpers for turning a user's profile into engine input."""
+
+from datetime import date
+
+from .engine import ProfileSnapshot
+
+
+def build_profile_snapshot(user, reference_date: date | None = None) -> ProfileSnapshot:
+    """
+    Build the typed ProfileSnapshot the eligibility engine consumes.
+    Age is computed as of `reference_date` (default: today).
+    """
+    try:
+        profile = user.profile
+    except Exception:
+        return ProfileSnapshot.from_dict({}, reference_date)
+    return ProfileSnapshot.from_profile(profile, reference_date)
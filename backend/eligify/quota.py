@@ -0,0 +1,221 @@
+"""
+Process-shared admission control for Gemini calls.
+
+Every Gemini request first takes a token from a bucket stored in the
+GeminiQuota table, refilled at ELIGIFY_GEMINI_RPM per minute up to
+ELIGIFY_GEMINI_BURST. The row is updated with compare-and-swap on its
+`version` column, so runserver threads, upload workers and separate
+run_upload_worker processes all draw from the same bucket.
+
+Priorities: interactive calls (chat, language switches) may use every
+token; bulk calls (upload extraction and translation) leave
+ELIGIFY_GEMINI_INTERACTIVE_RESERVE tokens for them, and may wait longer.
+
+When Gemini answers RESOURCE_EXHAUSTED, trip_breaker() opens a circuit
+breaker for a cool-down (at least the server's retry delay, doubling on
+consecutive trips). While it is open, acquire() fails fast for callers
+that can't wait that long instead of letting every worker sleep and retry.
+"""
+
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import GeminiQuota
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+QUOTA_NAME = 'gemini'
+
+# Longest single sleep while waiting for a token, so breaker/bucket changes
+# made by other processes are noticed promptly
+MAX_POLL_INTERVAL = 1.0  # seconds
+_CAS_ATTEMPTS = 20
+
+
+class QuotaUnavailable(Exception):
+    """No Gemini capacity within the caller's wait budget."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _capacity() -> float:
+    return float(_setting('ELIGIFY_GEMINI_BURST', 10))
+
+
+def _refill_rate() -> float:
+    """Tokens per second."""
+    return _setting('ELIGIFY_GEMINI_RPM', 10) / 60.0
+
+
+def _load() -> GeminiQuota:
+    state, _ = GeminiQuota.objects.get_or_create(
+        name=QUOTA_NAME, defaults={'tokens': _capacity(), 'refilled_at': time.time()},
+    )
+    return state
+
+
+def _try_take(priority: str) -> float:
+    """
+    Take one token if `priority` may. Returns 0 on success, otherwise the
+    number of seconds until it is worth trying again.
+    """
+    floor = _setting('ELIGIFY_GEMINI_INTERACTIVE_RESERVE', 2) if priority == BULK else 0
+    counter = 'admitted_interactive' if priority == INTERACTIVE else 'admitted_bulk'
+    rate = _refill_rate()
+
+    for _ in range(_CAS_ATTEMPTS):
+        state = _load()
+        now = time.time()
+        if now < state.breaker_open_until:
+            return state.breaker_open_until - now
+
+        tokens = min(_capacity(), state.tokens + max(0.0, now - state.refilled_at) * rate)
+        if tokens - 1 < floor:
+            return (floor + 1 - tokens) / rate if rate > 0 else float('inf')
+
+        taken = GeminiQuota.objects.filter(name=QUOTA_NAME, version=state.version).update(
+            tokens=tokens - 1, refilled_at=now, version=F('version') + 1, **{counter: F(counter) + 1},
+        )
+        if taken:
+            return 0.0
+        # Another caller updated the bucket first; re-read and retry
+    return MAX_POLL_INTERVAL
+
+
+def acquire(priority: str = BULK, max_wait: float = 0.0):
+    """
+    Block until a Gemini call may be made, waiting at most `max_wait`
+    seconds. Raises QuotaUnavailable if the breaker is open or the bucket
+    stays empty for longer than that.
+    """
+    deadline = time.monotonic() + max_wait
+    waited = False
+    while True:
+        retry_after = _try_take(priority)
+        if retry_after <= 0:
+            return
+        if time.monotonic() + retry_after > deadline:
+            counter = 'rejected_interactive' if priority == INTERACTIVE else 'rejected_bulk'
+            GeminiQuota.objects.filter(name=QUOTA_NAME).update(**{counter: F(counter) + 1})
+            breaker_open = time.time() < _load().breaker_open_until
+            reason = 'Gemini quota is exhausted' if breaker_open else 'Too many Gemini requests in flight'
+            raise QuotaUnavailable(f"{reason}; retry in {retry_after:.0f}s.", retry_after)
+        if not waited:
+            GeminiQuota.objects.filter(name=QUOTA_NAME).update(waits=F('waits') + 1)
+            waited = True
+        time.sleep(min(retry_after, MAX_POLL_INTERVAL) * random.uniform(0.8, 1.2))
+
+
+def trip_breaker(retry_delay: float | None = None):
+    """Record a RESOURCE_EXHAUSTED response and open the breaker for a cool-down."""
+    base = _setting('ELIGIFY_GEMINI_BREAKER_COOLDOWN', 30)
+    ceiling = _setting('ELIGIFY_GEMINI_BREAKER_MAX_COOLDOWN', 600)
+
+    for _ in range(_CAS_ATTEMPTS):
+        state = _load()
+        now = time.time()
+        if now < state.breaker_open_until:
+            # Already open (another caller saw the same exhaustion)
+            GeminiQuota.objects.filter(name=QUOTA_NAME).update(rate_limited=F('rate_limited') + 1)
+            return
+        trips = state.consecutive_trips + 1
+        cooldown = min(ceiling, max(base * 2 ** (trips - 1), retry_delay or 0))
+        opened = GeminiQuota.objects.filter(name=QUOTA_NAME, version=state.version).update(
+            breaker_open_until=now + cooldown,
+            consecutive_trips=trips,
+            tokens=0,
+            refilled_at=now + cooldown,
+            version=F('version') + 1,
+            rate_limited=F('rate_limited') + 1,
+            breaker_trips=F('breaker_trips') + 1,
+        )
+        if opened:
+            logger.warning(f"Gemini quota exhausted; circuit breaker open for {cooldown:.0f}s")
+            return
+
+
+def record_success():
+    """Close the breaker's trip streak after a successful call."""
+    GeminiQuota.objects.filter(name=QUOTA_NAME, consecutive_trips__gt=0).update(
+        consecutive_trips=0, version=F('version') + 1,
+    )
+
+
+def record_usage(prompt_tokens: int, cached_prompt_tokens: int, output_tokens: int):
+    """Add one response's token counts to the totals."""
+    GeminiQuota.objects.filter(name=QUOTA_NAME).update(
+        prompt_tokens=F('prompt_tokens') + prompt_tokens,
+        cached_prompt_tokens=F('cached_prompt_tokens') + cached_prompt_tokens,
+        output_tokens=F('output_tokens') + output_tokens,
+    )
+
+
+def record_extraction(repaired: bool, retried: bool, failed: bool):
+    """Count one structured extraction and whether it needed local repair or a second call."""
+    GeminiQuota.objects.filter(name=QUOTA_NAME).update(
+        extractions=F('extractions') + 1,
+        extractions_repaired=F('extractions_repaired') + int(repaired),
+        extractions_retried=F('extractions_retried') + int(retried),
+        extractions_failed=F('extractions_failed') + int(failed),
+    )
+
+
+def _rate(count: int, total: int) -> float:
+    return round(count / total, 4) if total else 0.0
+
+
+def snapshot() -> dict:
+    """Current bucket, breaker, counter, token usage and extraction values for the metrics endpoint."""
+    state = _load()
+    now = time.time()
+    open_for = max(0.0, state.breaker_open_until - now)
+    tokens = min(_capacity(), state.tokens + max(0.0, now - state.refilled_at) * _refill_rate())
+    return {
+        'bucket': {
+            'tokens': round(max(tokens, 0.0), 2),
+            'capacity': _capacity(),
+            'refill_per_minute': _setting('ELIGIFY_GEMINI_RPM', 10),
+            'interactive_reserve': _setting('ELIGIFY_GEMINI_INTERACTIVE_RESERVE', 2),
+        },
+        'breaker': {
+            'state': 'open' if open_for > 0 else 'closed',
+            'open_for_seconds': round(open_for, 1),
+            'consecutive_trips': state.consecutive_trips,
+        },
+        'counters': {
+            'admitted_interactive': state.admitted_interactive,
+            'admitted_bulk': state.admitted_bulk,
+            'rejected_interactive': state.rejected_interactive,
+            'rejected_bulk': state.rejected_bulk,
+            'waits': state.waits,
+            'rate_limited': state.rate_limited,
+            'breaker_trips': state.breaker_trips,
+        },
+        'usage': {
+            'prompt_tokens': state.prompt_tokens,
+            'cached_prompt_tokens': state.cached_prompt_tokens,
+            'output_tokens': state.output_tokens,
+        },
+        'extraction': {
+            'count': state.extractions,
+            'repaired': state.extractions_repaired,
+            'retried': state.extractions_retried,
+            'failed': state.extractions_failed,
+            'repair_rate': _rate(state.extractions_repaired, state.extractions),
+            'retry_rate': _rate(state.extractions_retried, state.extractions),
+            'failure_rate': _rate(state.extractions_failed, state.extractions),
+        },
+    }
@@ -0,0 +1,49 @@
+"""
+Incremental re-evaluation of stored schemes after a profile change.
+
+Only schemes whose rules read one of the changed profile fields are
+re-run, and all of them are written back with a single bulk_update.
+"""
+
+import logging
+
+from django.utils import timezone
+
+from .engine import compile_rules, evaluate_eligibility
+from .models import SchemeEvaluation
+from .profiles import build_profile_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def reevaluate_for_changed_fields(user, changed_fields) -> int:
+    """
+    Re-evaluate the user's schemes that depend on any of `changed_fields`
+    (UserProfile field names). Returns the number of schemes updated.
+    """
+    changed = set(changed_fields)
+    if not changed:
+        return 0
+
+    profile = build_profile_snapshot(user)
+    now = timezone.now()
+    stale = []
+    schemes = SchemeEvaluation.objects.filter(user=user).only('scheme_id', 'extracted_rules')
+    for scheme in schemes.iterator(chunk_size=500):
+        plan = compile_rules(scheme.extracted_rules)
+        if plan.profile_fields.isdisjoint(changed):
+            continue
+        eval_result = evaluate_eligibility(profile, plan)
+        scheme.evaluation_result = eval_result
+        scheme.match_percentage = eval_result.get('match_percentage', 0)
+        scheme.status = eval_result.get('status', 'Not Eligible')
+        # bulk_update() doesn't apply auto_now
+        scheme.updated_at = now
+        stale.append(scheme)
+
+    if stale:
+        SchemeEvaluation.objects.bulk_update(
+            stale, ['evaluation_result', 'match_percentage', 'status', 'updated_at'], batch_size=500,
+        )
+        logger.info(f"Re-evaluated {len(stale)} scheme(s) for {user.username} after change to {sorted(changed)}")
+    return len(stale)
@@ -0,0 +1,195 @@
+"""
+Relevance-ranked selection of PDF text for the Gemini extraction prompt.
+
+Long guideline PDFs often put the eligibility section well past the first
+few pages, so sending a fixed prefix wastes tokens on background material
+and can miss the rules entirely. select_relevant_text() splits the text
+into paragraph chunks, scores each with BM25 against a fixed query of the
+things EXTRACTION_PROMPT asks for (eligibility, income, age, category,
+documents, how to apply, benefits), and keeps the best chunks that fit a
+token budget, in their original order.
+
+The opening chunk is always kept, since it usually carries the scheme name
+and ministry.
+"""
+
+import math
+import re
+from collections import Counter
+
+# Bump when the chunking or scoring changes; it is part of the extraction
+# prompt version, so cached extractions made from other selections are dropped.
+RANKER_VERSION = 1
+
+# Rough characters per token for Gemini on mixed English/Indic text
+CHARS_PER_TOKEN = 4
+
+CHUNK_TARGET_CHARS = 900
+CHUNK_MAX_CHARS = 1800
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Query terms and their boosts, grouped by what the extraction needs.
+# Matching is on token prefixes, so 'eligib' covers eligible/eligibility.
+QUERY_TERMS = {
+    # Eligibility criteria
+    'eligib': 3.0, 'criteria': 2.5, 'applicant': 1.5, 'beneficiar': 1.5, 'qualif': 1.5,
+    'condition': 1.0, 'must': 0.5, 'should': 0.5, 'not': 0.3,
+    # Income
+    'income': 2.5, 'annual': 1.5, 'lakh': 1.5, 'salary': 1.0, 'bpl': 1.5, 'poverty': 1.0, 'rs': 0.8, 'inr': 0.8,
+    # Age
+    'age': 2.5, 'years': 1.0, 'born': 1.0, 'birth': 1.0, 'minimum': 0.8, 'maximum': 0.8, 'below': 0.6, 'above': 0.6,
+    # Personal criteria the rules can test
+    'category': 1.5, 'caste': 1.5, 'sc': 1.2, 'st': 1.2, 'obc': 1.2, 'ews': 1.2, 'minority': 1.2,
+    'disab': 1.2, 'female': 1.0, 'women': 1.0, 'gender': 1.0, 'rural': 1.0, 'urban': 1.0,
+    'domicile': 1.2, 'resident': 1.0, 'state': 0.6, 'student': 1.0, 'marks': 1.2, 'percent': 1.0,
+    'farmer': 1.0, 'occupation': 1.0, 'family': 0.8, 'member': 0.6, 'education': 0.8,
+    # Documents
+    'document': 2.0, 'certificate': 1.5, 'aadhaar': 1.5, 'proof': 1.2, 'card': 0.6, 'passbook': 1.0,
+    # How to apply
+    'apply': 2.0, 'application': 1.5, 'procedure': 1.5, 'portal': 1.5, 'register': 1.0, 'submit': 1.0,
+    'online': 0.8, 'step': 1.0, 'website': 1.0, 'deadline': 1.5, 'last': 0.5, 'date': 0.6,
+    # Benefits and scheme identity
+    'benefit': 2.0, 'assistance': 1.2, 'amount': 1.0, 'scholarship': 1.0, 'subsidy': 1.0, 'grant': 1.0,
+    'ministry': 1.2, 'department': 0.8, 'scheme': 0.5,
+    # Hindi / Marathi
+    'पात्र': 3.0, 'आय': 2.5, 'उत्पन्न': 2.5, 'आयु': 2.5, 'वय': 2.5, 'दस्तावेज': 2.0, 'कागदपत्र': 2.0,
+    'आवेदन': 2.0, 'अर्ज': 2.0, 'लाभ': 2.0, 'योजना': 0.5,
+}
+
+# \w alone splits Devanagari words at vowel signs
+_TOKEN_RE = re.compile(r'[\w\u0900-\u0963\u0966-\u097F]+')
+_PARAGRAPH_RE = re.compile(r'\n\s*\n')
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def chunk_text(text: str) -> list:
+    """
+    Split text into chunks of roughly CHUNK_TARGET_CHARS, on paragraph
+    boundaries where possible. Short paragraphs (headings, list items) are
+    merged with what follows; paragraphs over CHUNK_MAX_CHARS are split on lines.
+    """
+    pieces = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= CHUNK_MAX_CHARS:
+            pieces.append(paragraph)
+            continue
+        current = ''
+        for line in paragraph.split('\n'):
+            if current and len(current) + len(line) + 1 > CHUNK_TARGET_CHARS:
+                pieces.append(current)
+                current = ''
+            current = f'{current}\n{line}' if current else line
+            while len(current) > CHUNK_MAX_CHARS:
+                pieces.append(current[:CHUNK_MAX_CHARS])
+                current = current[CHUNK_MAX_CHARS:]
+        if current:
+            pieces.append(current)
+
+    chunks = []
+    current = ''
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > CHUNK_TARGET_CHARS:
+            chunks.append(current)
+            current = ''
+        current = f'{current}\n\n{piece}' if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _term_weights(vocabulary) -> dict:
+    """Map each token in the corpus to its query boost (longest matching prefix)."""
+    weights = {}
+    for token in vocabulary:
+        best = 0.0
+        for prefix in (token[:n] for n in range(len(token), 1, -1)):
+            boost = QUERY_TERMS.get(prefix)
+            if boost is not None:
+                # Only exact matches for short terms, so 'st' doesn't match 'state'
+                if len(prefix) <= 3 and prefix != token:
+                    continue
+                best = boost
+                break
+        if best:
+            weights[token] = best
+    return weights
+
+
+def score_chunks(chunks: list) -> list:
+    """BM25 score of each chunk against QUERY_TERMS."""
+    docs = [Counter(tokenize(chunk)) for chunk in chunks]
+    if not docs:
+        return []
+    lengths = [sum(doc.values()) for doc in docs]
+    avg_length = (sum(lengths) / len(lengths)) or 1.0
+
+    document_frequency = Counter()
+    for doc in docs:
+        document_frequency.update(doc.keys())
+    weights = _term_weights(document_frequency)
+
+    n = len(docs)
+    idf = {
+        term: math.log(1 + (n - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+        for term in weights
+    }
+
+    scores = []
+    for doc, length in zip(docs, lengths):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+        score = 0.0
+        for term, tf in doc.items():
+            boost = weights.get(term)
+            if boost:
+                score += boost * idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def select_relevant_text(text: str, token_budget: int) -> str:
+    """
+    Return the highest-scoring chunks of `text` that fit in `token_budget`
+    tokens, in document order. Gaps between non-adjacent chunks are marked
+    with '[...]'. Text that already fits is returned unchanged.
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    char_budget = token_budget * CHARS_PER_TOKEN
+    chunks = chunk_text(text)
+    if not chunks:
+        return text[:char_budget]
+    scores = score_chunks(chunks)
+
+    # The opening chunk (title, ministry) first, then by score
+    order = [0] + sorted(range(1, len(chunks)), key=lambda i: -scores[i])
+    selected = []
+    used = 0
+    for i in order:
+        cost = len(chunks[i]) + 7  # separator
+        if used + cost > char_budget:
+            continue
+        selected.append(i)
+        used += cost
+
+    if not selected:
+        return text[:char_budget]
+
+    selected.sort()
+    parts = [chunks[selected[0]]]
+    for prev, i in zip(selected, selected[1:]):
+        parts.append('\n\n' if i == prev + 1 else '\n\n[...]\n\n')
+        parts.append(chunks[i])
+    return ''.join(parts)
@@ -1,8 +1,35 @@
 from rest_framework import serializers
+from .chat_history import history_page, serialize_message
 from .models import SchemeEvaluation
 
 
-class SchemeEvaluationListSerializer(serializers.ModelSerializer):
+def parse_fieldset(query_params, allowed) -> tuple:
+    """
+    (fields, exclude) from comma-separated ?fields= / ?exclude= parameters;
+    fields is None when every field is wanted. Raises ValueError for a
+    name not in `allowed`.
+    """
+    fieldset = []
+    for param in ('fields', 'exclude'):
+        raw = query_params.get(param)
+        names = {name.strip() for name in raw.split(',') if name.strip()} if raw else set()
+        unknown = names - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown {param}: {', '.join(sorted(unknown))}")
+        fieldset.append(names)
+    fields, exclude = fieldset
+    return fields or None, exclude
+
+
+class SparseFieldsMixin:
+    """Leaves out the fields not selected by the `fields` / `exclude` context entries."""
+
+    def wants(self, name: str) -> bool:
+        fields = self.context.get('fields')
+        return (fields is None or name in fields) and name not in self.context.get('exclude', ())
+
+
+class SchemeEvaluationListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for the My Evaluations list."""
     eligibility = serializers.SerializerMethodField()
     dateChecked = serializers.SerializerMethodField()
@@ -11,7 +38,7 @@ class SchemeEvaluationListSerializer(serializers.ModelSerializer):
     schemeName = serializers.CharField(source='scheme_name')
     matchPercent = serializers.IntegerField(source='match_percentage')
     benefitSummary = serializers.CharField(source='benefit_summary')
-    chatCount = serializers.SerializerMethodField()
+    chatCount = serializers.IntegerField(source='chat_count')
 
     class Meta:
         model = SchemeEvaluation
@@ -21,6 +48,9 @@ class SchemeEvaluationListSerializer(serializers.ModelSerializer):
             'benefitSummary', 'chatCount',
         ]
 
+    def get_fields(self):
+        return {name: field for name, field in super().get_fields().items() if self.wants(name)}
+
     def get_eligibility(self, obj):
         status_map = {
             'Eligible': 'eligible',
@@ -35,24 +65,23 @@ class SchemeEvaluationListSerializer(serializers.ModelSerializer):
     def get_source(self, obj):
         return 'uploaded'
 
-    def get_chatCount(self, obj):
-        history = obj.chat_history or []
-        # Count only user messages
-        return len([m for m in history if isinstance(m, dict) and m.get('sender') == 'user'])
-
 
-class SchemeDetailSerializer(serializers.ModelSerializer):
+class SchemeDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Full serializer matching the frontend SchemeDetail interface."""
 
+    # Keys of the SchemeDetail payload, in order
+    SECTIONS = (
+        'id', 'name', 'ministry', 'matchPercent', 'eligibility', 'category', 'tags', 'deadline',
+        'benefitSummary', 'maxBenefit', 'portalUrl', 'conditions', 'documents', 'steps',
+        'chatHistory', 'chatHistoryCursor', 'language',
+    )
+
     class Meta:
         model = SchemeEvaluation
         fields = '__all__'
 
     def to_representation(self, instance):
-        """Transform to match exact frontend SchemeDetail shape."""
-        eval_result = instance.evaluation_result or {}
-        conditions = eval_result.get('conditions', [])
-
+        """Transform to match exact frontend SchemeDetail shape, building only the wanted sections."""
         # Map status to frontend enum
         status_map = {
             'Eligible': 'eligible',
@@ -60,32 +89,59 @@ class SchemeDetailSerializer(serializers.ModelSerializer):
             'Not Eligible': 'not-eligible',
         }
 
-        # Build documents list with availability check
+        chat_page = []
+
+        def chat():
+            # Latest page of chat; older pages come from /api/scheme/<id>/messages/
+            if not chat_page:
+                chat_page.extend(history_page(instance))
+            return chat_page
+
+        sections = {
+            'id': lambda: str(instance.scheme_id),
+            'name': lambda: instance.scheme_name,
+            'ministry': lambda: instance.ministry,
+            'matchPercent': lambda: instance.match_percentage,
+            'eligibility': lambda: status_map.get(instance.status, 'not-eligible'),
+            'category': lambda: instance.category or 'Other',
+            'tags': lambda: instance.tags or [],
+            'deadline': lambda: instance.deadline or 'Ongoing',
+            'benefitSummary': lambda: instance.benefit_summary,
+            'maxBenefit': lambda: instance.max_benefit or 'Varies',
+            'portalUrl': lambda: instance.official_portal or '',
+            'conditions': lambda: (instance.evaluation_result or {}).get('conditions', []),
+            'documents': lambda: self._documents(instance),
+            'steps': lambda: self._steps(instance),
+            'chatHistory': lambda: [serialize_message(m) for m in chat()[0]],
+            'chatHistoryCursor': lambda: chat()[1],
+            'language': lambda: instance.language_preference,
+        }
+        return {name: sections[name]() for name in self.SECTIONS if self.wants(name)}
+
+    def _documents(self, instance):
+        """Required documents with availability checked against the user's vault."""
         docs = instance.required_documents or []
-        user = instance.user
-        user_doc_names = set()
-        if user:
-            from accounts.models import Document
-            user_docs = Document.objects.filter(user=user).values_list('name', flat=True)
-            user_doc_names = {d.lower() for d in user_docs}
+        owned = None
+        if instance.user_id:
+            from accounts.document_index import get_document_index
+            # The view passes the version it built the ETag from, saving a second aggregate
+            owned = get_document_index(instance.user_id, self.context.get('documents_version'))
 
         documents = []
         for doc in docs:
             doc_name = doc.get('name', '') if isinstance(doc, dict) else str(doc)
             digilocker_flag = doc.get('digilocker', False) if isinstance(doc, dict) else False
-            # Check if user has a document with similar name
-            available = any(
-                doc_name.lower() in ud or ud in doc_name.lower()
-                for ud in user_doc_names
-            ) if user_doc_names else False
+            # Check if user has a document with a matching name
+            available = owned.has(doc_name) if owned else False
 
             documents.append({
                 'name': doc_name,
                 'available': available,
                 'digilocker': digilocker_flag,
             })
+        return documents
 
-        # Build steps
+    def _steps(self, instance):
         steps = instance.application_steps or []
         application_steps = []
         for s in steps:
@@ -103,21 +159,4 @@ class SchemeDetailSerializer(serializers.ModelSerializer):
                     'description': '',
                     'done': False,
                 })
-
-        return {
-            'id': str(instance.scheme_id),
-            'name': instance.scheme_name,
-            'ministry': instance.ministry,
-            'matchPercent': instance.match_percentage,
-            'eligibility': status_map.get(instance.status, 'not-eligible'),
-            'category': instance.category or 'Other',
-            'tags': instance.tags or [],
-            'deadline': instance.deadline or 'Ongoing',
-            'benefitSummary': instance.benefit_summary,
-            'maxBenefit': instance.max_benefit or 'Varies',
-            'portalUrl': instance.official_portal or '',
-            'conditions': conditions,
-            'documents': documents,
-            'steps': application_steps,
-            'chatHistory': instance.chat_history or [],
-        }
+        return application_steps
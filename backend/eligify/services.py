@@ -6,39 +6,100 @@ Gemini API service for:
 Gemini is ONLY used for structured extraction and chat — NOT for eligibility decisions.
 """
 
+import hashlib
+import itertools
 import json
 import os
 import logging
+import random
+import re
+import threading
 import time
-import pdfplumber
+
+import httpx
 from google import genai
 from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+from django.conf import settings
+
+from . import llm, quota
+from .extraction_schema import EXTRACTION_RESPONSE_SCHEMA, SCHEMA_VERSION, repair_json, validate_extraction
+from .pdf_text import extract_pdf_text
+from .relevance import RANKER_VERSION, estimate_tokens, select_relevant_text
 
 logger = logging.getLogger(__name__)
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 
 
-def _get_client():
-    """Return a Gemini client using the API key."""
+# Upper bound for a single HTTP request to Gemini
+GEMINI_REQUEST_TIMEOUT = 60  # seconds
+
+# Total time budget per logical call, including retries and backoff
+EXTRACTION_DEADLINE = 180  # seconds
+CHAT_DEADLINE = 45  # seconds
+
+# Exponential backoff with full jitter for transient errors: sleep
+# uniform(0, min(MAX, BASE * 2**attempt)). Rate limits are instead waited
+# out through the quota's circuit breaker, honoring the server's retry delay.
+BACKOFF_BASE = 1.0  # seconds
+BACKOFF_MAX = 30.0  # seconds
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _new_gemini_client():
     if not GEMINI_API_KEY:
         raise ValueError("GEMINI_API_KEY is not set in environment variables.")
-    return genai.Client(api_key=GEMINI_API_KEY)
+    return genai.Client(
+        api_key=GEMINI_API_KEY,
+        http_options=genai_types.HttpOptions(timeout=GEMINI_REQUEST_TIMEOUT * 1000),
+    )
+
+
+def _get_client():
+    """
+    Return the process-wide LLM client for ELIGIFY_LLM_PROVIDER (see
+    eligify.llm). It is created on first use and shared by every thread, so
+    HTTP connections and TLS sessions are reused.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = llm.create_client(getattr(settings, 'ELIGIFY_LLM_PROVIDER', 'gemini'), _new_gemini_client)
+    return _client
+
+
+def reset_client():
+    """Drop the shared client, so the next call builds one from the current settings."""
+    global _client
+    with _client_lock:
+        _client = None
 
 
 # ---------------------------------------------------------------------------
 # PDF Text Extraction
 # ---------------------------------------------------------------------------
 
-def extract_text_from_pdf(file_obj) -> str:
-    """Extract all text from a PDF file object using pdfplumber."""
-    text_parts = []
-    with pdfplumber.open(file_obj) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-    return "\n\n".join(text_parts)
+# Characters of PDF text scanned for relevant passages; pages past this
+# are not parsed.
+EXTRACTION_SCAN_CHAR_LIMIT = 120000
+
+# Approximate tokens of PDF text sent to Gemini for extraction
+EXTRACTION_TOKEN_BUDGET = 3750
+
+
+def extract_text_from_pdf(file_obj, char_budget: int | None = None) -> str:
+    """
+    Extract text from a PDF file object using pdfplumber. With char_budget,
+    pages after the one that fills the budget are not parsed (see eligify.pdf_text).
+    """
+    result = extract_pdf_text(file_obj, char_budget=char_budget)
+    logger.info(f"PDF text extraction: {result.summary()}")
+    logger.debug(f"PDF page timings: {[p.as_dict() for p in result.pages]}")
+    return result.text
 
 
 # ---------------------------------------------------------------------------
@@ -101,69 +162,182 @@ LANGUAGE: All human-readable text (label, detail, benefit_summary, document name
 """
 
 
+EXTRACTION_MODEL = "gemini-2.5-flash"
+
+# Language of the human-readable strings in a structural extraction. Other
+# languages are produced by translate_strings() (see eligify.localization).
+BASE_LANGUAGE = "English"
+
+# Changes whenever the extraction prompt, model or text selection changes;
+# cached extractions made under a different version are discarded.
+EXTRACTION_PROMPT_VERSION = hashlib.sha256(
+    f"{EXTRACTION_MODEL}\n{EXTRACTION_TOKEN_BUDGET}\n{RANKER_VERSION}\n{SCHEMA_VERSION}\n{EXTRACTION_PROMPT}".encode('utf-8')
+).hexdigest()[:16]
+
+
 class GeminiRateLimitError(Exception):
     """Raised when Gemini API returns a 429 rate limit error."""
     pass
 
 
-def _call_gemini_with_retry(client, model: str, contents: str, max_retries: int = 2):
+# HTTP statuses worth retrying: rate limits and transient server errors
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_DURATION_RE = re.compile(r'^\s*([0-9.]+)s\s*$')
+
+
+def _is_rate_limit(e: genai_errors.APIError) -> bool:
+    return e.code == 429 or e.status == 'RESOURCE_EXHAUSTED'
+
+
+def _server_retry_delay(e: genai_errors.APIError) -> float | None:
+    """Retry delay the server asked for (google.rpc.RetryInfo or Retry-After), in seconds."""
+    details = e.details.get('error', e.details) if isinstance(e.details, dict) else {}
+    for item in details.get('details') or []:
+        if isinstance(item, dict) and str(item.get('@type', '')).endswith('google.rpc.RetryInfo'):
+            match = _DURATION_RE.match(str(item.get('retryDelay', '')))
+            if match:
+                return float(match.group(1))
+    headers = getattr(e.response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt: int) -> float:
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _record_usage(model: str, usage):
+    """Log a response's token counts and add them to the quota's totals."""
+    if usage is None:
+        return
+    prompt = usage.prompt_token_count or 0
+    cached = usage.cached_content_token_count or 0
+    output = usage.candidates_token_count or 0
+    logger.info(f"Gemini {model} tokens: prompt={prompt} (cached={cached}), output={output}")
+    quota.record_usage(prompt, cached, output)
+
+
+def _resume_stream(model: str, first, chunks):
+    """Yield an already-read first chunk, then the rest of the stream."""
+    usage = None
+    try:
+        for chunk in itertools.chain([first] if first is not None else [], chunks):
+            # Each chunk carries the running totals; the last one has the final counts
+            usage = chunk.usage_metadata or usage
+            yield chunk
+    finally:
+        chunks.close()
+        _record_usage(model, usage)
+
+
+def _call_gemini_with_retry(client, model: str, contents, max_retries: int = 3,
+                            deadline: float = EXTRACTION_DEADLINE, config=None, priority: str = quota.BULK,
+                            stream: bool = False):
     """
-    Call Gemini API with automatic retry on 429 rate limit errors.
-    Waits the suggested retry delay before retrying.
+    Call Gemini, retrying rate limits, transient server errors, timeouts and
+    connection errors with jittered exponential backoff until `deadline`
+    seconds have passed. Each attempt's HTTP timeout is capped by the time left.
+
+    With stream=True, returns an iterator of response chunks. Only failures
+    before the first chunk arrives are retried.
+
+    Every attempt is admitted by the shared quota (eligify.quota) first. A
+    RESOURCE_EXHAUSTED response opens its circuit breaker, so this and
+    concurrent callers fail fast unless the cool-down fits their deadline.
     """
+    started = time.monotonic()
+    max_wait = deadline if priority == quota.BULK else getattr(settings, 'ELIGIFY_GEMINI_INTERACTIVE_MAX_WAIT', 10)
     for attempt in range(max_retries + 1):
+        remaining = deadline - (time.monotonic() - started)
         try:
-            response = client.models.generate_content(
-                model=model,
-                contents=contents,
+            quota.acquire(priority, max_wait=min(max_wait, remaining))
+        except quota.QuotaUnavailable as e:
+            logger.warning(f"Gemini call not admitted ({priority}): {e}")
+            raise GeminiRateLimitError(
+                "Gemini API rate limit exceeded. Your free tier quota may be exhausted. "
+                f"Please try again in about {max(1, round(e.retry_after))} seconds."
             )
-            return response
-        except genai_errors.ClientError as e:
-            if '429' in str(e) or 'RESOURCE_EXHAUSTED' in str(e):
-                logger.error(f"Gemini API 429/Resource Exhausted Error details: {e}")
-                if attempt < max_retries:
-                    # Extract retry delay from error or use default
-                    wait_time = 15 * (attempt + 1)  # 15s, 30s
-                    logger.warning(f"Rate limited (attempt {attempt + 1}), waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                    continue
-                raise GeminiRateLimitError(
-                    "Gemini API rate limit exceeded. Your free tier quota may be exhausted. "
-                    "Please wait a minute and try again, or upgrade your API key at https://aistudio.google.com."
-                )
-            raise
-
 
-def extract_rules_from_pdf(pdf_text: str, language: str = "English") -> dict:
+        remaining = deadline - (time.monotonic() - started)
+        timeout = min(GEMINI_REQUEST_TIMEOUT, remaining)
+        http_options = genai_types.HttpOptions(timeout=max(int(timeout * 1000), 1000))
+        if config is None:
+            attempt_config = genai_types.GenerateContentConfig(http_options=http_options)
+        else:
+            attempt_config = config.model_copy(update={'http_options': http_options})
+        try:
+            if stream:
+                chunks = client.models.generate_content_stream(model=model, contents=contents, config=attempt_config)
+                first = next(chunks, None)
+                quota.record_success()
+                return _resume_stream(model, first, chunks)
+            response = client.models.generate_content(model=model, contents=contents, config=attempt_config)
+            quota.record_success()
+            _record_usage(model, response.usage_metadata)
+            return response
+        except genai_errors.APIError as e:
+            if _is_rate_limit(e):
+                logger.warning(f"Gemini {e.code} {e.status} (attempt {attempt + 1}): {e.message}")
+                # The breaker makes the next acquire() wait out the cool-down or fail fast
+                quota.trip_breaker(_server_retry_delay(e))
+                error = e
+                continue
+            if e.code not in _RETRYABLE_STATUS:
+                raise
+            error = e
+            logger.warning(f"Gemini {e.code} {e.status} (attempt {attempt + 1}): {e.message}")
+        except httpx.TransportError as e:
+            error = e
+            logger.warning(f"Gemini request failed: {type(e).__name__} (attempt {attempt + 1})")
+
+        wait_time = _backoff_delay(attempt)
+        if attempt == max_retries or time.monotonic() - started + wait_time >= deadline:
+            break
+        logger.info(f"Retrying Gemini call in {wait_time:.1f}s")
+        time.sleep(wait_time)
+
+    if isinstance(error, genai_errors.APIError) and _is_rate_limit(error):
+        raise GeminiRateLimitError(
+            "Gemini API rate limit exceeded. Your free tier quota may be exhausted. "
+            "Please wait a minute and try again, or upgrade your API key at https://aistudio.google.com."
+        )
+    raise error
+
+
+def _response_text(response) -> str:
+    """Response text, raising ValueError if generation stopped at the output token limit."""
+    candidates = response.candidates or []
+    if candidates and candidates[0].finish_reason == genai_types.FinishReason.MAX_TOKENS:
+        raise ValueError("Response was cut off at the output token limit")
+    return (response.text or '').strip()
+
+
+def extract_rules_from_pdf(pdf_text: str) -> dict:
     """
-    Send PDF text to Gemini and get structured scheme data back.
-    Retries on JSON parse failure and rate limits.
+    Send PDF text to Gemini and get structured scheme data back, with
+    human-readable strings in BASE_LANGUAGE.
+
+    The response is constrained to EXTRACTION_RESPONSE_SCHEMA, then repaired
+    and validated locally (see eligify.extraction_schema); Gemini is only
+    asked again if that fails. Outcomes are counted in eligify.quota.
     """
     client = _get_client()
-    prompt = EXTRACTION_PROMPT.replace("{language}", language).replace("{pdf_text}", pdf_text[:15000])  # Limit text length
+    # Send the passages most likely to hold rules, documents and steps
+    selected_text = select_relevant_text(pdf_text, EXTRACTION_TOKEN_BUDGET)
+    logger.info(f"Extraction prompt uses {len(selected_text)} of {len(pdf_text)} PDF text chars")
+    prompt = EXTRACTION_PROMPT.replace("{language}", BASE_LANGUAGE).replace("{pdf_text}", selected_text)
+    config = genai_types.GenerateContentConfig(
+        response_mime_type='application/json', response_schema=EXTRACTION_RESPONSE_SCHEMA,
+    )
 
     for attempt in range(2):
         try:
-            response = _call_gemini_with_retry(client, "gemini-2.5-flash", prompt)
-            raw = response.text.strip()
-            # Strip markdown fences if present
-            if raw.startswith("```"):
-                raw = raw.split("\n", 1)[1] if "\n" in raw else raw[3:]
-                if raw.endswith("```"):
-                    raw = raw[:-3]
-                raw = raw.strip()
-
-            data = json.loads(raw)
-
-            # Validate required keys exist
-            required_keys = [
-                "scheme_name", "eligibility_rules",
-                "required_documents", "application_steps"
-            ]
-            for key in required_keys:
-                if key not in data:
-                    raise ValueError(f"Missing required key: {key}")
-
+            response = _call_gemini_with_retry(client, EXTRACTION_MODEL, prompt, config=config)
+            data, was_repaired = repair_json(_response_text(response))
+            data, fixes = validate_extraction(data)
+            quota.record_extraction(repaired=was_repaired or fixes > 0, retried=attempt > 0, failed=False)
             return data
 
         except (json.JSONDecodeError, ValueError) as e:
@@ -171,6 +345,7 @@ def extract_rules_from_pdf(pdf_text: str, language: str = "English") -> dict:
             if attempt == 0:
                 prompt += "\n\nIMPORTANT: Your previous response was not valid JSON. Please return ONLY a valid JSON object with no extra text."
                 continue
+            quota.record_extraction(repaired=False, retried=True, failed=True)
             raise ValueError(f"Failed to extract valid JSON from Gemini after 2 attempts: {e}")
         except GeminiRateLimitError:
             raise
@@ -179,17 +354,82 @@ def extract_rules_from_pdf(pdf_text: str, language: str = "English") -> dict:
             raise
 
 
+# ---------------------------------------------------------------------------
+# Gemini: Translation
+# ---------------------------------------------------------------------------
+
+TRANSLATION_PROMPT = """Translate each string in the JSON array below from {source_language} into {language}.
+
+These are labels, explanations, document names and application steps for an Indian government scheme. Keep amounts, numbers, dates, URLs, scheme names and acronyms (e.g. SC, ST, OBC, BPL, Aadhaar) as they are. Use the terms an applicant in India would recognise.
+
+Respond ONLY with a JSON array of the translated strings, in the same order and with exactly {count} items — no markdown fences, no explanation.
+
+{strings}
+"""
+
+# Cached translations made under a different version are discarded.
+TRANSLATION_PROMPT_VERSION = hashlib.sha256(
+    f"{EXTRACTION_MODEL}\n{TRANSLATION_PROMPT}".encode('utf-8')
+).hexdigest()[:16]
+
+
+# Translations come back as a JSON array of strings
+TRANSLATION_CONFIG = genai_types.GenerateContentConfig(
+    response_mime_type='application/json',
+    response_schema=genai_types.Schema(
+        type=genai_types.Type.ARRAY, items=genai_types.Schema(type=genai_types.Type.STRING),
+    ),
+)
+
+
+def translate_strings(strings: list, language: str, source_language: str = BASE_LANGUAGE,
+                      priority: str = quota.BULK) -> list:
+    """
+    Translate a list of strings with one Gemini call. Returns a list of the
+    same length. Retries once on a malformed response.
+    """
+    client = _get_client()
+    prompt = TRANSLATION_PROMPT.replace(
+        "{source_language}", source_language
+    ).replace(
+        "{language}", language
+    ).replace(
+        "{count}", str(len(strings))
+    ).replace(
+        "{strings}", json.dumps(strings, ensure_ascii=False)
+    )
+
+    for attempt in range(2):
+        try:
+            response = _call_gemini_with_retry(client, EXTRACTION_MODEL, prompt, config=TRANSLATION_CONFIG,
+                                               priority=priority)
+            translated, _ = repair_json(_response_text(response))
+            if not isinstance(translated, list) or len(translated) != len(strings):
+                raise ValueError(f"Expected a list of {len(strings)} strings")
+            return [str(t) for t in translated]
+
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning(f"Gemini translation attempt {attempt + 1} failed: {e}")
+            if attempt == 0:
+                continue
+            raise ValueError(f"Failed to get a valid translation from Gemini after 2 attempts: {e}")
+
+
 # ---------------------------------------------------------------------------
 # Gemini: Chat
 # ---------------------------------------------------------------------------
 
-CHAT_SYSTEM_PROMPT = """You are Eligify AI, a helpful and professional assistant that answers questions about the Indian government scheme described below. You help users understand eligibility, application process, required documents, and benefits.
+CHAT_RATE_LIMITED_MESSAGE = "I'm currently rate-limited by the AI service. Please wait a minute and try again."
+CHAT_ERROR_MESSAGE = "I'm sorry, I couldn't process your question right now. Please try again."
+
+CHAT_MODEL = "gemini-2.5-flash"
 
-SCHEME DATA:
-{scheme_data}
+# Stable per scheme (see eligify.chat_context): sent as the system
+# instruction, so Gemini can reuse it across turns through context caching.
+CHAT_SYSTEM_PROMPT = """You are Eligify AI, a helpful and professional assistant that answers questions about the Indian government scheme described below. You help users understand eligibility, application process, required documents, and benefits.
 
-USER ELIGIBILITY EVALUATION:
-{evaluation_data}
+SCHEME AND THE USER'S ELIGIBILITY EVALUATION:
+{scheme_context}
 
 FORMATTING RULES (VERY IMPORTANT — follow strictly):
 - Use **bold** for key terms, scheme names, amounts, statuses (e.g. **Eligible**, **₹6,000/year**, **Annual Income**)
@@ -213,49 +453,111 @@ CONTENT RULES:
 - Always structure your response so it's easy to scan quickly
 """
 
+CHAT_PROMPT_VERSION = hashlib.sha256(f"{CHAT_MODEL}\n{CHAT_SYSTEM_PROMPT}".encode('utf-8')).hexdigest()[:16]
 
-def generate_chat_response(
-    extracted_rules: dict,
-    evaluation_result: dict,
-    chat_history: list,
-    user_message: str,
-    language: str = "English"
-) -> str:
-    """Generate a chat response using Gemini with scheme context."""
-    client = _get_client()
+# Gemini rejects explicit caches smaller than this
+CONTEXT_CACHE_MIN_TOKENS = 1024
 
-    scheme_data_str = json.dumps(extracted_rules, indent=2, ensure_ascii=False)
-    eval_data_str = json.dumps(evaluation_result, indent=2, ensure_ascii=False)
 
-    system_prompt = CHAT_SYSTEM_PROMPT.replace(
-        "{scheme_data}", scheme_data_str
-    ).replace(
-        "{evaluation_data}", eval_data_str
-    ).replace(
-        "{language}", language
-    )
+def build_chat_system_instruction(scheme_context: str, language: str) -> str:
+    return CHAT_SYSTEM_PROMPT.replace("{scheme_context}", scheme_context).replace("{language}", language)
 
-    # Build conversation contents
-    contents = [system_prompt + "\n\n"]
 
-    # Add chat history (last 10 messages to avoid token limit)
+def create_context_cache(system_instruction: str, ttl_seconds: int) -> str | None:
+    """
+    Store a chat system instruction as Gemini cached content and return its
+    name, or None if it is too small to cache or caching is unavailable for
+    this API key (the instruction is then sent inline with each message).
+    """
+    if estimate_tokens(system_instruction) < CONTEXT_CACHE_MIN_TOKENS:
+        return None
+    try:
+        cache = _get_client().caches.create(
+            model=CHAT_MODEL,
+            config=genai_types.CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                ttl=f"{ttl_seconds}s",
+                http_options=genai_types.HttpOptions(timeout=GEMINI_REQUEST_TIMEOUT * 1000),
+            ),
+        )
+    except (genai_errors.APIError, httpx.TransportError) as e:
+        logger.warning(f"Could not create Gemini context cache: {e}")
+        return None
+    return cache.name
+
+
+def _chat_contents(chat_history: list, user_message: str) -> str:
+    # Last 10 messages of history, to bound the per-turn tokens
+    contents = []
     for msg in chat_history[-10:]:
-        role = "user" if msg.get("sender") == "user" else "model"
-        if role == "user":
+        if msg.get("sender") == "user":
             contents.append(f"User: {msg['text']}")
         else:
             contents.append(f"Assistant: {msg['text']}")
-
     contents.append(f"User: {user_message}")
+    return "\n".join(contents)
+
+
+def _call_chat(system_instruction: str, cached_content: str | None, contents: str, stream: bool = False):
+    """Chat call using the cached system instruction if there is one, else sending it inline."""
+    client = _get_client()
+    if cached_content:
+        config = genai_types.GenerateContentConfig(cached_content=cached_content)
+        try:
+            return _call_gemini_with_retry(
+                client, CHAT_MODEL, contents, deadline=CHAT_DEADLINE, config=config,
+                priority=quota.INTERACTIVE, stream=stream,
+            )
+        except genai_errors.APIError as e:
+            if e.code not in (400, 403, 404):
+                raise
+            # Cache expired or deleted early; fall through to the inline instruction
+            logger.warning(f"Gemini context cache {cached_content} unusable: {e.message}")
+
+    config = genai_types.GenerateContentConfig(system_instruction=system_instruction)
+    return _call_gemini_with_retry(
+        client, CHAT_MODEL, contents, deadline=CHAT_DEADLINE, config=config,
+        priority=quota.INTERACTIVE, stream=stream,
+    )
 
-    full_prompt = "\n".join(contents)
 
+def generate_chat_response(
+    system_instruction: str,
+    chat_history: list,
+    user_message: str,
+    cached_content: str | None = None,
+) -> str:
+    """
+    Generate a chat response using Gemini. `system_instruction` carries the
+    scheme context (see eligify.chat_context); `cached_content` names a
+    Gemini context cache holding the same instruction.
+    """
     try:
-        # Use gemini-2.5-flash model as requested
-        response = _call_gemini_with_retry(client, "gemini-2.5-flash", full_prompt)
+        response = _call_chat(system_instruction, cached_content, _chat_contents(chat_history, user_message))
         return response.text.strip()
     except GeminiRateLimitError:
-        return "I'm currently rate-limited by the AI service. Please wait a minute and try again."
+        return CHAT_RATE_LIMITED_MESSAGE
     except Exception as e:
         logger.error(f"Gemini chat error: {e}")
-        return "I'm sorry, I couldn't process your question right now. Please try again."
+        return CHAT_ERROR_MESSAGE
+
+
+def stream_chat_response(
+    system_instruction: str,
+    chat_history: list,
+    user_message: str,
+    cached_content: str | None = None,
+):
+    """
+    Like generate_chat_response(), but yields the answer in pieces as Gemini
+    streams them. Raises GeminiRateLimitError, or the underlying error, if
+    the call fails; a failure mid-stream propagates after the text so far.
+    """
+    chunks = _call_chat(system_instruction, cached_content, _chat_contents(chat_history, user_message), stream=True)
+    try:
+        for chunk in chunks:
+            if chunk.text:
+                yield chunk.text
+    finally:
+        # Stops reading the HTTP response if the consumer goes away early
+        chunks.close()
@@ -0,0 +1,194 @@
+"""
+Columnar "what-if" simulator for a scheme's eligibility rules.
+
+Evaluates one compiled rule plan over a grid of hypothetical profiles
+(e.g. annual_income × age × category) using NumPy. Each grid axis is
+evaluated once per distinct value and broadcast across the grid, so the
+cost is dominated by array arithmetic rather than per-profile Python calls.
+
+Results are identical to calling evaluate_eligibility() on every grid point.
+"""
+
+import numpy as np
+
+from .engine import (
+    RulePlan, _compute_age, _count_members, _get_user_value, _is_missing, _normalize, _parse_numeric, compile_rules,
+)
+
+MAX_GRID_POINTS = 250_000
+
+# Status codes used in the result arrays
+MISSING = 0
+SATISFIED = 1
+NOT_SATISFIED = 2
+
+_NUMERIC_COMPARATORS = {
+    '<': np.less,
+    '>': np.greater,
+    '<=': np.less_equal,
+    '>=': np.greater_equal,
+}
+
+
+# Rule fields computed from another profile field: field -> (source field, fn)
+_DERIVED_FIELDS = {
+    'age': ('dob', _compute_age),
+    'family_members_count': ('family_members', _count_members),
+}
+
+
+def expand_axis(spec) -> list:
+    """
+    Turn an axis spec into a list of values. Accepts either an explicit list
+    or a numeric range {'start', 'stop', 'step'} where stop is inclusive.
+    """
+    if isinstance(spec, list):
+        return spec
+    if isinstance(spec, dict):
+        try:
+            start = float(spec['start'])
+            stop = float(spec['stop'])
+            step = float(spec.get('step', 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Range axes need numeric 'start' and 'stop' (and optional 'step').")
+        if step <= 0 or stop < start:
+            raise ValueError("Range axes need step > 0 and stop >= start.")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        if count > MAX_GRID_POINTS:
+            raise ValueError(f"Axis has {count} points; the limit is {MAX_GRID_POINTS}.")
+        values = start + step * np.arange(count)
+        return [int(v) if float(v).is_integer() else float(v) for v in values]
+    raise ValueError('Each axis must be a list of values or a {start, stop, step} range.')
+
+
+def _numeric_column(values) -> np.ndarray:
+    """Parse axis values into a float array (NaN where not a number)."""
+    parsed = [_parse_numeric(v) for v in values]
+    return np.array([np.nan if v is None else v for v in parsed], dtype=float)
+
+
+def _evaluate_column(rule, values) -> np.ndarray:
+    """Evaluate one compiled rule over a column of user values -> status codes."""
+    missing = np.fromiter((_is_missing(v) for v in values), dtype=bool, count=len(values))
+    op = rule.operator
+
+    if op in _NUMERIC_COMPARATORS or op == 'between':
+        if op == 'between':
+            if rule.bounds is None:
+                return np.full(len(values), MISSING, dtype=np.int8)
+            column = _numeric_column(values)
+            with np.errstate(invalid='ignore'):
+                hit = (column >= rule.bounds[0]) & (column <= rule.bounds[1])
+        else:
+            if rule.number is None:
+                return np.full(len(values), MISSING, dtype=np.int8)
+            column = _numeric_column(values)
+            with np.errstate(invalid='ignore'):
+                hit = _NUMERIC_COMPARATORS[op](column, rule.number)
+        codes = np.where(hit, SATISFIED, NOT_SATISFIED).astype(np.int8)
+        codes[missing | np.isnan(column)] = MISSING
+        return codes
+
+    if op in ('in', 'not_in'):
+        if rule.members is None:
+            return np.full(len(values), MISSING, dtype=np.int8)
+        column = np.array([_normalize(v) for v in values], dtype=str)
+        hit = np.isin(column, np.array(sorted(rule.members), dtype=str))
+        if op == 'not_in':
+            hit = ~hit
+        codes = np.where(hit, SATISFIED, NOT_SATISFIED).astype(np.int8)
+        codes[missing] = MISSING
+        return codes
+
+    # Equality / exists / unknown operators: evaluate each distinct value once.
+    codes_by_status = {'missing': MISSING, 'satisfied': SATISFIED, 'not-satisfied': NOT_SATISFIED}
+    return np.array([codes_by_status[rule.evaluate(v)] for v in values], dtype=np.int8)
+
+
+def simulate(base_profile: dict, extracted_rules, axes: dict) -> dict:
+    """
+    Evaluate a scheme's rules over the cartesian product of `axes`.
+
+    Args:
+        base_profile: ProfileSnapshot (or profile dict) that supplies every
+            field not varied by an axis
+        extracted_rules: rule list or compiled RulePlan
+        axes: ordered mapping of profile field -> list of values or a
+            {'start', 'stop', 'step'} range. Rule fields such as 'age' may be
+            varied directly.
+
+    Returns:
+        {
+            'axes': [{'field', 'values'}],
+            'shape': [len(axis), ...],
+            'match_percentage': nested list with the grid shape,
+            'status': nested list of 'Eligible' | 'Partial' | 'Not Eligible',
+            'summary': {'points', 'eligible', 'partial', 'not_eligible'},
+            'rules': [{'field', 'label', 'satisfied_share'}],
+        }
+    """
+    if not axes:
+        raise ValueError('At least one axis is required.')
+
+    plan = extracted_rules if isinstance(extracted_rules, RulePlan) else compile_rules(extracted_rules)
+    fields = list(axes.keys())
+    values = [expand_axis(axes[f]) for f in fields]
+    shape = tuple(len(v) for v in values)
+    if any(n == 0 for n in shape):
+        raise ValueError('Axes must not be empty.')
+    points = int(np.prod(shape))
+    if points > MAX_GRID_POINTS:
+        raise ValueError(f"Grid has {points} points; the limit is {MAX_GRID_POINTS}.")
+
+    satisfied = np.zeros(shape, dtype=np.int32)
+    rule_shares = []
+
+    for rule in plan.rules:
+        axis_index = None
+        column = None
+        if rule.field in axes:
+            axis_index = fields.index(rule.field)
+            column = values[axis_index]
+        elif rule.field in _DERIVED_FIELDS and _DERIVED_FIELDS[rule.field][0] in axes:
+            source, derive = _DERIVED_FIELDS[rule.field]
+            axis_index = fields.index(source)
+            column = [derive(v) for v in values[axis_index]]
+
+        if axis_index is None:
+            hit = rule.evaluate(_get_user_value(base_profile, rule.field)) == 'satisfied'
+            if hit:
+                satisfied += 1
+            rule_shares.append(1.0 if hit else 0.0)
+            continue
+
+        hit = _evaluate_column(rule, column) == SATISFIED
+        broadcast_shape = [1] * len(shape)
+        broadcast_shape[axis_index] = shape[axis_index]
+        satisfied += hit.reshape(broadcast_shape)
+        rule_shares.append(float(hit.mean()))
+
+    total_rules = len(plan)
+    if total_rules:
+        match = np.rint((satisfied / total_rules) * 100).astype(np.int32)
+    else:
+        match = np.zeros(shape, dtype=np.int32)
+
+    # Same thresholds and labels as evaluate_eligibility()
+    status = np.where(match == 100, 'Eligible', np.where(match >= 50, 'Partial', 'Not Eligible'))
+
+    return {
+        'axes': [{'field': f, 'values': v} for f, v in zip(fields, values)],
+        'shape': list(shape),
+        'match_percentage': match.tolist(),
+        'status': status.tolist(),
+        'summary': {
+            'points': points,
+            'eligible': int((status == 'Eligible').sum()),
+            'partial': int((status == 'Partial').sum()),
+            'not_eligible': int((status == 'Not Eligible').sum()),
+        },
+        'rules': [
+            {'field': r.field, 'label': r.label, 'satisfied_share': round(share, 4)}
+            for r, share in zip(plan.rules, rule_shares)
+        ],
+    }
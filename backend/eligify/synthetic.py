@@ -0,0 +1,130 @@
+"""
+Synthetic eligibility workloads.
+
+Rule sets in the shape EXTRACTION_PROMPT asks Gemini for (every allowed
+operator, Indian currency strings such as '₹5,00,000', booleans and lists)
+and flat profiles with missing and malformed fields. Shared by the engine
+benchmarks, the fake LLM provider and the tests.
+"""
+
+import random
+
+from .engine import _parse_numeric
+
+STATES = ['Maharashtra', 'Karnataka', 'Uttar Pradesh', 'Bihar', 'Kerala', 'Goa', 'Punjab', 'Assam']
+GENDERS = ['Male', 'Female', 'Other']
+CATEGORIES = ['General', 'OBC', 'SC', 'ST', 'EWS']
+AREA_TYPES = ['Rural', 'Urban']
+OCCUPATIONS = ['Farmer', 'Student', 'Salaried', 'Self-employed', 'Unemployed']
+EDUCATION_LEVELS = ['10th', '12th', 'Graduate', 'Post Graduate', 'Diploma']
+
+CATEGORICAL_CHOICES = {
+    'state': STATES,
+    'gender': GENDERS,
+    'category': CATEGORIES,
+    'area_type': AREA_TYPES,
+    'occupation': OCCUPATIONS,
+    'education_level': EDUCATION_LEVELS,
+}
+NUMERIC_FIELDS = ('age', 'annual_income', 'marks_percentage', 'family_members_count')
+BOOLEAN_FIELDS = ('minority_status', 'disability_status')
+
+OPERATOR_MIXES = {
+    'numeric': ['<', '>', '<=', '>=', 'between'],
+    'membership': ['in', 'not_in'],
+    'equality': ['==', '!='],
+    'exists': ['exists'],
+    'mixed': ['==', '!=', '<', '>', '<=', '>=', 'in', 'not_in', 'exists', 'between'],
+}
+
+
+def format_inr(amount: int) -> str:
+    """Format an amount with Indian digit grouping, e.g. 500000 -> '₹5,00,000'."""
+    digits = str(int(amount))
+    if len(digits) > 3:
+        head, tail = digits[:-3], digits[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        if head:
+            groups.insert(0, head)
+        digits = ','.join(groups + [tail])
+    return f'₹{digits}'
+
+
+def _numeric_value(rng: random.Random, field: str):
+    if field == 'age':
+        return rng.choice([18, 21, 25, 35, 40, 60, '18', '60 years'])
+    if field == 'annual_income':
+        amount = rng.choice([100000, 250000, 300000, 500000, 800000])
+        return rng.choice([format_inr(amount), str(amount), amount, f'Rs. {amount}', f'INR {amount:,}'])
+    if field == 'marks_percentage':
+        return rng.choice([50, 60, '75%', '85.5%', 40.0])
+    return rng.choice([2, 4, 5, '6'])
+
+
+def generate_rule(rng: random.Random, operator: str) -> dict:
+    """One rule dict using `operator`, on a field that makes sense for it."""
+    if operator in ('<', '>', '<=', '>=', 'between'):
+        field = rng.choice(NUMERIC_FIELDS)
+        if operator == 'between':
+            # Ordered as the engine parses them, so ranges are never inverted
+            low, high = sorted([_numeric_value(rng, field), _numeric_value(rng, field)],
+                               key=lambda v: _parse_numeric(v) or 0.0)
+            value = [low, high]
+        else:
+            value = _numeric_value(rng, field)
+    elif operator in ('in', 'not_in'):
+        field = rng.choice(list(CATEGORICAL_CHOICES))
+        choices = CATEGORICAL_CHOICES[field]
+        value = rng.sample(choices, rng.randint(1, min(3, len(choices))))
+    elif operator in ('==', '!='):
+        field = rng.choice(list(CATEGORICAL_CHOICES) + list(BOOLEAN_FIELDS))
+        value = rng.choice([True, False]) if field in BOOLEAN_FIELDS else rng.choice(CATEGORICAL_CHOICES[field])
+    else:
+        field = rng.choice(list(CATEGORICAL_CHOICES) + list(NUMERIC_FIELDS))
+        value = None
+    return {
+        'field': field,
+        'label': field.replace('_', ' ').title(),
+        'operator': operator,
+        'value': value,
+        'detail': f'Applicant {field.replace("_", " ")} requirement',
+    }
+
+
+def generate_rules(rng: random.Random, operators, min_rules: int = 3, max_rules: int = 10) -> list:
+    return [generate_rule(rng, rng.choice(operators)) for _ in range(rng.randint(min_rules, max_rules))]
+
+
+def generate_profile(rng: random.Random, missing_rate: float = 0.15, malformed_rate: float = 0.05) -> dict:
+    """A flat profile dict, with some fields left empty or filled with junk."""
+    income = rng.choice([60000, 120000, 240000, 480000, 950000])
+    profile = {
+        'state': rng.choice(STATES),
+        'gender': rng.choice(GENDERS),
+        'dob': f'{rng.randint(1955, 2010)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        'occupation': rng.choice(OCCUPATIONS),
+        'education_level': rng.choice(EDUCATION_LEVELS),
+        'marks_percentage': rng.choice(['45', '62.5', '78', '91%']),
+        'category': rng.choice(CATEGORIES),
+        'minority_status': rng.random() < 0.2,
+        'disability_status': rng.random() < 0.05,
+        'area_type': rng.choice(AREA_TYPES),
+        'annual_income': rng.choice([str(income), format_inr(income), f'{income:,}']),
+        'family_members': [{'relation': 'member'} for _ in range(rng.randint(0, 6))],
+    }
+    malformed = {
+        'dob': rng.choice(['31/31/1990', 'unknown', '1990']),
+        'marks_percentage': 'N/A',
+        'annual_income': rng.choice(['approx five lakh', '--']),
+        'family_members': 'two',
+    }
+    for field in list(profile):
+        roll = rng.random()
+        if roll < missing_rate:
+            profile[field] = None if field in ('dob',) else ''
+        elif roll < missing_rate + malformed_rate and field in malformed:
+            profile[field] = malformed[field]
+    return profile
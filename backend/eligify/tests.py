@@ -1,3 +1,949 @@
-from django.test import TestCase
+import io
+import json
+import random
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from google.genai import errors as genai_errors
+from google.genai import types as genai_types
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import Document, UserProfile
+
+from . import detail_cache, llm, quota, services
+from .answer_cache import get_cached_answer, store_answer
+from .chat_history import append_exchange, recent_history
+from .cohort import cohort_pks, cohort_queryset, compile_cohort_filter
+from .discovery import SchemeIndex, _current_version
+from .engine import ProfileSnapshot, compile_rules, evaluate_eligibility
+from .extraction_schema import _coerce_value, _number, _rule, repair_json, validate_extraction
+from .keyset import decode_cursor, encode_cursor, page
+from .middleware import GZipResponsesMiddleware
+from .models import GeminiQuota, SchemeEvaluation, UploadJob
+from .pdf_text import extract_pdf_text
+from .pipeline import requeue_stalled_jobs
+from .reevaluation import reevaluate_for_changed_fields
+from .renderers import FastJSONRenderer
+from .simulator import simulate
+from .synthetic import OPERATOR_MIXES, generate_profile, generate_rules
+
+
+def _build_pdf(objects: list) -> bytes:
+    """A PDF whose numbered objects are `objects` (1-based), with a valid xref table."""
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f'{number} 0 obj\n'.encode() + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode())
+    for offset in offsets:
+        out.write(f'{offset:010d} 00000 n \n'.encode())
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+    return out.getvalue()
+
+
+def _stream(content: bytes, attrs: bytes = b'') -> bytes:
+    return b'<< ' + attrs + f' /Length {len(content)} >>\nstream\n'.encode() + content + b'\nendstream'
+
+
+FONT = b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'
+
+
+def _xobject_text_pdf(text: str) -> bytes:
+    """One page whose only text is drawn by a Form XObject; the page itself declares no fonts."""
+    form = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+    return _build_pdf([
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+        b'/Resources << /XObject << /Fm1 4 0 R >> >> /Contents 5 0 R >>',
+        _stream(form, b'/Type /XObject /Subtype /Form /BBox [0 0 612 792] /Resources << /Font << /F1 6 0 R >> >>'),
+        _stream(b'q /Fm1 Do Q'),
+        FONT,
+    ])
+
+
+def _image_only_pdf() -> bytes:
+    """One page with neither fonts nor Form XObjects."""
+    return _build_pdf([
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << >> /Contents 4 0 R >>',
+        _stream(b'0 0 1 rg 0 0 100 100 re f'),
+    ])
+
+
+class PdfTextTests(SimpleTestCase):
+
+    def test_text_drawn_through_form_xobject(self):
+        result = extract_pdf_text(io.BytesIO(_xobject_text_pdf('Income limit Rs 2,50,000')), max_workers=1)
+        self.assertIn('Income limit Rs 2,50,000', result.text)
+        self.assertFalse(result.pages[0].skipped)
+
+    def test_page_without_fonts_is_skipped(self):
+        result = extract_pdf_text(io.BytesIO(_image_only_pdf()), max_workers=1)
+        self.assertEqual(result.text, '')
+        self.assertTrue(result.pages[0].skipped)
+
+
+def _evaluation(user_value: str) -> dict:
+    return {
+        'status': 'Eligible', 'match_percentage': 100,
+        'conditions': [{'label': 'Annual income', 'status': 'pass', 'required': '< 300000',
+                        'yourValue': user_value, 'detail': ''}],
+    }
+
+
+class AnswerCacheTests(TestCase):
+
+    def setUp(self):
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+
+    def _scheme(self, user, user_value):
+        return SchemeEvaluation.objects.create(
+            user=user, scheme_name='PM Scheme', status='Eligible', match_percentage=100,
+            extracted_rules=[{'field': 'income', 'operator': '<', 'value': 300000}],
+            evaluation_result=_evaluation(user_value),
+        )
+
+    def test_answers_are_not_shared_across_different_user_values(self):
+        store_answer(self._scheme(self.alice, '250000'), 'Am I eligible?', 'Yes, your 2.5 lakh income is eligible.')
+        self.assertIsNone(get_cached_answer(self._scheme(self.bob, '120000'), 'Am I eligible?'))
+
+    def test_answers_are_shared_for_identical_evaluations(self):
+        store_answer(self._scheme(self.alice, '250000'), 'Am I eligible?', 'Yes.')
+        self.assertEqual(get_cached_answer(self._scheme(self.bob, '250000'), 'am i eligible'), 'Yes.')
+
+    def test_near_duplicates_must_agree_on_numbers_and_negations(self):
+        scheme = self._scheme(self.alice, '250000')
+        cases = [
+            ('can i apply if my income is 2 lakh', 'can i apply if my income is 3 lakh'),
+            ('what documents do i need for this scheme', 'what documents do i not need for this scheme'),
+            ('is the deadline in march 2025', 'is the deadline in march 2026'),
+            ('can i apply online', "can't i apply online"),
+        ]
+        for stored, asked in cases:
+            with self.subTest(asked=asked):
+                store_answer(scheme, stored, f'Answer to {stored}')
+                self.assertIsNone(get_cached_answer(scheme, asked))
+
+    def test_near_duplicate_wording_is_served(self):
+        scheme = self._scheme(self.alice, '250000')
+        store_answer(scheme, 'What documents do I need for this scheme?', 'Aadhaar and income certificate.')
+        self.assertEqual(get_cached_answer(scheme, 'what documents do i need for the scheme'),
+                         'Aadhaar and income certificate.')
+
+    @override_settings(ELIGIFY_LLM_PROVIDER='fake', ELIGIFY_LLM_FAKE_LATENCY=0, ELIGIFY_UPLOAD_SWEEP_INTERVAL=0)
+    def test_follow_up_questions_skip_the_cache(self):
+        services.reset_client()
+        self.addCleanup(services.reset_client)
+        scheme = self._scheme(self.alice, '250000')
+        store_answer(scheme, 'What about documents?', 'Cached opening answer.')
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        url = f'/api/scheme/{scheme.scheme_id}/chat/'
+
+        append_exchange(scheme, 'Am I eligible?', 'Yes.')
+        response = client.post(url, {'message': 'What about documents?'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['cached'])
+        self.assertNotEqual(response.data['response'], 'Cached opening answer.')
+
+
+class RulePlanTests(SimpleTestCase):
+    """Compiled plans give the statuses the rule-by-rule evaluator gave before rules were compiled."""
+
+    CASES = [
+        ('SC', '==', 'sc', 'satisfied'),
+        (' SC ', 'eq', 'sc', 'satisfied'),
+        ('OBC', '==', 'SC', 'not-satisfied'),
+        (True, '==', True, 'satisfied'),
+        ('true', '==', True, 'satisfied'),
+        (1, '==', True, 'not-satisfied'),
+        ('5,00,000', '==', 500000, 'satisfied'),
+        ('₹6000', '==', '6000', 'not-satisfied'),
+        (6000, '==', '6000', 'satisfied'),
+        ('abc', '==', 5, 'not-satisfied'),
+        ('SC', '!=', 'sc', 'not-satisfied'),
+        ('OBC', 'neq', 'SC', 'satisfied'),
+        ('', '!=', 'SC', 'missing'),
+        ('₹2,40,000', '<', 300000, 'satisfied'),
+        ('85.5%', '>=', '85.5', 'satisfied'),
+        (18, 'gte', 18, 'satisfied'),
+        (17, 'gt', 18, 'not-satisfied'),
+        ('approx five lakh', '<', 500000, 'missing'),
+        (5, 'lt', 'abc', 'missing'),
+        ('goa', 'in', ['Goa', 'Bihar'], 'satisfied'),
+        ('Kerala', 'in', ['Goa'], 'not-satisfied'),
+        ('Goa', 'in', 'Goa', 'missing'),
+        ('Goa', 'not_in', [' goa'], 'not-satisfied'),
+        ('Kerala', 'not_in', ['Goa'], 'satisfied'),
+        ('Goa', 'not_in', 'Goa', 'missing'),
+        (25, 'between', [18, 40], 'satisfied'),
+        ('41', 'between', ['18', '40'], 'not-satisfied'),
+        (25, 'between', [18], 'missing'),
+        (25, 'between', ['adults', 40], 'missing'),
+        ('unknown', 'between', [1, 2], 'missing'),
+        ('Farmer', 'exists', None, 'satisfied'),
+        (False, 'exists', None, 'missing'),
+        ([], 'in', ['a'], 'missing'),
+        (None, '==', None, 'missing'),
+    ]
+
+    def test_operator_semantics(self):
+        for user_value, operator, expected, status in self.CASES:
+            with self.subTest(user_value=user_value, operator=operator, expected=expected):
+                rules = [{'field': 'custom', 'operator': operator, 'value': expected}]
+                self.assertEqual(compile_rules(rules).rules[0].evaluate(user_value), status)
+                result = evaluate_eligibility({'custom': user_value}, rules)
+                self.assertEqual(result['conditions'][0]['status'], status)
+
+    def test_unknown_operator_is_missing(self):
+        with self.assertLogs('eligify.engine', 'WARNING'):
+            plan = compile_rules([{'field': 'state', 'operator': 'matches', 'value': 'Goa'}], use_cache=False)
+        self.assertEqual(plan.rules[0].evaluate('Goa'), 'missing')
+
+    def test_plans_are_cached_by_content(self):
+        rules = [{'field': 'age', 'operator': '>=', 'value': 18, 'label': 'Age'}]
+        reordered = [{'label': 'Age', 'value': 18, 'operator': '>=', 'field': 'age'}]
+        self.assertIs(compile_rules(rules), compile_rules(reordered))
+        self.assertIsNot(compile_rules(rules), compile_rules([{**rules[0], 'value': 21}]))
+
+    def test_conditions_from_a_plan_match_the_rule_list(self):
+        rules = [
+            {'field': 'annual_income', 'operator': '<', 'value': 300000, 'label': 'Income', 'detail': 'Below 3L'},
+            {'field': 'category', 'operator': 'in', 'value': ['SC', 'ST'], 'label': 'Category'},
+            {'field': 'age', 'operator': 'between', 'value': [18, 40]},
+            {'field': 'family_members_count', 'operator': '<=', 'value': 4},
+        ]
+        profile = {'annual_income': '₹2,40,000', 'category': '', 'dob': None, 'family_members': [{}, {}]}
+        result = evaluate_eligibility(profile, rules)
+        self.assertEqual(result, evaluate_eligibility(profile, compile_rules(rules, use_cache=False)))
+        self.assertEqual(result['conditions'], [
+            {'label': 'Income', 'status': 'satisfied', 'detail': 'Below 3L', 'yourValue': '₹2,40,000',
+             'required': '300000', 'field': 'annual_income'},
+            {'label': 'Category', 'status': 'missing', 'detail': '', 'yourValue': 'Not provided',
+             'required': 'SC, ST', 'field': 'category'},
+            {'label': 'age', 'status': 'missing', 'detail': '', 'yourValue': 'Not provided',
+             'required': '18, 40', 'field': 'age'},
+            {'label': 'family_members_count', 'status': 'satisfied', 'detail': '', 'yourValue': '2',
+             'required': '4', 'field': 'family_members_count'},
+        ])
+        self.assertEqual((result['match_percentage'], result['status']), (50, 'Partial'))
+
+
+class DiscoveryTests(SimpleTestCase):
+
+    def test_discover_matches_a_full_scan(self):
+        rng = random.Random(7)
+        index = SchemeIndex([(generate_rules(rng, OPERATOR_MIXES['mixed'], 1, 6), {'n': n}) for n in range(150)])
+        for _ in range(40):
+            profile = ProfileSnapshot.from_dict(generate_profile(rng))
+            for min_match in (0, 50, 100):
+                scan = []
+                for scheme_id in index.order:
+                    result = evaluate_eligibility(profile, index.plans[scheme_id])
+                    if result['match_percentage'] >= min_match:
+                        scan.append({**index.meta[scheme_id], 'matchPercent': result['match_percentage'],
+                                     'status': result['status']})
+                scan.sort(key=lambda r: -r['matchPercent'])
+                for limit in (1, 10):
+                    found = index.discover(profile, limit=limit, min_match=min_match)['results']
+                    self.assertEqual(found, scan[:limit])
+
+
+
+class SimulatorTests(SimpleTestCase):
+
+    AXES = {
+        'annual_income': [60000, '₹2,50,000', 'Rs. 300000', '9,50,000', 'unknown', ''],
+        'category': ['General', 'sc', 'EWS', ''],
+        'dob': ['1960-01-01', '2000-06-15', '2008-12-31', None],
+    }
+
+    def test_every_grid_point_matches_evaluate_eligibility(self):
+        rng = random.Random(11)
+        for _ in range(60):
+            base = generate_profile(rng)
+            rules = generate_rules(rng, OPERATOR_MIXES['mixed'], 1, 8)
+            result = simulate(base, rules, self.AXES)
+            for i, income in enumerate(self.AXES['annual_income']):
+                for j, category in enumerate(self.AXES['category']):
+                    for k, dob in enumerate(self.AXES['dob']):
+                        point = {**base, 'annual_income': income, 'category': category, 'dob': dob}
+                        expected = evaluate_eligibility(point, rules)
+                        self.assertEqual(result['match_percentage'][i][j][k], expected['match_percentage'])
+                        self.assertEqual(result['status'][i][j][k], expected['status'])
+
+    def test_summary_counts_engine_statuses(self):
+        rules = [{'field': 'annual_income', 'operator': '<', 'value': 300000},
+                 {'field': 'category', 'operator': 'in', 'value': ['SC', 'ST']}]
+        result = simulate({'category': 'SC'}, rules, {'annual_income': [100000, 500000, '']})
+        self.assertEqual(result['status'], ['Eligible', 'Partial', 'Partial'])
+        self.assertEqual(result['summary'], {'points': 3, 'eligible': 1, 'partial': 2, 'not_eligible': 0})
+
+
+class DiscoveryIndexVersionTests(TestCase):
+
+    def test_version_changes_when_rules_are_edited_in_place(self):
+        scheme = SchemeEvaluation.objects.create(user=User.objects.create_user('alice'), scheme_name='S',
+                                                 extracted_rules=[{'field': 'age', 'operator': '>=', 'value': 18}])
+        before = _current_version()
+        scheme.extracted_rules = [{'field': 'age', 'operator': '>=', 'value': 21}]
+        scheme.save(update_fields=['extracted_rules', 'updated_at'])
+        self.assertNotEqual(_current_version(), before)
+
+
+@override_settings(ELIGIFY_UPLOAD_MAX_ATTEMPTS=2, ELIGIFY_UPLOAD_STALL_TIMEOUT=60)
+class RequeueStalledJobsTests(TestCase):
+
+    def _job(self, stage, attempts, idle_seconds):
+        user = User.objects.create_user(f'uploader{UploadJob.objects.count()}')
+        job = UploadJob.objects.create(user=user, stage=stage, attempts=attempts, source_pdf='scheme_pdfs/s.pdf')
+        UploadJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(seconds=idle_seconds))
+        return job.pk
+
+    def test_stalled_jobs_are_requeued_until_the_attempt_limit(self):
+        retry = self._job(UploadJob.STAGE_EXTRACTING, 1, 120)
+        exhausted = self._job(UploadJob.STAGE_PARSING, 2, 120)
+        active = self._job(UploadJob.STAGE_PARSING, 1, 5)
+
+        self.assertEqual(requeue_stalled_jobs(), 1)
+        stages = dict(UploadJob.objects.values_list('pk', 'stage'))
+        self.assertEqual(stages[retry], UploadJob.STAGE_QUEUED)
+        self.assertEqual(stages[exhausted], UploadJob.STAGE_FAILED)
+        self.assertEqual(stages[active], UploadJob.STAGE_PARSING)
+
+
+@override_settings(ELIGIFY_UPLOAD_SWEEP_INTERVAL=0)
+class SchemeDetailVersionTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('alice')
+        self.scheme = SchemeEvaluation.objects.create(
+            user=self.user, scheme_name='PM Scheme', required_documents=[{'name': 'Aadhaar Card'}],
+        )
+        self.document = Document.objects.create(user=self.user, name='aadhar', file='documents/a.pdf')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/scheme/{self.scheme.scheme_id}/'
+
+    def test_document_changes_made_elsewhere_change_the_etag(self):
+        first = self.client.get(self.url)
+        self.assertTrue(first.data['documents'][0]['available'])
+
+        # As if another process, whose local cache receives no signals, deleted it
+        with mock.patch('eligify.detail_cache.invalidate_user'):
+            self.document.delete()
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertFalse(second.data['documents'][0]['available'])
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=second['ETag']).status_code, 304)
+
+    def test_render_reads_the_documents_version_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        aggregates = [q['sql'] for q in queries if 'accounts_document' in q['sql'] and 'COUNT(' in q['sql']]
+        self.assertEqual(len(aggregates), 1)
+
+
+class RepairJsonTests(SimpleTestCase):
+
+    def test_valid_json_is_not_repaired(self):
+        self.assertEqual(repair_json('{"a": [1, 2]}'), ({'a': [1, 2]}, False))
+
+    def test_cosmetic_defects(self):
+        cases = [
+            ('markdown fence', '```json\n{"a": 1}\n```', {'a': 1}),
+            ('prose around', 'Here is the JSON: {"a": 1} Hope this helps!', {'a': 1}),
+            ('trailing commas', '{"a": [1, 2,], "b": {"c": 3,},}', {'a': [1, 2], 'b': {'c': 3}}),
+            ('curly quotes', '{“a”: “b c”}', {'a': 'b c'}),
+            ('python literals', '{"a": True, "b": False, "c": None}', {'a': True, 'b': False, 'c': None}),
+            ('literal words in strings', '{"a": True, "b": "None of the above"}',
+             {'a': True, 'b': 'None of the above'}),
+            ('raw newline in string', '{"a": "line\nbreak"}', {'a': 'line\nbreak'}),
+        ]
+        for name, raw, expected in cases:
+            with self.subTest(name):
+                self.assertEqual(repair_json(raw), (expected, True))
+
+    def test_truncated_output_is_not_guessed(self):
+        with self.assertRaises(json.JSONDecodeError):
+            repair_json('{"scheme_name": "PM Kisan", "eligibility_rules": [{"field": "age"')
+
+
+class ExtractionCoercionTests(SimpleTestCase):
+
+    def test_amounts(self):
+        cases = [
+            ('Rs. 5,00,000', 500000), ('₹5,00,000', 500000), ('INR 50k', 50000), ('₹2.5 lakh', 250000),
+            ('1.2 crore', 12000000), ('Rs. 6,000/year', 6000), ('85%', 85), ('85.5%', 85.5), ('18 years', 18),
+            (40000, 40000), ('about five', None), (True, None),
+        ]
+        for raw, expected in cases:
+            with self.subTest(raw=raw):
+                self.assertEqual(_number(raw), expected)
+
+    def test_values(self):
+        cases = [
+            ('age', 'between', '18-40', [18, 40]),
+            ('age', 'between', '40 to 18', [18, 40]),
+            ('annual_income', 'between', ['₹1 lakh', '₹2.5 lakh'], [100000, 250000]),
+            ('age', 'between', 'adults', ['adults']),
+            ('state', 'in', 'Goa, Kerala', ['Goa', 'Kerala']),
+            ('state', 'not_in', 'Goa', ['Goa']),
+            ('disability_status', '==', 'Yes', True),
+            ('minority_status', '==', 'no', False),
+            ('annual_income', '<', 'Rs. 2,50,000', 250000),
+            ('age', '>=', ['18'], 18),
+            ('state', '==', 'Goa', 'Goa'),
+            ('state', 'exists', 'anything', None),
+        ]
+        for field, operator, raw, expected in cases:
+            with self.subTest(field=field, operator=operator, raw=raw):
+                self.assertEqual(_coerce_value(field, operator, raw), expected)
+
+    def test_rules(self):
+        cases = [
+            ({'field': 'Caste Category', 'operator': '==', 'value': ['SC', 'ST']},
+             {'field': 'caste_category', 'label': 'caste_category', 'operator': 'in', 'value': ['SC', 'ST'],
+              'detail': ''}),
+            ({'field': 'state', 'operator': '!=', 'value': ['Goa', 'Bihar'], 'label': 'State'},
+             {'field': 'state', 'label': 'State', 'operator': 'not_in', 'value': ['Goa', 'Bihar'], 'detail': ''}),
+            ({'field': 'age', 'operator': 'at_least', 'value': '18 years'},
+             {'field': 'age', 'label': 'age', 'operator': '>=', 'value': 18, 'detail': ''}),
+            ({'field': 'age', 'operator': 'approximately', 'value': 18}, None),
+            ({'field': '', 'operator': '==', 'value': 'x'}, None),
+            ('not a rule', None),
+        ]
+        for raw, expected in cases:
+            with self.subTest(raw=raw):
+                self.assertEqual(_rule(raw), expected)
+
+    def test_validate_extraction(self):
+        data, fixes = validate_extraction({
+            'scheme_name': ' PM Kisan ', 'category': 'agriculture', 'tags': 'farmers, income',
+            'eligibility_rules': [{'field': 'age', 'operator': '>=', 'value': 18, 'label': 'Age', 'detail': ''},
+                                  {'field': 'age', 'operator': '~', 'value': 1}],
+            'required_documents': ['Aadhaar Card'],
+            'application_steps': [{'title': 'Register'}],
+        })
+        self.assertEqual(data['scheme_name'], 'PM Kisan')
+        self.assertEqual(data['category'], 'Agriculture')
+        self.assertEqual(data['tags'], ['farmers', 'income'])
+        self.assertEqual(data['max_benefit'], 'Varies')
+        self.assertEqual(len(data['eligibility_rules']), 1)
+        self.assertEqual(data['required_documents'], [{'name': 'Aadhaar Card', 'digilocker': False}])
+        self.assertEqual(data['application_steps'], [{'step': 1, 'title': 'Register', 'description': ''}])
+        self.assertGreater(fixes, 0)
+
+        with self.assertRaises(ValueError):
+            validate_extraction({'scheme_name': 'x', 'eligibility_rules': [], 'required_documents': []})
+        with self.assertRaises(ValueError):
+            validate_extraction({'scheme_name': 'x', 'eligibility_rules': {}, 'required_documents': [],
+                                 'application_steps': []})
+
+
+class CohortTests(TestCase):
+    """The SQL pushdown (plus Python fallback) selects exactly the profiles the engine finds Eligible."""
+
+    REFERENCE_DATE = date(2026, 6, 15)
+    PROFILES = [
+        {'state': 'Goa', 'gender': 'Female', 'dob': date(2000, 6, 15), 'category': 'SC', 'annual_income': '₹2,40,000',
+         'marks_percentage': '78', 'area_type': 'Rural', 'minority_status': True, 'family_members': [{}, {}]},
+        {'state': ' goa ', 'gender': 'male', 'dob': date(2008, 6, 16), 'category': 'OBC', 'annual_income': '120000',
+         'marks_percentage': '91%', 'area_type': 'Urban', 'family_members': [{}] * 5},
+        {'state': 'Kerala', 'gender': 'Female', 'dob': date(1960, 1, 1), 'category': 'General',
+         'annual_income': '9,50,000', 'marks_percentage': 'N/A', 'disability_status': True},
+        {'state': 'Bihar', 'gender': 'Other', 'dob': None, 'category': '', 'annual_income': 'approx five lakh',
+         'area_type': 'Rural', 'family_members': [{}]},
+        {'state': '', 'gender': '', 'dob': date(1990, 2, 28), 'category': 'ST', 'annual_income': 'Rs 300000',
+         'marks_percentage': '62.5'},
+        {'state': 'Maharashtra', 'gender': 'Male', 'dob': date(2008, 6, 15), 'category': 'EWS',
+         'annual_income': '480,000', 'marks_percentage': '45', 'area_type': 'Urban', 'family_members': [{}] * 3},
+    ]
+    RULE_SETS = [
+        [{'field': 'state', 'operator': '==', 'value': 'Goa'}],
+        [{'field': 'state', 'operator': 'not_in', 'value': ['Goa', 'Bihar']},
+         {'field': 'gender', 'operator': 'exists'}],
+        [{'field': 'age', 'operator': '>=', 'value': 18}, {'field': 'age', 'operator': '<', 'value': 60}],
+        [{'field': 'age', 'operator': 'between', 'value': [18, 40]}],
+        [{'field': 'age', 'operator': 'in', 'value': ['18', '26', '36']}],
+        [{'field': 'annual_income', 'operator': '<=', 'value': 300000}],
+        [{'field': 'annual_income', 'operator': 'between', 'value': ['₹1,00,000', '₹5,00,000']}],
+        [{'field': 'marks_percentage', 'operator': '>', 'value': '60%'},
+         {'field': 'category', 'operator': '!=', 'value': 'General'}],
+        [{'field': 'minority_status', 'operator': '==', 'value': True}],
+        [{'field': 'disability_status', 'operator': 'exists'}],
+        [{'field': 'category', 'operator': 'in', 'value': ['SC', 'ST', 'OBC']},
+         {'field': 'area_type', 'operator': '==', 'value': 'rural'}],
+        # Not pushed down: family_members_count and a numeric == on a text field
+        [{'field': 'family_members_count', 'operator': '>=', 'value': 3}, {'field': 'state', 'operator': 'exists'}],
+        [{'field': 'annual_income', 'operator': '==', 'value': 120000}],
+        [],
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        for n, values in enumerate(cls.PROFILES):
+            user = User.objects.create_user(f'citizen{n}')
+            UserProfile.objects.filter(user=user).update(**values)
+
+    def _engine_cohort(self, rules):
+        cohort = []
+        for profile in UserProfile.objects.order_by('pk'):
+            snapshot = ProfileSnapshot.from_profile(profile, self.REFERENCE_DATE)
+            if evaluate_eligibility(snapshot, rules)['status'] == 'Eligible':
+                cohort.append(profile.pk)
+        return cohort
+
+    def test_pushdown_matches_the_engine(self):
+        for rules in self.RULE_SETS:
+            with self.subTest(rules=rules):
+                cohort = compile_cohort_filter(rules, self.REFERENCE_DATE)
+                expected = self._engine_cohort(rules)
+                self.assertEqual(cohort_pks(rules, self.REFERENCE_DATE, cohort), expected)
+                if not cohort.fallback_rules:
+                    queryset = cohort_queryset(rules, self.REFERENCE_DATE, cohort)
+                    self.assertEqual(list(queryset.values_list('pk', flat=True)), expected)
+
+    def test_generated_rules_match_the_engine(self):
+        rng = random.Random(11)
+        for _ in range(60):
+            rules = generate_rules(rng, OPERATOR_MIXES['mixed'], 1, 3)
+            with self.subTest(rules=rules):
+                self.assertEqual(cohort_pks(rules, self.REFERENCE_DATE), self._engine_cohort(rules))
+
+
+class KeysetTests(TestCase):
+
+    def test_cursor_round_trip(self):
+        created_at = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, '42'))
+        for cursor in ('not base64!', 'bm8gc2VwYXJhdG9y', ''):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+    def test_pages_cover_every_row_once_with_tied_timestamps(self):
+        user = User.objects.create_user('alice')
+        schemes = [SchemeEvaluation.objects.create(user=user, scheme_name=f'S{n}') for n in range(7)]
+        tied = timezone.now()
+        # Three rows share a created_at, so the order falls back to the key
+        later = tied + timedelta(seconds=1)
+        SchemeEvaluation.objects.filter(pk__in=[s.pk for s in schemes[2:5]]).update(created_at=tied)
+        SchemeEvaluation.objects.filter(pk__in=[s.pk for s in schemes[5:]]).update(created_at=later)
+        queryset = SchemeEvaluation.objects.filter(user=user)
+        expected = list(queryset.order_by('-created_at', '-scheme_id').values_list('scheme_id', flat=True))
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = page(queryset, cursor, 2, key='scheme_id')
+            seen += [row.scheme_id for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_cursor_with_an_invalid_key(self):
+        with self.assertRaises(ValueError):
+            page(SchemeEvaluation.objects.all(), encode_cursor(timezone.now(), 'not-a-uuid'), 10, key='scheme_id')
+
+
+class _FakeClock:
+    """Stands in for the time module inside eligify.quota; sleep() advances the clock."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@override_settings(ELIGIFY_GEMINI_BURST=3, ELIGIFY_GEMINI_RPM=60, ELIGIFY_GEMINI_INTERACTIVE_RESERVE=1,
+                   ELIGIFY_GEMINI_BREAKER_COOLDOWN=30, ELIGIFY_GEMINI_BREAKER_MAX_COOLDOWN=100)
+class QuotaTests(TestCase):
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        patcher = mock.patch.object(quota, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bulk_calls_leave_the_interactive_reserve(self):
+        quota.acquire(quota.BULK)
+        quota.acquire(quota.BULK)
+        with self.assertRaises(quota.QuotaUnavailable) as raised:
+            quota.acquire(quota.BULK)
+        self.assertAlmostEqual(raised.exception.retry_after, 1.0)
+        quota.acquire(quota.INTERACTIVE)
+        with self.assertRaises(quota.QuotaUnavailable):
+            quota.acquire(quota.INTERACTIVE)
+
+        counters = quota.snapshot()['counters']
+        self.assertEqual((counters['admitted_bulk'], counters['rejected_bulk']), (2, 1))
+        self.assertEqual((counters['admitted_interactive'], counters['rejected_interactive']), (1, 1))
+
+    def test_bucket_refills_over_time_up_to_the_burst(self):
+        for _ in range(3):
+            quota.acquire(quota.INTERACTIVE)
+        self.clock.now += 2
+        quota.acquire(quota.BULK)
+        self.clock.now += 3600
+        self.assertEqual(quota.snapshot()['bucket']['tokens'], 3)
+
+    def test_waiting_callers_are_admitted_once_a_token_refills(self):
+        for _ in range(3):
+            quota.acquire(quota.INTERACTIVE)
+        with mock.patch.object(quota.random, 'uniform', return_value=1.0):
+            quota.acquire(quota.INTERACTIVE, max_wait=5)
+        self.assertGreaterEqual(self.clock.now, 1_000_001.0)
+        self.assertEqual(quota.snapshot()['counters']['waits'], 1)
+
+    def test_lost_compare_and_swap_is_retried_without_double_spending(self):
+        load = quota._load
+        raced = []
+
+        def racing_load():
+            state = load()
+            if not raced:
+                # Another process takes a token between our read and our write
+                raced.append(True)
+                GeminiQuota.objects.filter(name=quota.QUOTA_NAME).update(tokens=state.tokens - 1,
+                                                                         version=state.version + 1)
+            return state
+
+        with mock.patch.object(quota, '_load', racing_load):
+            quota.acquire(quota.INTERACTIVE)
+        self.assertEqual(GeminiQuota.objects.get(name=quota.QUOTA_NAME).tokens, 1)
+
+    def test_breaker_fails_fast_and_backs_off(self):
+        logs = self.enterContext(self.assertLogs('eligify.quota', 'WARNING'))
+        quota.trip_breaker()
+        with self.assertRaises(quota.QuotaUnavailable) as raised:
+            quota.acquire(quota.INTERACTIVE, max_wait=10)
+        self.assertAlmostEqual(raised.exception.retry_after, 30)
+        self.assertIn('exhausted', str(raised.exception))
+
+        quota.trip_breaker()  # already open: counted, not extended
+        self.assertEqual(quota.snapshot()['breaker']['open_for_seconds'], 30)
+
+        self.clock.now += 31
+        quota.trip_breaker()
+        self.assertEqual(quota.snapshot()['breaker']['open_for_seconds'], 60)
+        self.clock.now += 61
+        quota.trip_breaker(retry_delay=500)
+        self.assertEqual(quota.snapshot()['breaker']['open_for_seconds'], 100)
+
+        self.clock.now += 101
+        quota.record_success()
+        quota.trip_breaker()
+        breaker = quota.snapshot()['breaker']
+        self.assertEqual((breaker['open_for_seconds'], breaker['consecutive_trips']), (30, 1))
+        counters = quota.snapshot()['counters']
+        self.assertEqual((counters['breaker_trips'], counters['rate_limited']), (4, 5))
+        self.assertEqual(len(logs.output), 4)
+
+
+@override_settings(ELIGIFY_UPLOAD_SWEEP_INTERVAL=0)
+class ReevaluationTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user('alice')
+        UserProfile.objects.filter(user=user).update(annual_income='500000', state='Goa', dob=date(1990, 1, 1))
+        self.user = User.objects.get(pk=user.pk)
+        self.schemes = {
+            name: SchemeEvaluation.objects.create(
+                user=self.user, scheme_name=name, extracted_rules=rules,
+                status='Not Eligible', evaluation_result={'stale': True},
+            )
+            for name, rules in [
+                ('income', [{'field': 'annual_income', 'operator': '<', 'value': 300000}]),
+                ('state', [{'field': 'state', 'operator': '==', 'value': 'Goa'}]),
+                ('age', [{'field': 'age', 'operator': '>=', 'value': 18}]),
+            ]
+        }
+
+    def _stored(self, name):
+        return SchemeEvaluation.objects.get(pk=self.schemes[name].pk)
+
+    def test_only_schemes_reading_a_changed_field_are_rewritten(self):
+        UserProfile.objects.filter(user=self.user).update(annual_income='2,40,000')
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(reevaluate_for_changed_fields(user, ['annual_income']), 1)
+        self.assertEqual(self._stored('income').status, 'Eligible')
+        self.assertEqual(self._stored('income').evaluation_result['conditions'][0]['yourValue'], '2,40,000')
+        self.assertGreater(self._stored('income').updated_at, self.schemes['income'].updated_at)
+        for name in ('state', 'age'):
+            self.assertEqual(self._stored(name).evaluation_result, {'stale': True})
+
+    def test_derived_fields_follow_their_source(self):
+        self.assertEqual(reevaluate_for_changed_fields(self.user, ['dob']), 1)
+        self.assertEqual(self._stored('age').status, 'Eligible')
+        self.assertEqual(reevaluate_for_changed_fields(self.user, []), 0)
+
+    def test_profile_update_reevaluates_changed_fields(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.patch('/api/auth/profile/full-update/', {'state': 'Kerala', 'annual_income': '500000'},
+                                format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['reevaluated_schemes'], 1)
+        self.assertEqual(self._stored('state').status, 'Not Eligible')
+        self.assertEqual(self._stored('state').evaluation_result['conditions'][0]['yourValue'], 'Kerala')
+        self.assertEqual(self._stored('income').evaluation_result, {'stale': True})
+
+
+def _sse_events(chunks) -> list:
+    """(event, data) pairs from a text/event-stream body."""
+    body = b''.join(chunks).decode('utf-8')
+    events = []
+    for block in body.split('\n\n'):
+        if block:
+            event, data = block.split('\n')
+            events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+    return events
+
+
+@override_settings(ELIGIFY_LLM_PROVIDER='fake', ELIGIFY_LLM_FAKE_LATENCY=0, ELIGIFY_UPLOAD_SWEEP_INTERVAL=0)
+class ChatStreamTests(TestCase):
+
+    def setUp(self):
+        services.reset_client()
+        self.addCleanup(services.reset_client)
+        self.user = User.objects.create_user('alice')
+        self.scheme = SchemeEvaluation.objects.create(
+            user=self.user, scheme_name='PM Scheme', status='Eligible', match_percentage=100,
+            extracted_rules=[{'field': 'state', 'operator': '==', 'value': 'Goa'}],
+            evaluation_result=_evaluation('Goa'),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/scheme/{self.scheme.scheme_id}/chat/stream/'
+
+    def _post(self, message='Which documents do I need?'):
+        response = self.client.post(self.url, {'message': message}, format='json')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return response
+
+    def test_chunks_then_done_and_the_answer_is_saved(self):
+        events = _sse_events(self._post().streaming_content)
+        kinds = [kind for kind, _ in events]
+        self.assertGreater(len(kinds), 2)
+        self.assertEqual(set(kinds[:-1]), {'chunk'})
+        self.assertEqual(kinds[-1], 'done')
+
+        done = events[-1][1]
+        self.assertEqual(''.join(data['text'] for _, data in events[:-1]).strip(), done['response'])
+        self.assertIn('Which documents do I need?', done['response'])
+        self.assertFalse(done['cached'])
+        self.assertEqual(done['chat_count'], 1)
+        self.assertEqual([{'sender': m['sender'], 'text': m['text']} for m in done['messages']],
+                         recent_history(self.scheme))
+        self.assertEqual(get_cached_answer(self.scheme, 'which documents do i need'), done['response'])
+
+    def test_cached_answer_is_one_chunk(self):
+        store_answer(self.scheme, 'Which documents do I need?', 'Aadhaar.')
+        events = _sse_events(self._post().streaming_content)
+        self.assertEqual([kind for kind, _ in events], ['chunk', 'done'])
+        self.assertEqual(events[0][1], {'text': 'Aadhaar.'})
+        self.assertTrue(events[1][1]['cached'])
+        self.assertEqual(len(recent_history(self.scheme)), 2)
+
+    def test_rate_limit_mid_stream_sends_an_error_and_saves_nothing(self):
+        def rate_limited(**kwargs):
+            yield 'Partial '
+            raise services.GeminiRateLimitError('429')
+
+        with mock.patch('eligify.views.stream_chat_response', rate_limited):
+            events = _sse_events(self._post().streaming_content)
+        self.assertEqual([kind for kind, _ in events], ['chunk', 'error'])
+        self.assertEqual(events[1][1]['status'], 429)
+        self.assertEqual(recent_history(self.scheme), [])
+
+    def test_disconnect_before_done_saves_nothing(self):
+        response = self._post()
+        first = next(iter(response.streaming_content))
+        self.assertTrue(first.startswith(b'event: chunk'))
+        response.close()
+        self.assertEqual(recent_history(self.scheme), [])
+        self.assertIsNone(get_cached_answer(self.scheme, 'Which documents do I need?'))
+
+
+class LLMProviderTests(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        self.upstream = llm.FakeClient(latency=0)
+        self.config = genai_types.GenerateContentConfig(system_instruction='You are a scheme assistant.')
+
+    def test_replay_returns_what_was_recorded(self):
+        recorder = llm.RecordReplayClient(self.directory, upstream=self.upstream)
+        recorded = recorder.models.generate_content(model='m', contents='User: Am I eligible?', config=self.config)
+        streamed = [c.text for c in recorder.models.generate_content_stream(model='m', contents='User: Documents?',
+                                                                            config=self.config)]
+        self.assertEqual(len(list(self.directory.glob('*.json'))), 2)
+
+        replay = llm.RecordReplayClient(self.directory)
+        self.assertEqual(replay.models.generate_content(model='m', contents='User: Am I eligible?',
+                                                        config=self.config).text, recorded.text)
+        self.assertEqual([c.text for c in replay.models.generate_content_stream(model='m', contents='User: Documents?',
+                                                                                config=self.config)], streamed)
+
+    def test_replay_miss_and_request_keys(self):
+        replay = llm.RecordReplayClient(self.directory)
+        with self.assertRaises(llm.ReplayMiss):
+            replay.models.generate_content(model='m', contents='never recorded')
+        with_timeout = self.config.model_copy(update={'http_options': genai_types.HttpOptions(timeout=5000)})
+        self.assertEqual(llm.request_key('m', 'x', self.config), llm.request_key('m', 'x', with_timeout))
+        self.assertNotEqual(llm.request_key('m', 'x', self.config), llm.request_key('m', 'y', self.config))
+        with self.assertRaises(genai_errors.ClientError):
+            replay.caches.create(model='m')
+
+    def test_abandoned_streams_are_not_recorded(self):
+        recorder = llm.RecordReplayClient(self.directory, upstream=self.upstream)
+        stream = recorder.models.generate_content_stream(model='m', contents='User: Documents?', config=self.config)
+        next(stream)
+        stream.close()
+        self.assertEqual(list(self.directory.glob('*.json')), [])
+
+    def test_fake_client_is_deterministic_and_injects_rate_limits(self):
+        prompt = 'Return "eligibility_rules" as JSON.\n--- PDF TEXT ---\nPM Kisan Samman Nidhi\nIncome below 2 lakh'
+        first = json.loads(llm.FakeClient(latency=0).answer(prompt, None))
+        self.assertEqual(first, json.loads(llm.FakeClient(latency=0, seed=9).answer(prompt, None)))
+        self.assertEqual(first['scheme_name'], 'PM Kisan Samman Nidhi')
+        validated, _ = validate_extraction(json.loads(json.dumps(first)))
+        self.assertEqual(len(validated['eligibility_rules']), len(first['eligibility_rules']))
+
+        translation = llm.FakeClient(latency=0).answer('Translate each string into Hindi.\n["Age", "Income"]', None)
+        self.assertEqual(json.loads(translation), ['[Hindi] Age', '[Hindi] Income'])
+
+        with self.assertRaises(genai_errors.ClientError) as raised:
+            llm.FakeClient(latency=0, rate_limit_rate=1.0).answer('hello', None)
+        self.assertEqual(raised.exception.code, 429)
+
+    def test_create_client(self):
+        self.assertIsInstance(llm.create_client('fake', lambda: None), llm.FakeClient)
+        with override_settings(ELIGIFY_LLM_RECORDINGS_DIR=self.directory):
+            self.assertIsNone(llm.create_client('replay', lambda: None).upstream)
+        with self.assertRaises(ImproperlyConfigured):
+            llm.create_client('openai', lambda: None)
+
+
+@override_settings(ELIGIFY_UPLOAD_SWEEP_INTERVAL=0)
+class DetailCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user('alice')
+        self.schemes = [SchemeEvaluation.objects.create(user=self.user, scheme_name=f'Scheme {n}') for n in range(2)]
+        self.other = SchemeEvaluation.objects.create(user=User.objects.create_user('bob'), scheme_name='Other')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _get(self, scheme, **params):
+        return self.client.get(f'/api/scheme/{scheme.scheme_id}/', params)
+
+    def _cached(self, scheme):
+        return cache.get(detail_cache._key(scheme.scheme_id)) is not None
+
+    def test_second_render_is_a_hit(self):
+        first = self._get(self.schemes[0])
+        second = self._get(self.schemes[0])
+        self.assertEqual(second.data, first.data)
+        stats = detail_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+    def test_sparse_requests_are_cut_from_the_cached_payload(self):
+        self.assertEqual(self._get(self.schemes[0], fields='name,tags').data, {'name': 'Scheme 0', 'tags': []})
+        self.assertFalse(self._cached(self.schemes[0]))
+        self._get(self.schemes[0])
+        self.assertEqual(self._get(self.schemes[0], fields='name').data, {'name': 'Scheme 0'})
+        self.assertEqual(detail_cache.stats()['hits'], 1)
+
+    def test_saves_drop_the_scheme_and_document_changes_drop_the_users_schemes(self):
+        for scheme in self.schemes + [self.other]:
+            detail_cache.store_payload(scheme.scheme_id, 'v', {})
+        self.schemes[0].save()
+        self.assertEqual([self._cached(s) for s in self.schemes], [False, True])
+
+        Document.objects.create(user=self.user, name='aadhar', file='documents/a.pdf')
+        self.assertFalse(self._cached(self.schemes[1]))
+        self.assertTrue(self._cached(self.other))
+
+    def test_writes_without_signals_are_not_served_stale(self):
+        self._get(self.schemes[0])
+        SchemeEvaluation.objects.filter(pk=self.schemes[0].pk).update(scheme_name='Renamed', updated_at=timezone.now())
+        self.assertEqual(self._get(self.schemes[0]).data['name'], 'Renamed')
+        self.assertEqual(detail_cache.stats()['hits'], 0)
+
+    def test_metrics_are_admin_only(self):
+        self.assertEqual(self.client.get('/api/cache/metrics/').status_code, 403)
+        self.client.force_authenticate(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get('/api/cache/metrics/').data['scheme_detail']['misses'], 0)
+
+
+@override_settings(ELIGIFY_UPLOAD_SWEEP_INTERVAL=0)
+class PayloadTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('alice')
+        self.scheme = SchemeEvaluation.objects.create(user=self.user, scheme_name='PM Scheme', status='Partial')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_fieldsets(self):
+        listing = self.client.get('/api/my-evaluations/', {'fields': 'schemeName, eligibility'})
+        self.assertEqual(listing.data, [{'schemeName': 'PM Scheme', 'eligibility': 'partial'}])
+        detail = self.client.get(f'/api/scheme/{self.scheme.scheme_id}/', {'exclude': 'chatHistory,chatHistoryCursor'})
+        self.assertNotIn('chatHistory', detail.data)
+        self.assertIn('conditions', detail.data)
+
+    def test_unknown_fields_are_rejected(self):
+        for url, params in [('/api/my-evaluations/', {'fields': 'schemeName,secret'}),
+                            (f'/api/scheme/{self.scheme.scheme_id}/', {'exclude': 'user'})]:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Unknown', response.data['error'])
+
+    def test_gzip_skips_event_streams(self):
+        middleware = GZipResponsesMiddleware(lambda request: None)
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        compressed = middleware.process_response(request, HttpResponse(b'{"name": "PM Scheme"}' * 50))
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        stream = middleware.process_response(request, StreamingHttpResponse(iter([b'event: chunk\n\n'])))
+        self.assertFalse(stream.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(stream.streaming_content), b'event: chunk\n\n')
+
+    def test_renderer_matches_drf(self):
+        data = {
+            'name': 'योजना\u2028line\u2029', 'amount': Decimal('12.50'), 'id': self.scheme.scheme_id,
+            'created': self.scheme.created_at, 'day': date(2026, 6, 15), 'ratio': 0.1,
+            'nested': [{'ok': True, 'none': None, 1: 'int key'}], 'tags': ('a', 'b'),
+        }
+        for payload in (data, [], {'big': 2 ** 70}):
+            with self.subTest(payload=payload):
+                self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
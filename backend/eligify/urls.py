@@ -3,8 +3,17 @@ from . import views
 
 urlpatterns = [
     path('scheme/upload/', views.upload_scheme, name='scheme-upload'),
+    path('scheme/jobs/<uuid:job_id>/', views.upload_job_status, name='scheme-upload-job'),
     path('scheme/<uuid:scheme_id>/', views.scheme_detail, name='scheme-detail'),
     path('scheme/<uuid:scheme_id>/chat/', views.scheme_chat, name='scheme-chat'),
+    path('scheme/<uuid:scheme_id>/chat/stream/', views.scheme_chat_stream, name='scheme-chat-stream'),
+    path('scheme/<uuid:scheme_id>/messages/', views.scheme_messages, name='scheme-messages'),
     path('scheme/<uuid:scheme_id>/re-evaluate/', views.re_evaluate, name='scheme-re-evaluate'),
+    path('scheme/<uuid:scheme_id>/language/', views.switch_language, name='scheme-language'),
+    path('scheme/<uuid:scheme_id>/what-if/', views.what_if, name='scheme-what-if'),
+    path('scheme/<uuid:scheme_id>/cohort/', views.scheme_cohort, name='scheme-cohort'),
     path('my-evaluations/', views.my_evaluations, name='my-evaluations'),
+    path('schemes/discover/', views.discover_schemes, name='schemes-discover'),
+    path('gemini/metrics/', views.gemini_metrics, name='gemini-metrics'),
+    path('cache/metrics/', views.cache_metrics, name='cache-metrics'),
 ]
@@ -2,43 +2,40 @@ import json
 import logging
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, parser_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Count, Max
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
-from .models import SchemeEvaluation
-from .serializers import SchemeEvaluationListSerializer, SchemeDetailSerializer
-from .services import extract_text_from_pdf, extract_rules_from_pdf, generate_chat_response, GeminiRateLimitError
+from accounts.document_index import documents_version
+from accounts.models import UserProfile
+
+from .models import SchemeEvaluation, UploadJob
+from .serializers import SchemeEvaluationListSerializer, SchemeDetailSerializer, parse_fieldset
+from .services import (
+    BASE_LANGUAGE, CHAT_ERROR_MESSAGE, CHAT_RATE_LIMITED_MESSAGE, GeminiRateLimitError, generate_chat_response,
+    stream_chat_response,
+)
 from .engine import evaluate_eligibility
+from .profiles import build_profile_snapshot
+from .simulator import simulate
+from .discovery import get_scheme_index
+from .cohort import cohort_pks, cohort_queryset, compile_cohort_filter
+from .pipeline import enqueue
+from . import detail_cache, quota
+from .localization import extraction_from_scheme, localize_extraction
+from .chat_context import get_chat_context
+from .answer_cache import get_cached_answer, store_answer
+from .chat_history import DEFAULT_PAGE_SIZE, append_exchange, history_page, recent_history, serialize_message
+from .evaluations import DEFAULT_PAGE_SIZE as EVALUATIONS_PAGE_SIZE, evaluations_page
+from .conditional import make_etag, not_modified, set_validators
 
 logger = logging.getLogger(__name__)
 
 
-def _build_profile_data(user):
-    """Flatten UserProfile into a dict the eligibility engine can consume."""
-    try:
-        profile = user.profile
-    except Exception:
-        return {}
-
-    data = {
-        'state': profile.state or '',
-        'gender': profile.gender or '',
-        'dob': str(profile.dob) if profile.dob else '',
-        'occupation': profile.occupation or '',
-        'education_level': profile.education_level or '',
-        'marks_percentage': profile.marks_percentage or '',
-        'category': profile.category or '',
-        'minority_status': profile.minority_status,
-        'disability_status': profile.disability_status,
-        'area_type': profile.area_type or '',
-        'annual_income': profile.annual_income or '',
-        'family_members': profile.family_members or [],
-    }
-    return data
-
-
 # ---------------------------------------------------------------------------
 # POST /api/scheme/upload/
 # ---------------------------------------------------------------------------
@@ -48,8 +45,9 @@ def _build_profile_data(user):
 @parser_classes([MultiPartParser, FormParser])
 def upload_scheme(request):
     """
-    Upload a scheme PDF → extract text → Gemini extraction → deterministic evaluation → save.
-    Returns the scheme_id for redirect.
+    Upload a scheme PDF and queue it for processing (text extraction → Gemini
+    extraction → deterministic evaluation → save, see eligify.pipeline).
+    Returns 202 with a job_id to poll at GET /api/scheme/jobs/<job_id>/.
     """
     pdf_file = request.FILES.get('file')
     if not pdf_file:
@@ -61,60 +59,39 @@ def upload_scheme(request):
     scheme_name = request.data.get('scheme_name', pdf_file.name.replace('.pdf', '').replace('_', ' ').title())
     language = request.data.get('language', 'English')
 
-    try:
-        # Step 1: Extract text from PDF
-        pdf_text = extract_text_from_pdf(pdf_file)
-        if not pdf_text.strip():
-            return Response({'error': 'Could not extract text from PDF. The file may be image-based or corrupted.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Step 2: Gemini structured extraction
-        extracted_data = extract_rules_from_pdf(pdf_text, language)
-
-        # Step 3: Deterministic eligibility evaluation
-        profile_data = _build_profile_data(request.user)
-        eligibility_rules = extracted_data.get('eligibility_rules', [])
-        eval_result = evaluate_eligibility(profile_data, eligibility_rules)
-
-        # Use scheme_name from Gemini if it extracted one, otherwise use user-provided
-        final_name = scheme_name or extracted_data.get('scheme_name', 'Unnamed Scheme')
-
-        # Step 4: Save to database
-        scheme = SchemeEvaluation.objects.create(
-            user=request.user,
-            scheme_name=final_name,
-            ministry=extracted_data.get('ministry', ''),
-            benefit_summary=extracted_data.get('benefit_summary', ''),
-            max_benefit=extracted_data.get('max_benefit', ''),
-            category=extracted_data.get('category', 'Other'),
-            tags=extracted_data.get('tags', []),
-            extracted_rules=eligibility_rules,
-            required_documents=extracted_data.get('required_documents', []),
-            application_steps=extracted_data.get('application_steps', []),
-            deadline=extracted_data.get('deadline', 'Ongoing'),
-            official_portal=extracted_data.get('official_portal', ''),
-            evaluation_result=eval_result,
-            match_percentage=eval_result.get('match_percentage', 0),
-            status=eval_result.get('status', 'Not Eligible'),
-            language_preference=language,
-            source_pdf=pdf_file,
-        )
+    job = UploadJob.objects.create(
+        user=request.user,
+        scheme_name=scheme_name,
+        language=language,
+        source_pdf=pdf_file,
+    )
+    enqueue(job)
 
-        return Response({
-            'scheme_id': str(scheme.scheme_id),
-            'scheme_name': scheme.scheme_name,
-            'match_percentage': scheme.match_percentage,
-            'status': scheme.status,
-        }, status=status.HTTP_201_CREATED)
+    return Response({
+        'job_id': str(job.job_id),
+        'stage': job.stage,
+        'status_url': f'/api/scheme/jobs/{job.job_id}/',
+    }, status=status.HTTP_202_ACCEPTED)
 
-    except GeminiRateLimitError as e:
-        logger.warning(f"Rate limit hit during upload: {e}")
-        return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
-    except ValueError as e:
-        logger.error(f"Upload processing error: {e}")
-        return Response({'error': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-    except Exception as e:
-        logger.error(f"Upload error: {e}", exc_info=True)
-        return Response({'error': 'An unexpected error occurred during processing.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ---------------------------------------------------------------------------
+# GET /api/scheme/jobs/<job_id>/
+# ---------------------------------------------------------------------------
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def upload_job_status(request, job_id):
+    """Report the stage of a queued upload and, once done, its scheme_id."""
+    job = get_object_or_404(UploadJob, job_id=job_id, user=request.user)
+    return Response({
+        'job_id': str(job.job_id),
+        'stage': job.stage,
+        'scheme_id': str(job.scheme_id) if job.scheme_id else None,
+        'error': job.error or None,
+        'error_status': job.error_status,
+        'created_at': job.created_at,
+        'updated_at': job.updated_at,
+    })
 
 
 # ---------------------------------------------------------------------------
@@ -124,10 +101,47 @@ def upload_scheme(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def scheme_detail(request, scheme_id):
-    """Return full scheme detail matching the frontend SchemeDetail interface."""
-    scheme = get_object_or_404(SchemeEvaluation, scheme_id=scheme_id, user=request.user)
-    serializer = SchemeDetailSerializer(scheme)
-    return Response(serializer.data)
+    """
+    Return full scheme detail matching the frontend SchemeDetail interface.
+    Answers If-None-Match with a 304 when neither the scheme nor the user's
+    documents changed, and otherwise serves the payload from
+    eligify.detail_cache when it was rendered at that version.
+    ?fields= / ?exclude= (comma-separated SchemeDetail keys) limit the
+    sections returned; the others are not built.
+    """
+    try:
+        fields, exclude = parse_fieldset(request.query_params, SchemeDetailSerializer.SECTIONS)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    sparse = fields is not None or bool(exclude)
+
+    updated_at = SchemeEvaluation.objects.filter(
+        scheme_id=scheme_id, user=request.user,
+    ).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        raise Http404
+    # No Last-Modified: deleting a document changes the version without a newer timestamp
+    documents_at = documents_version(request.user.id)
+    version = make_etag(scheme_id, updated_at, documents_at)
+    etag = make_etag(version, sorted(fields or ()), sorted(exclude)) if sparse else version
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    # The cache holds full payloads; a sparse request is cut from one, or built on its own
+    payload = detail_cache.get_payload(scheme_id, version)
+    if payload is None:
+        scheme = get_object_or_404(SchemeEvaluation, scheme_id=scheme_id, user=request.user)
+        context = {'fields': fields, 'exclude': exclude, 'documents_version': documents_at}
+        payload = SchemeDetailSerializer(scheme, context=context).data
+        if not sparse:
+            detail_cache.store_payload(scheme_id, version, payload)
+    elif sparse:
+        payload = {
+            name: value for name, value in payload.items()
+            if (fields is None or name in fields) and name not in exclude
+        }
+    return set_validators(Response(payload), etag)
 
 
 # ---------------------------------------------------------------------------
@@ -144,41 +158,153 @@ def scheme_chat(request, scheme_id):
     if not user_message:
         return Response({'error': 'Message is required.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Build context for Gemini
-    extracted_context = {
-        'scheme_name': scheme.scheme_name,
-        'ministry': scheme.ministry,
-        'benefit_summary': scheme.benefit_summary,
-        'max_benefit': scheme.max_benefit,
-        'category': scheme.category,
-        'eligibility_rules': scheme.extracted_rules,
-        'required_documents': scheme.required_documents,
-        'application_steps': scheme.application_steps,
-        'deadline': scheme.deadline,
-        'official_portal': scheme.official_portal,
-    }
-
-    ai_response = generate_chat_response(
-        extracted_rules=extracted_context,
-        evaluation_result=scheme.evaluation_result,
-        chat_history=scheme.chat_history or [],
-        user_message=user_message,
-        language=scheme.language_preference,
-    )
+    history = recent_history(scheme)
+    # Only opening questions are cached; follow-ups depend on the conversation
+    ai_response = None if history else get_cached_answer(scheme, user_message)
+    cached = ai_response is not None
+    if not cached:
+        system_instruction, cached_content = get_chat_context(scheme)
+        ai_response = generate_chat_response(
+            system_instruction=system_instruction,
+            chat_history=history,
+            user_message=user_message,
+            cached_content=cached_content,
+        )
+        if not history:
+            store_answer(scheme, user_message, ai_response)
 
-    # Persist chat history
-    history = scheme.chat_history or []
-    history.append({'sender': 'user', 'text': user_message})
-    history.append({'sender': 'ai', 'text': ai_response})
-    scheme.chat_history = history
-    scheme.save(update_fields=['chat_history'])
+    # Persist the exchange
+    messages = append_exchange(scheme, user_message, ai_response)
 
     return Response({
         'response': ai_response,
-        'chat_history': history,
+        'cached': cached,
+        'messages': [serialize_message(m) for m in messages],
+        'chat_count': scheme.chat_count,
+    })
+
+
+# ---------------------------------------------------------------------------
+# GET /api/scheme/<scheme_id>/messages/
+# ---------------------------------------------------------------------------
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def scheme_messages(request, scheme_id):
+    """
+    Chat history, newest page first. Each page lists its messages oldest
+    first; pass its next_cursor as ?before= to get the page before it.
+    """
+    scheme = get_object_or_404(SchemeEvaluation, scheme_id=scheme_id, user=request.user)
+
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_PAGE_SIZE))
+        messages, next_cursor = history_page(scheme, before=request.query_params.get('before'), limit=limit)
+    except ValueError:
+        return Response({'error': 'Invalid limit or cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'results': [serialize_message(m) for m in messages],
+        'next_cursor': next_cursor,
+        'chat_count': scheme.chat_count,
     })
 
 
+# ---------------------------------------------------------------------------
+# POST /api/scheme/<scheme_id>/chat/stream/
+# ---------------------------------------------------------------------------
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _cached_answer_events(scheme: SchemeEvaluation, user_message: str, answer: str):
+    """SSE events for an answer from the answer cache: one 'chunk', then 'done'."""
+    messages = append_exchange(scheme, user_message, answer)
+    yield _sse_event('chunk', {'text': answer})
+    yield _sse_event('done', {
+        'response': answer,
+        'cached': True,
+        'messages': [serialize_message(m) for m in messages],
+        'chat_count': scheme.chat_count,
+    })
+
+
+def _chat_event_stream(scheme: SchemeEvaluation, user_message: str, history: list, system_instruction: str,
+                       cached_content: str | None):
+    """
+    SSE events for one chat answer: 'chunk' events with text as Gemini
+    produces it, then 'done' with the full response once it is saved, or
+    'error'. If the client disconnects mid-answer, the server closes this
+    generator; the Gemini stream is closed and nothing is saved.
+    """
+    answer = stream_chat_response(
+        system_instruction=system_instruction,
+        chat_history=history,
+        user_message=user_message,
+        cached_content=cached_content,
+    )
+    pieces = []
+    finished = False
+    try:
+        try:
+            for text in answer:
+                pieces.append(text)
+                yield _sse_event('chunk', {'text': text})
+        except GeminiRateLimitError:
+            yield _sse_event('error', {'error': CHAT_RATE_LIMITED_MESSAGE, 'status': 429})
+            return
+        except Exception as e:
+            logger.error(f"Gemini chat stream error: {e}")
+            yield _sse_event('error', {'error': CHAT_ERROR_MESSAGE, 'status': 502})
+            return
+
+        ai_response = ''.join(pieces).strip()
+
+        messages = append_exchange(scheme, user_message, ai_response)
+        if not history:
+            store_answer(scheme, user_message, ai_response)
+        finished = True
+
+        yield _sse_event('done', {
+            'response': ai_response,
+            'cached': False,
+            'messages': [serialize_message(m) for m in messages],
+            'chat_count': scheme.chat_count,
+        })
+    finally:
+        answer.close()
+        if not finished and pieces:
+            logger.info(f"Chat stream for scheme {scheme.scheme_id} ended early; answer not saved")
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def scheme_chat_stream(request, scheme_id):
+    """
+    Send a message to the AI chat and receive the answer as Server-Sent
+    Events while it is generated. It is saved to the chat history once complete.
+    """
+    scheme = get_object_or_404(SchemeEvaluation, scheme_id=scheme_id, user=request.user)
+
+    user_message = request.data.get('message', '').strip()
+    if not user_message:
+        return Response({'error': 'Message is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    history = recent_history(scheme)
+    cached_answer = None if history else get_cached_answer(scheme, user_message)
+    if cached_answer is not None:
+        events = _cached_answer_events(scheme, user_message, cached_answer)
+    else:
+        system_instruction, cached_content = get_chat_context(scheme)
+        events = _chat_event_stream(scheme, user_message, history, system_instruction, cached_content)
+
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let a proxy buffer the stream
+    return response
+
+
 # ---------------------------------------------------------------------------
 # GET /api/my-evaluations/
 # ---------------------------------------------------------------------------
@@ -186,10 +312,45 @@ def scheme_chat(request, scheme_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def my_evaluations(request):
-    """Return all evaluations for the current user."""
-    evaluations = SchemeEvaluation.objects.filter(user=request.user)
-    serializer = SchemeEvaluationListSerializer(evaluations, many=True)
-    return Response(serializer.data)
+    """
+    The current user's evaluations, newest first, optionally filtered by
+    ?status= and ?category=. Returns up to ?limit= cards; when there are
+    more, the X-Next-Cursor header holds the ?before= value for the next page.
+    ?fields= / ?exclude= limit the card fields returned. Answers
+    If-None-Match with a 304 while none of the user's evaluations changed.
+    """
+    versions = SchemeEvaluation.objects.filter(user=request.user).aggregate(
+        last_modified=Max('updated_at'), count=Count('pk'),
+    )
+    last_modified = versions['last_modified']
+    etag = make_etag(request.user.id, last_modified, versions['count'], request.query_params.urlencode())
+    cached = not_modified(request, etag, last_modified)
+    if cached is not None:
+        return cached
+
+    try:
+        limit = int(request.query_params.get('limit', EVALUATIONS_PAGE_SIZE))
+        evaluations, next_cursor = evaluations_page(
+            request.user,
+            before=request.query_params.get('before'),
+            limit=limit,
+            status=request.query_params.get('status'),
+            category=request.query_params.get('category'),
+        )
+    except ValueError:
+        return Response({'error': 'Invalid limit, cursor or status.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        fields, exclude = parse_fieldset(request.query_params, SchemeEvaluationListSerializer.Meta.fields)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = SchemeEvaluationListSerializer(
+        evaluations, many=True, context={'fields': fields, 'exclude': exclude},
+    )
+    response = Response(serializer.data)
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return set_validators(response, etag, last_modified)
 
 
 # ---------------------------------------------------------------------------
@@ -202,13 +363,198 @@ def re_evaluate(request, scheme_id):
     """Re-run eligibility evaluation with updated profile data."""
     scheme = get_object_or_404(SchemeEvaluation, scheme_id=scheme_id, user=request.user)
 
-    profile_data = _build_profile_data(request.user)
-    eval_result = evaluate_eligibility(profile_data, scheme.extracted_rules)
+    profile = build_profile_snapshot(request.user)
+    eval_result = evaluate_eligibility(profile, scheme.extracted_rules)
 
     scheme.evaluation_result = eval_result
     scheme.match_percentage = eval_result.get('match_percentage', 0)
     scheme.status = eval_result.get('status', 'Not Eligible')
-    scheme.save(update_fields=['evaluation_result', 'match_percentage', 'status'])
+    scheme.save(update_fields=['evaluation_result', 'match_percentage', 'status', 'updated_at'])
 
     serializer = SchemeDetailSerializer(scheme)
     return Response(serializer.data)
+
+
+# ---------------------------------------------------------------------------
+# POST /api/scheme/<scheme_id>/language/
+# ---------------------------------------------------------------------------
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def switch_language(request, scheme_id):
+    """
+    Show a scheme in another language. Only its human-readable strings are
+    translated (from the stored base extraction, using cached translations
+    where possible); the PDF is not re-extracted.
+    """
+    scheme = get_object_or_404(SchemeEvaluation, scheme_id=scheme_id, user=request.user)
+
+    language = request.data.get('language', '')
+    if language not in dict(SchemeEvaluation.LANGUAGE_CHOICES):
+        return Response({'error': 'Unsupported language.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if language != scheme.language_preference:
+        if scheme.base_extraction:
+            source, source_language = scheme.base_extraction, BASE_LANGUAGE
+        else:
+            # Uploaded before base extractions were stored: translate what we have
+            source, source_language = extraction_from_scheme(scheme), scheme.language_preference
+
+        try:
+            localized = localize_extraction(source, language, source_language, priority=quota.INTERACTIVE)
+        except GeminiRateLimitError as e:
+            logger.warning(f"Rate limit hit during translation: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        except ValueError as e:
+            logger.error(f"Translation error: {e}")
+            return Response({'error': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        update_fields = [
+            'benefit_summary', 'extracted_rules', 'required_documents', 'application_steps',
+            'language_preference', 'evaluation_result', 'match_percentage', 'status', 'updated_at',
+        ]
+        if not scheme.base_extraction and language == BASE_LANGUAGE:
+            scheme.base_extraction = localized
+            update_fields.append('base_extraction')
+
+        scheme.benefit_summary = localized.get('benefit_summary', '')
+        scheme.extracted_rules = localized.get('eligibility_rules', [])
+        scheme.required_documents = localized.get('required_documents', [])
+        scheme.application_steps = localized.get('application_steps', [])
+        scheme.language_preference = language
+
+        # Condition labels come from the rules, so re-evaluate in the new language
+        eval_result = evaluate_eligibility(build_profile_snapshot(request.user), scheme.extracted_rules)
+        scheme.evaluation_result = eval_result
+        scheme.match_percentage = eval_result.get('match_percentage', 0)
+        scheme.status = eval_result.get('status', 'Not Eligible')
+        scheme.save(update_fields=update_fields)
+
+    serializer = SchemeDetailSerializer(scheme)
+    return Response(serializer.data)
+
+
+# ---------------------------------------------------------------------------
+# POST /api/scheme/<scheme_id>/what-if/
+# ---------------------------------------------------------------------------
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def what_if(request, scheme_id):
+    """
+    Evaluate the scheme's rules over a grid of hypothetical profiles.
+
+    Body: {"axes": {"annual_income": {"start": 0, "stop": 500000, "step": 10000},
+                    "age": {"start": 18, "stop": 60},
+                    "category": ["General", "OBC", "SC", "ST"]}}
+    Fields not varied by an axis are taken from the user's profile.
+    """
+    scheme = get_object_or_404(SchemeEvaluation, scheme_id=scheme_id, user=request.user)
+
+    axes = request.data.get('axes')
+    if not isinstance(axes, dict) or not axes:
+        return Response({'error': 'axes must be a non-empty object of field -> values.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    profile = build_profile_snapshot(request.user)
+    try:
+        result = simulate(profile, scheme.extracted_rules, axes)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(result)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/schemes/discover/
+# ---------------------------------------------------------------------------
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def discover_schemes(request):
+    """
+    Schemes you may qualify for — scans every distinct stored rule set via
+    the predicate index and returns the best matches for the user's profile.
+    """
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        min_match = int(request.query_params.get('min_match', 50))
+    except ValueError:
+        return Response({'error': 'limit and min_match must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    profile = build_profile_snapshot(request.user)
+    result = get_scheme_index().discover(profile, limit=limit, min_match=min_match)
+    return Response(result)
+
+
+# ---------------------------------------------------------------------------
+# GET /api/scheme/<scheme_id>/cohort/
+# ---------------------------------------------------------------------------
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def scheme_cohort(request, scheme_id):
+    """
+    Registered users who satisfy every rule of a scheme (operational reporting).
+    Rules are pushed down to SQL where possible. Paginated with ?page=&page_size=.
+    """
+    scheme = get_object_or_404(SchemeEvaluation, scheme_id=scheme_id)
+
+    try:
+        page_number = int(request.query_params.get('page', 1))
+        page_size = min(max(int(request.query_params.get('page_size', 50)), 1), 500)
+    except ValueError:
+        return Response({'error': 'page and page_size must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    cohort = compile_cohort_filter(scheme.extracted_rules)
+    if cohort.fallback_rules:
+        # Some rules ran in Python: page through the matching pks, then load one page of profiles
+        paginator = Paginator(cohort_pks(scheme.extracted_rules, cohort=cohort), page_size)
+    else:
+        paginator = Paginator(cohort_queryset(scheme.extracted_rules, cohort=cohort).select_related('user'), page_size)
+    try:
+        page = paginator.page(page_number)
+    except EmptyPage:
+        return Response({'error': 'Page out of range.'}, status=status.HTTP_404_NOT_FOUND)
+    profiles = page.object_list
+    if cohort.fallback_rules:
+        profiles = UserProfile.objects.filter(pk__in=list(profiles)).select_related('user').order_by('pk')
+
+    return Response({
+        'count': paginator.count,
+        'page': page.number,
+        'num_pages': paginator.num_pages,
+        'pushed_down_rules': cohort.pushed_down,
+        'python_rules': len(cohort.fallback_rules),
+        'results': [
+            {
+                'user_id': profile.user_id,
+                'username': profile.user.username,
+                'email': profile.user.email,
+                'state': profile.state or '',
+                'category': profile.category or '',
+            }
+            for profile in profiles
+        ],
+    })
+
+
+# ---------------------------------------------------------------------------
+# GET /api/gemini/metrics/
+# ---------------------------------------------------------------------------
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def gemini_metrics(request):
+    """Gemini quota bucket, circuit breaker state and admission counters."""
+    return Response(quota.snapshot())
+
+
+# ---------------------------------------------------------------------------
+# GET /api/cache/metrics/
+# ---------------------------------------------------------------------------
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_metrics(request):
+    """Hit and miss counts of the rendered scheme detail cache."""
+    return Response({'scheme_detail': detail_cache.stats()})
@@ -129,13 +129,20 @@ export default function MyEvaluationsPage() {
             .then(r => r.json()).then(d => { const u = d.user; setUserName(u?.first_name ? `${u.first_name}${u.last_name ? ' ' + u.last_name : ''}` : u?.email || ""); }).catch(() => {});
         const fetchEvaluations = async () => {
             try {
-                const res = await fetch("http://127.0.0.1:8000/api/my-evaluations/", {
-                    headers: { Authorization: `Bearer ${token}` },
-                });
-                if (res.ok) {
-                    const data = await res.json();
-                    setEvaluations(data);
-                }
+                // Pages of up to 200 cards; X-Next-Cursor points at the next one
+                const all: Evaluation[] = [];
+                let cursor: string | null = null;
+                do {
+                    const params = new URLSearchParams({ limit: "200" });
+                    if (cursor) params.set("before", cursor);
+                    const res = await fetch(`http://127.0.0.1:8000/api/my-evaluations/?${params}`, {
+                        headers: { Authorization: `Bearer ${token}` },
+                    });
+                    if (!res.ok) break;
+                    all.push(...(await res.json()));
+                    cursor = res.headers.get("X-Next-Cursor");
+                } while (cursor);
+                setEvaluations(all);
             } catch (err) {
                 console.error("Failed to fetch evaluations:", err);
             } finally {
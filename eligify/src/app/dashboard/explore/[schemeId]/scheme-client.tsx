@@ -54,7 +54,7 @@ import { Separator } from "@/components/ui/separator";
 import { Switch } from "@/components/ui/switch";
 import { Label } from "@/components/ui/label";
 import { ScrollArea } from "@/components/ui/scroll-area";
-import { useLanguage } from "@/context/language-context";
+import { useLanguage, type Language } from "@/context/language-context";
 import { LanguageSwitcher } from "@/components/language-switcher";
 
 // ─── Sidebar Items ──────────────────────────────────────────────────
@@ -116,8 +116,16 @@ interface SchemeDetail {
     conditions: Condition[];
     documents: SchemeDocument[];
     steps: ApplicationStep[];
+    language?: string;
 }
 
+// UI language -> scheme language name used by the backend
+const SCHEME_LANGUAGES: Record<Language, string> = {
+    en: "English",
+    hi: "Hindi",
+    mr: "Marathi",
+};
+
 // ─── Mock Schemes Database ──────────────────────────────────────────
 // (Removed: data now fetched from API)
 
@@ -204,7 +212,7 @@ export default function SchemeIntelligencePage() {
     const [analysisSaved, setAnalysisSaved] = useState(false);
     const [saving, setSaving] = useState(false);
     const [userName, setUserName] = useState("");
-    const { t } = useLanguage();
+    const { t, lang } = useLanguage();
 
     useEffect(() => {
         const token = localStorage.getItem("access_token");
@@ -258,6 +266,30 @@ export default function SchemeIntelligencePage() {
         fetchScheme();
     }, [schemeId]);
 
+    // Switch the scheme to a language the user picks on this page. Opening the
+    // page never does: the switch is saved on the scheme (and may translate),
+    // so the language chosen at upload stays until the user changes it here.
+    const pickedLang = useRef(lang);
+    useEffect(() => {
+        if (loading || lang === pickedLang.current) return;
+        pickedLang.current = lang;
+        const target = SCHEME_LANGUAGES[lang];
+        if (!scheme.language || scheme.language === target) return;
+        const token = localStorage.getItem("access_token");
+        if (!token) return;
+        fetch(`http://127.0.0.1:8000/api/scheme/${schemeId}/language/`, {
+            method: "POST",
+            headers: {
+                Authorization: `Bearer ${token}`,
+                "Content-Type": "application/json",
+            },
+            body: JSON.stringify({ language: target }),
+        })
+            .then((res) => (res.ok ? res.json() : null))
+            .then((data) => { if (data) setScheme(data); })
+            .catch((err) => console.error("Failed to switch scheme language:", err));
+    }, [lang, loading, scheme.language, schemeId]);
+
     const satisfied = scheme.conditions.filter((c) => c.status === "satisfied").length;
     const notSatisfied = scheme.conditions.filter((c) => c.status === "not-satisfied").length;
     const missingCount = scheme.conditions.filter((c) => c.status === "missing").length;
@@ -271,9 +303,17 @@ export default function SchemeIntelligencePage() {
         setChatMessages((prev) => [...prev, userMsg]);
         setChatInput("");
         setIsTyping(true);
+        const aiId = (Date.now() + 1).toString();
+        const setAiContent = (text: string) =>
+            setChatMessages((prev) =>
+                prev.some((m) => m.id === aiId)
+                    ? prev.map((m) => (m.id === aiId ? { ...m, content: text } : m))
+                    : [...prev, { id: aiId, role: "ai", content: text, timestamp: new Date() }]
+            );
         try {
             const token = localStorage.getItem("access_token");
-            const res = await fetch(`http://127.0.0.1:8000/api/scheme/${schemeId}/chat/`, {
+            // The answer streams in as Server-Sent Events: "chunk" events, then "done" (or "error")
+            const res = await fetch(`http://127.0.0.1:8000/api/scheme/${schemeId}/chat/stream/`, {
                 method: "POST",
                 headers: {
                     Authorization: `Bearer ${token}`,
@@ -281,14 +321,38 @@ export default function SchemeIntelligencePage() {
                 },
                 body: JSON.stringify({ message: content }),
             });
-            if (res.ok) {
-                const data = await res.json();
-                setChatMessages((prev) => [...prev, { id: (Date.now() + 1).toString(), role: "ai", content: data.response, timestamp: new Date() }]);
-            } else {
-                setChatMessages((prev) => [...prev, { id: (Date.now() + 1).toString(), role: "ai", content: "Sorry, I couldn't process that. Please try again.", timestamp: new Date() }]);
+            if (!res.ok || !res.body) {
+                setAiContent("Sorry, I couldn't process that. Please try again.");
+                return;
+            }
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = "";
+            let answer = "";
+            for (;;) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split("\n\n");
+                buffer = events.pop() ?? "";
+                for (const raw of events) {
+                    const event = raw.match(/^event: (.*)$/m)?.[1];
+                    const data = raw.match(/^data: (.*)$/m)?.[1];
+                    if (!event || !data) continue;
+                    const payload = JSON.parse(data);
+                    if (event === "chunk") {
+                        answer += payload.text;
+                        setIsTyping(false);
+                        setAiContent(answer);
+                    } else if (event === "done") {
+                        setAiContent(payload.response);
+                    } else if (event === "error") {
+                        setAiContent(payload.error);
+                    }
+                }
             }
         } catch {
-            setChatMessages((prev) => [...prev, { id: (Date.now() + 1).toString(), role: "ai", content: "Network error. Please check your connection and try again.", timestamp: new Date() }]);
+            setAiContent("Network error. Please check your connection and try again.");
         } finally {
             setIsTyping(false);
         }
@@ -94,9 +94,26 @@ const PROCESSING_STEPS: ProcessingStep[] = [
     },
 ];
 
+// Backend upload job stages -> processing step shown
+const STAGE_TO_STEP: Record<string, number> = {
+    queued: 1,
+    parsing: 1,
+    extracting: 2,
+    evaluating: 3,
+};
+const JOB_POLL_INTERVAL = 1500; // ms
+
 // ─── Types ──────────────────────────────────────────────────────────
 type PageState = "upload" | "preview" | "processing" | "error" | "complete";
 
+interface UploadJobStatus {
+    job_id: string;
+    stage: "queued" | "parsing" | "extracting" | "evaluating" | "done" | "failed";
+    scheme_id: string | null;
+    error: string | null;
+    error_status: number | null;
+}
+
 // ─── NotifBadge ─────────────────────────────────────────────────────
 function NotifBadge({ count }: { count: number }) {
     if (count === 0) return null;
@@ -341,15 +358,6 @@ export default function UploadSchemePage() {
         setPageState("processing");
         setCurrentStep(1);
 
-        // Start step animation in background
-        const stepAnimation = async () => {
-            for (let i = 0; i < PROCESSING_STEPS.length; i++) {
-                setCurrentStep(PROCESSING_STEPS[i].id);
-                await new Promise((r) => setTimeout(r, PROCESSING_STEPS[i].duration));
-            }
-        };
-        const animPromise = stepAnimation();
-
         try {
             const token = localStorage.getItem("access_token");
             const formData = new FormData();
@@ -363,21 +371,34 @@ export default function UploadSchemePage() {
                 body: formData,
             });
 
-            // Wait for animation to finish regardless
-            await animPromise;
-
             if (!res.ok) {
                 const err = await res.json().catch(() => ({}));
                 throw new Error(err.error || "Failed to process the document.");
             }
 
-            const data = await res.json();
+            // The upload is queued; poll the job until the backend finishes it
+            const { job_id } = await res.json();
+            let job: UploadJobStatus;
+            while (true) {
+                await new Promise((r) => setTimeout(r, JOB_POLL_INTERVAL));
+                const jobRes = await fetch(`http://127.0.0.1:8000/api/scheme/jobs/${job_id}/`, {
+                    headers: { Authorization: `Bearer ${token}` },
+                });
+                if (!jobRes.ok) throw new Error("Lost track of the upload. Please try again.");
+                job = await jobRes.json();
+                if (job.stage === "done" || job.stage === "failed") break;
+                setCurrentStep(STAGE_TO_STEP[job.stage] ?? 1);
+            }
+
+            if (job.stage === "failed" || !job.scheme_id) {
+                throw new Error(job.error || "Failed to process the document.");
+            }
 
             setCurrentStep(PROCESSING_STEPS.length + 1);
             setPageState("complete");
 
             await new Promise((r) => setTimeout(r, 1200));
-            router.push(`/dashboard/explore/${data.scheme_id}`);
+            router.push(`/dashboard/explore/${job.scheme_id}`);
         } catch (err: unknown) {
             const msg = err instanceof Error ? err.message : "An unexpected error occurred.";
             setErrorMessage(msg);